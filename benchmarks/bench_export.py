@@ -0,0 +1,297 @@
+# Times the export pipeline on a generated scene. Runs inside Blender:
+#   blender --background --factory-startup --python benchmarks/bench_export.py -- --triangles 20000 --bones 60 --output results.json
+# Compare two result files with benchmarks/compare_results.py.
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import bpy
+import numpy as np
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo_dir)
+
+import export_mdl
+from export_mdl.classes import War3AnimationCurve as curve_module
+from export_mdl.classes.War3ExportSettings import War3ExportSettings
+from export_mdl.classes.War3Model import War3Model
+from export_mdl.classes.model_utils import from_scene as from_scene_module
+from export_mdl.export_mdl import export_mdl as export_mdl_module
+from export_mdl.export_mdl import export_mdx as export_mdx_module
+
+result_version = 1
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(prog="bench_export.py")
+    parser.add_argument('--triangles', type=int, default=20000)
+    parser.add_argument('--bones', type=int, default=60)
+    parser.add_argument('--keyframes', type=int, default=100, help="Keyframes per animated channel")
+    parser.add_argument('--particles', type=int, default=4)
+    parser.add_argument('--lights', type=int, default=4)
+    parser.add_argument('--sequences', type=int, default=20)
+    parser.add_argument('--frames', type=int, default=40, help="Length of each sequence")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-optimize', dest='optimize', action='store_false')
+    parser.add_argument('--skinweights', action='store_true')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench_results.json')
+    return parser.parse_args(argv)
+
+
+# -- Scene generation -- #
+
+def clear_scene():
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj, do_unlink=True)
+    bpy.context.scene.timeline_markers.clear()
+
+
+def link(obj):
+    bpy.context.scene.collection.objects.link(obj)
+    return obj
+
+
+def add_sequences(count, length):
+    scene = bpy.context.scene
+    for i in range(count):
+        start = i * (length + 10)
+        for frame in (start, start + length):
+            scene.timeline_markers.new("Stand %d" % (i + 1), frame=frame)
+    # The handler normally syncs scene.mdl_sequences with the markers
+    from export_mdl.properties.War3SequenceProperties import sequence_changed_handler
+    sequence_changed_handler(None)
+    scene.frame_end = count * (length + 10)
+    return scene.frame_end
+
+
+def add_armature(bone_count):
+    armature = link(bpy.data.objects.new("Armature", bpy.data.armatures.new("Armature")))
+    bpy.context.view_layer.objects.active = armature
+    bpy.ops.object.mode_set(mode='EDIT')
+    edit_bones = []
+    for i in range(bone_count):
+        bone = armature.data.edit_bones.new("Bone %d" % i)
+        bone.head = (i * 0.1, 0, (i % 4) * 0.5)
+        bone.tail = (i * 0.1, 0, (i % 4) * 0.5 + 0.5)
+        if i:
+            bone.parent = edit_bones[(i - 1) // 4]  # A tree four children wide
+        edit_bones.append(bone)
+    bpy.ops.object.mode_set(mode='OBJECT')
+    return armature
+
+
+def add_keyframes(armature, keyframes, frame_end, rng):
+    armature.animation_data_create()
+    action = bpy.data.actions.new("Anim")
+    armature.animation_data.action = action
+    frames = np.linspace(0, frame_end, keyframes)
+    for bone in armature.pose.bones:
+        bone.rotation_mode = 'QUATERNION'
+        for path, rest in (('location', (0, 0, 0)), ('rotation_quaternion', (1, 0, 0, 0)), ('scale', (1, 1, 1))):
+            data_path = 'pose.bones["%s"].%s' % (bone.name, path)
+            for index, value in enumerate(rest):
+                fcurve = action.fcurves.new(data_path, index=index, action_group=bone.name)
+                values = value + 0.2 * np.sin(frames * rng.uniform(0.05, 0.3) + rng.uniform(0, 6))
+                fcurve.keyframe_points.add(keyframes)
+                fcurve.keyframe_points.foreach_set('co', np.column_stack((frames, values)).ravel().astype(np.float32))
+                fcurve.update()
+
+
+def add_mesh(triangles, armature):
+    # A grid of quads, two triangles each, skinned to the bones in strips along X
+    side = max(1, int(math.ceil(math.sqrt(max(1, triangles // 2)))))
+    xs, ys = np.meshgrid(np.linspace(0, 10, side + 1), np.linspace(0, 10, side + 1))
+    vertices = np.column_stack((xs.ravel(), ys.ravel(), np.zeros(xs.size)))
+    rows = np.arange(side)
+    corners = (rows[:, None] * (side + 1) + rows[None, :]).ravel()
+    faces = np.column_stack((corners, corners + 1, corners + side + 2, corners + side + 1))
+
+    mesh = bpy.data.meshes.new("Mesh")
+    mesh.from_pydata(vertices.tolist(), [], faces.tolist())
+    mesh.uv_layers.new()
+    material = bpy.data.materials.new("Material")
+    material.mdl_layers.add()
+    mesh.materials.append(material)
+    obj = link(bpy.data.objects.new("Mesh", mesh))
+
+    if armature is not None:
+        obj.parent = armature
+        obj.modifiers.new("Armature", 'ARMATURE').object = armature
+        bones = armature.data.bones
+        strips = np.minimum((vertices[:, 0] / 10 * len(bones)).astype(int), len(bones) - 1)
+        for i, bone in enumerate(bones):
+            group = obj.vertex_groups.new(name=bone.name)
+            group.add(np.flatnonzero(strips == i).tolist(), 1.0, 'REPLACE')
+    return obj
+
+
+def add_particles(count):
+    emitter_types = ('ParticleEmitter', 'ParticleEmitter2', 'RibbonEmitter')
+    for i in range(count):
+        mesh = bpy.data.meshes.new("Emitter")
+        mesh.from_pydata([(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0)], [], [(0, 1, 2, 3)])
+        obj = link(bpy.data.objects.new("Emitter %d" % i, mesh))
+        obj.location = (i, 0, 2)
+        obj.modifiers.new("Particles", 'PARTICLE_SYSTEM')
+        obj.particle_systems[0].settings.mdl_particle_sys.emitter_type = emitter_types[i % len(emitter_types)]
+
+
+def add_lights(count):
+    for i in range(count):
+        obj = link(bpy.data.objects.new("Light %d" % i, bpy.data.lights.new("Light %d" % i, 'POINT')))
+        obj.location = (i, 2, 2)
+
+
+def build_scene(args):
+    rng = np.random.RandomState(args.seed)
+    clear_scene()
+    frame_end = add_sequences(args.sequences, args.frames)
+    armature = None
+    if args.bones:
+        armature = add_armature(args.bones)
+        add_keyframes(armature, args.keyframes, frame_end, rng)
+    add_mesh(args.triangles, armature)
+    add_particles(args.particles)
+    add_lights(args.lights)
+    bpy.context.view_layer.update()
+
+
+# -- Timing -- #
+
+class PhaseTimer:
+    # Wraps functions in place so every call adds to a per-phase total
+    def __init__(self):
+        self.seconds = {}
+        self.calls = {}
+
+    def wrap(self, owner, name, phase):
+        function = getattr(owner, name)
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.seconds[phase] = self.seconds.get(phase, 0) + time.perf_counter() - start
+                self.calls[phase] = self.calls.get(phase, 0) + 1
+
+        setattr(owner, name, timed)
+
+    def reset(self):
+        self.seconds.clear()
+        self.calls.clear()
+
+
+def instrument(timer):
+    timer.wrap(from_scene_module, 'make_mesh', 'make_mesh')
+    curve_class = curve_module.War3AnimationCurve
+    timer.wrap(curve_class, '__init__', 'War3AnimationCurve.__init__')
+    timer.wrap(curve_class, 'from_samples', 'War3AnimationCurve.from_samples')
+    timer.wrap(curve_class, 'optimize', 'War3AnimationCurve.optimize')
+    # The writers as looked up by write_mdl_file and write_mdx_file
+    for module, prefix in ((export_mdl_module, 'mdl'), (export_mdx_module, 'mdx')):
+        for name in list(vars(module)):
+            if name.startswith('save_'):
+                timer.wrap(module, name, '%s.%s' % (prefix, name))
+
+
+def run_export(settings, directory):
+    context = bpy.context
+    model = War3Model(context)
+    phases = {}
+    start = time.perf_counter()
+    from_scene_module.from_scene(model, context, settings)
+    phases['from_scene'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    export_mdl_module.write_mdl_file(model, settings, os.path.join(directory, 'bench.mdl'))
+    phases['write_mdl_file'] = time.perf_counter() - start
+    start = time.perf_counter()
+    export_mdx_module.write_mdx_file(model, settings, os.path.join(directory, 'bench.mdx'))
+    phases['write_mdx_file'] = time.perf_counter() - start
+    return model, phases
+
+
+def describe_scene(model):
+    return {
+        'triangles': sum(len(g.triangles) for g in model.geosets),
+        'vertices': sum(len(g.vertices) for g in model.geosets),
+        'geosets': len(model.geosets),
+        'objects': len(model.objects_all),
+        'sequences': len(model.sequences),
+        'fcurves': sum(len(a.fcurves) for a in bpy.data.actions),
+    }
+
+
+def get_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=repo_dir, universal_newlines=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    args = parse_args()
+    export_mdl.register()
+    build_scene(args)
+
+    settings = War3ExportSettings.from_dict({
+        'optimize_animation': args.optimize,
+        'use_skinweights': args.skinweights,
+    })
+
+    timer = PhaseTimer()
+    instrument(timer)
+    runs = []
+    model = None
+    with tempfile.TemporaryDirectory() as directory:
+        for _ in range(args.repeat):
+            timer.reset()
+            with contextlib.redirect_stdout(io.StringIO()):  # The pipeline prints per curve and per file
+                model, phases = run_export(settings, directory)
+            phases.update(timer.seconds)
+            runs.append((phases, dict(timer.calls)))
+        sizes = {ext: os.path.getsize(os.path.join(directory, 'bench.' + ext)) for ext in ('mdl', 'mdx')}
+
+    results = {}
+    for phase in runs[0][0]:
+        seconds = [phases.get(phase, 0) for phases, _ in runs]
+        results[phase] = {
+            'min': min(seconds),
+            'median': statistics.median(seconds),
+            'calls': runs[0][1].get(phase, 1),
+            'runs': seconds,
+        }
+
+    report = {
+        'version': result_version,
+        'commit': get_commit(),
+        'blender': bpy.app.version_string,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': {k: v for k, v in vars(args).items() if k != 'output'},
+        'scene': describe_scene(model),
+        'output_bytes': sizes,
+        'phases': results,
+    }
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+
+    for phase, result in sorted(results.items(), key=lambda item: -item[1]['median']):
+        print("%-45s %9.4fs  (%d calls)" % (phase, result['median'], result['calls']))
+    print("Results written to %s" % args.output)
+
+
+main()
@@ -0,0 +1,50 @@
+# Compares two result files from bench_export.py, e.g. from before and after a change:
+#   python benchmarks/compare_results.py old.json new.json [--fail-above 1.1]
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path) as file:
+        return json.load(file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument('old')
+    parser.add_argument('new')
+    parser.add_argument('--fail-above', type=float,
+                        help="Exit with an error if a phase got slower than this ratio, e.g. 1.1 for 10%%")
+    args = parser.parse_args()
+
+    old, new = load(args.old), load(args.new)
+    print("old: %s (Blender %s)" % (old.get('commit'), old.get('blender')))
+    print("new: %s (Blender %s)" % (new.get('commit'), new.get('blender')))
+    if old['params'] != new['params']:
+        print("Warning: the runs used different parameters")
+        for key in sorted(set(old['params']) | set(new['params'])):
+            if old['params'].get(key) != new['params'].get(key):
+                print("  %s: %s -> %s" % (key, old['params'].get(key), new['params'].get(key)))
+
+    slower = []
+    print("\n%-45s %10s %10s %8s" % ("phase", "old", "new", "ratio"))
+    for phase in sorted(set(old['phases']) | set(new['phases'])):
+        old_time = old['phases'].get(phase, {}).get('median')
+        new_time = new['phases'].get(phase, {}).get('median')
+        if old_time is None or new_time is None:
+            print("%-45s %10s %10s" % (phase, "-" if old_time is None else "%.4f" % old_time,
+                                       "-" if new_time is None else "%.4f" % new_time))
+            continue
+        ratio = new_time / old_time if old_time > 0 else float('inf') if new_time > 0 else 1.0
+        print("%-45s %10.4f %10.4f %7.2fx" % (phase, old_time, new_time, ratio))
+        if args.fail_above is not None and ratio > args.fail_above:
+            slower.append(phase)
+
+    if slower:
+        print("\nSlower than %.2fx: %s" % (args.fail_above, ", ".join(slower)))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
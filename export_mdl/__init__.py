@@ -15,33 +15,39 @@
 #  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
 #
 # ##### END GPL LICENSE BLOCK #####
-import bpy
+try:
+    import bpy
+except ImportError:  # Imported outside of Blender, e.g. to write a saved intermediate model
+    bpy = None
 import os
 import shutil
-from .ui.WAR3_PT_billboard_panel import WAR3_PT_billboard_panel
-from .ui.WAR3_PT_event_panel import WAR3_PT_event_panel
-from .ui.WAR3_PT_light_panel import WAR3_PT_light_panel
-from .ui.WAR3_PT_material_panel import WAR3_PT_material_panel
-from .ui.WAR3_PT_particle_editor_panel import WAR3_PT_particle_editor_panel
-from .ui.WAR3_PT_sequences_panel import WAR3_PT_sequences_panel
-from .ui.WAR3_UL_material_layer_list import WAR3_UL_material_layer_list
-from .ui.WAR3_UL_sequence_list import WAR3_UL_sequence_list
-from .properties import War3BillboardProperties
-from .properties import War3EventProperties
-from .properties import War3LightSettings
-from .properties import War3MaterialLayerProperties
-from .properties import War3ParticleSystemProperties
-from .properties import War3SequenceProperties
-from .operators import WAR3_MT_emitter_presets
-from .operators import WAR3_OT_add_anim_sequence
-from .operators import WAR3_OT_create_collision_shape
-from .operators import WAR3_OT_create_eventobject
-from .operators import WAR3_OT_emitter_preset_add
-from .operators import WAR3_OT_export_mdl
-from .operators import WAR3_OT_material_list_action
-from .operators import WAR3_OT_search_event_id
-from .operators import WAR3_OT_search_event_type
-from .operators import WAR3_OT_search_texture
+
+if bpy is not None:
+    from .ui.WAR3_PT_billboard_panel import WAR3_PT_billboard_panel
+    from .ui.WAR3_PT_event_panel import WAR3_PT_event_panel
+    from .ui.WAR3_PT_light_panel import WAR3_PT_light_panel
+    from .ui.WAR3_PT_material_panel import WAR3_PT_material_panel
+    from .ui.WAR3_PT_particle_editor_panel import WAR3_PT_particle_editor_panel
+    from .ui.WAR3_PT_sequences_panel import WAR3_PT_sequences_panel
+    from .ui.WAR3_UL_material_layer_list import WAR3_UL_material_layer_list
+    from .ui.WAR3_UL_sequence_list import WAR3_UL_sequence_list
+    from .properties import War3BillboardProperties
+    from .properties import War3EventProperties
+    from .properties import War3LightSettings
+    from .properties import War3MaterialLayerProperties
+    from .properties import War3ParticleSystemProperties
+    from .properties import War3SequenceProperties
+    from .operators import WAR3_MT_emitter_presets
+    from .operators import WAR3_OT_add_anim_sequence
+    from .operators import WAR3_OT_create_collision_shape
+    from .operators import WAR3_OT_create_eventobject
+    from .operators import WAR3_OT_emitter_preset_add
+    from .operators import WAR3_OT_export_mdl
+    from .operators import WAR3_OT_import_mdl
+    from .operators import WAR3_OT_material_list_action
+    from .operators import WAR3_OT_search_event_id
+    from .operators import WAR3_OT_search_event_type
+    from .operators import WAR3_OT_search_texture
 
 bl_info = {
     "name": "Warcraft MDL Exporter",
@@ -49,7 +55,7 @@ bl_info = {
     'version': (0, 0, 1),
     "blender": (2, 80, 0),
     'category': 'Import-Export',
-    "location": "File > Export > Warcraft MDL (.mdl)",
+    "location": "File > Export > Warcraft MDL (.mdl), File > Import > Warcraft MDL (.mdl)",
     "description": "Export mesh as Warcraft .MDL",
     }
 
@@ -114,37 +120,45 @@ bl_info = {
 #     from bpy.utils import register_class, unregister_class
 
 
-classes = (
-    War3MaterialLayerProperties.War3MaterialLayerProperties,
-    War3EventProperties.War3EventProperties,
-    War3SequenceProperties.War3SequenceProperties,
-    War3BillboardProperties.War3BillboardProperties,
-    War3ParticleSystemProperties.War3ParticleSystemProperties,
-    War3LightSettings.War3LightSettings,
-    WAR3_OT_export_mdl.WAR3_OT_export_mdl,
-    WAR3_OT_search_event_type.WAR3_OT_search_event_type,
-    WAR3_OT_search_event_id.WAR3_OT_search_event_id,
-    WAR3_OT_search_texture.WAR3_OT_search_texture,
-    WAR3_OT_create_eventobject.WAR3_OT_create_eventobject,
-    WAR3_OT_create_collision_shape.WAR3_OT_create_collision_shape,
-    WAR3_OT_material_list_action.WAR3_OT_material_list_action,
-    WAR3_OT_emitter_preset_add.WAR3_OT_emitter_preset_add,
-    WAR3_OT_add_anim_sequence.WAR3_OT_add_anim_sequence,
-    WAR3_MT_emitter_presets.WAR3_MT_emitter_presets,
-    WAR3_UL_sequence_list,
-    WAR3_UL_material_layer_list,
-    WAR3_PT_sequences_panel,
-    WAR3_PT_event_panel,
-    WAR3_PT_billboard_panel,
-    WAR3_PT_material_panel,
-    WAR3_PT_particle_editor_panel,
-    WAR3_PT_light_panel
-)
+if bpy is not None:
+    classes = (
+        War3MaterialLayerProperties.War3MaterialLayerProperties,
+        War3EventProperties.War3EventProperties,
+        War3SequenceProperties.War3SequenceProperties,
+        War3BillboardProperties.War3BillboardProperties,
+        War3ParticleSystemProperties.War3ParticleSystemProperties,
+        War3LightSettings.War3LightSettings,
+        WAR3_OT_export_mdl.WAR3_OT_export_mdl,
+        WAR3_OT_import_mdl.WAR3_OT_import_mdl,
+        WAR3_OT_search_event_type.WAR3_OT_search_event_type,
+        WAR3_OT_search_event_id.WAR3_OT_search_event_id,
+        WAR3_OT_search_texture.WAR3_OT_search_texture,
+        WAR3_OT_create_eventobject.WAR3_OT_create_eventobject,
+        WAR3_OT_create_collision_shape.WAR3_OT_create_collision_shape,
+        WAR3_OT_material_list_action.WAR3_OT_material_list_action,
+        WAR3_OT_emitter_preset_add.WAR3_OT_emitter_preset_add,
+        WAR3_OT_add_anim_sequence.WAR3_OT_add_anim_sequence,
+        WAR3_MT_emitter_presets.WAR3_MT_emitter_presets,
+        WAR3_UL_sequence_list,
+        WAR3_UL_material_layer_list,
+        WAR3_PT_sequences_panel,
+        WAR3_PT_event_panel,
+        WAR3_PT_billboard_panel,
+        WAR3_PT_material_panel,
+        WAR3_PT_particle_editor_panel,
+        WAR3_PT_light_panel
+    )
 
 
 def menu_func(self, context):
     self.layout.operator_context = 'INVOKE_DEFAULT'
     self.layout.operator(WAR3_OT_export_mdl.WAR3_OT_export_mdl.bl_idname, text="Warcraft MDL (.mdl)")
+    op = self.layout.operator(WAR3_OT_export_mdl.WAR3_OT_export_mdl.bl_idname, text="Warcraft MDX (.mdx)")
+    op.file_format = 'MDX'
+
+
+def menu_func_import(self, context):
+    self.layout.operator(WAR3_OT_import_mdl.WAR3_OT_import_mdl.bl_idname, text="Warcraft MDL (.mdl)")
 
 
 def register():
@@ -153,6 +167,7 @@ def register():
         register_class(cls)
         
     bpy.types.TOPBAR_MT_file_export.append(menu_func)
+    bpy.types.TOPBAR_MT_file_import.append(menu_func_import)
     
     presets_path = os.path.join(bpy.utils.user_resource('SCRIPTS', path="presets"), "mdl_exporter")
     emitters_path = os.path.join(presets_path, "emitters")
@@ -170,6 +185,7 @@ def unregister():
         unregister_class(cls)
         
     bpy.types.TOPBAR_MT_file_export.remove(menu_func)
+    bpy.types.TOPBAR_MT_file_import.remove(menu_func_import)
 
 
 if __name__ == "__main__":
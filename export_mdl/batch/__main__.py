@@ -0,0 +1,3 @@
+from .run_batch import main
+
+main()
@@ -0,0 +1,34 @@
+# Runs inside "blender --background <file.blend> --python blender_worker.py -- <job>", started by run_batch.
+# The job is a JSON object with the output path, the format and the export settings.
+import json
+import os
+import sys
+import time
+
+import bpy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import export_mdl
+from export_mdl.batch.run_batch import result_prefix
+from export_mdl.classes.War3ExportSettings import War3ExportSettings
+
+
+def export_job(job):
+    # Blender was started with --factory-startup, so the add-on's properties still need registering
+    export_mdl.register()
+
+    settings = War3ExportSettings.from_dict(job['settings'])
+    start = time.perf_counter()
+    if job['format'] == 'MDX':
+        from export_mdl.export_mdl import export_mdx
+        profile = export_mdx.save(None, bpy.context, settings, filepath=job['output'], mdx_version=800)
+    else:
+        from export_mdl.export_mdl import export_mdl as export_mdl_text
+        profile = export_mdl_text.save(None, bpy.context, settings, filepath=job['output'], mdl_version=800)
+
+    # The profile is only there if the settings turned on profile_export
+    print(result_prefix + json.dumps({'export_seconds': time.perf_counter() - start, 'profile': profile}))
+
+
+export_job(json.loads(sys.argv[sys.argv.index('--') + 1]))
@@ -0,0 +1,186 @@
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Exports many .blend files by running one "blender --background" process per file, a few at a time.
+# Doesn't import bpy, so it runs from a plain Python:
+#   python -m export_mdl.batch manifest.json [--report report.json] [--workers 4] [--force]
+#
+# The manifest is a JSON object:
+#   {
+#       "blender": "blender",           # Blender executable, defaults to "blender"
+#       "workers": 4,                   # Defaults to the number of CPUs
+#       "timeout": 600,                 # Seconds per file, defaults to no limit
+#       "format": "MDX",                # MDL or MDX, defaults to MDL
+#       "output_dir": "out",            # Defaults to next to each .blend file
+#       "settings": {"optimize_animation": true},  # Named like the export operator's properties
+#       "files": ["units/footman.blend", {"blend": "units/knight.blend", "output": "out/knight.mdx", "settings": {}}]
+#   }
+# Relative paths are relative to the manifest. Per-file settings are applied over the shared ones.
+#
+# The report lists the status and timing of every file. Files whose .blend, settings, format and exporter
+# code are unchanged since the last report, and whose output still exists, are skipped.
+
+package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+worker_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'blender_worker.py')
+result_prefix = "MDL_BATCH_RESULT "
+
+
+def hash_file(path, digest):
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+
+
+def get_exporter_hash():
+    # A new version of the exporter can change the output of every file
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(package_dir):
+        dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+        for name in sorted(files):
+            if name.endswith('.py'):
+                path = os.path.join(root, name)
+                digest.update(os.path.relpath(path, package_dir).encode())
+                hash_file(path, digest)
+    return digest.hexdigest()
+
+
+def load_manifest(manifest_path):
+    with open(manifest_path) as file:
+        manifest = json.load(file)
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    output_dir = manifest.get('output_dir')
+    file_format = manifest.get('format', 'MDL').upper()
+    if file_format not in {'MDL', 'MDX'}:
+        raise ValueError("Unknown format: %s" % file_format)
+
+    jobs = []
+    for entry in manifest['files']:
+        if isinstance(entry, str):
+            entry = {'blend': entry}
+        blend = os.path.join(base_dir, entry['blend'])
+        output = entry.get('output')
+        if output is None:
+            name = os.path.splitext(os.path.basename(blend))[0] + '.' + file_format.lower()
+            output = os.path.join(base_dir, output_dir, name) if output_dir else os.path.join(os.path.dirname(blend), name)
+        else:
+            output = os.path.join(base_dir, output)
+
+        jobs.append({
+            'blend': os.path.normpath(blend),
+            'output': os.path.normpath(output),
+            'format': 'MDX' if output.lower().endswith('.mdx') else 'MDL',
+            'settings': dict(manifest.get('settings', {}), **entry.get('settings', {})),
+        })
+    return manifest, jobs
+
+
+def get_blend_hash(job, previous):
+    # Reuses the last hash while the file's size and modification time are unchanged
+    stat = os.stat(job['blend'])
+    job['blend_size'] = stat.st_size
+    job['blend_mtime'] = stat.st_mtime_ns
+    if previous is not None and previous.get('blend_size') == stat.st_size and previous.get('blend_mtime') == stat.st_mtime_ns:
+        return previous['blend_hash']
+
+    digest = hashlib.sha256()
+    hash_file(job['blend'], digest)
+    return digest.hexdigest()
+
+
+def get_fingerprint(job, exporter_hash):
+    inputs = [job['blend_hash'], job['format'], job['settings'], exporter_hash]
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+
+def run_job(job, blender, timeout):
+    os.makedirs(os.path.dirname(job['output']), exist_ok=True)
+    worker_job = {key: job[key] for key in ('output', 'format', 'settings')}
+    command = [blender, '--background', '--factory-startup', job['blend'],
+               '--python-exit-code', '1', '--python', worker_path, '--', json.dumps(worker_job)]
+
+    result = {'status': 'failed', 'error': None, 'export_seconds': None}
+    start = time.perf_counter()
+    try:
+        process = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True,
+                                 timeout=timeout)
+    except subprocess.TimeoutExpired:
+        result['error'] = "Timed out after %ss" % timeout
+    except OSError as e:
+        result['error'] = str(e)
+    else:
+        for line in process.stdout.splitlines():
+            if line.startswith(result_prefix):
+                result.update(json.loads(line[len(result_prefix):]))
+        if process.returncode == 0 and result['export_seconds'] is not None:
+            result['status'] = 'ok'
+        else:
+            # The end of Blender's output has the traceback
+            result['error'] = "\n".join(process.stdout.splitlines()[-20:])
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def run_batch(manifest_path, report_path, workers=None, force=False):
+    manifest, jobs = load_manifest(manifest_path)
+    blender = manifest.get('blender', 'blender')
+    timeout = manifest.get('timeout')
+    workers = workers or manifest.get('workers') or os.cpu_count() or 1
+
+    previous_entries = {}
+    if os.path.exists(report_path):
+        with open(report_path) as file:
+            for entry in json.load(file)['files']:
+                previous_entries[(entry['blend'], entry['output'])] = entry
+
+    exporter_hash = get_exporter_hash()
+    pending = []
+    for job in jobs:
+        previous = previous_entries.get((job['blend'], job['output']))
+        if not os.path.exists(job['blend']):
+            job.update(status='failed', error="File not found", seconds=0)
+            continue
+        job['blend_hash'] = get_blend_hash(job, previous)
+        job['fingerprint'] = get_fingerprint(job, exporter_hash)
+        if not force and previous is not None and previous['status'] in {'ok', 'skipped'} \
+                and previous['fingerprint'] == job['fingerprint'] and os.path.exists(job['output']):
+            job.update(status='skipped', error=None, seconds=0)
+        else:
+            pending.append(job)
+
+    start = time.perf_counter()
+    print("Exporting %d of %d files with %d workers" % (len(pending), len(jobs), workers))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # The threads only wait on the Blender processes
+        for job, result in zip(pending, pool.map(lambda j: run_job(j, blender, timeout), pending)):
+            job.update(result)
+            print("%s: %s (%.1fs)" % (job['status'], job['blend'], job['seconds']))
+
+    report = {
+        'manifest': os.path.abspath(manifest_path),
+        'seconds': time.perf_counter() - start,
+        'counts': {status: sum(job['status'] == status for job in jobs) for status in ('ok', 'skipped', 'failed')},
+        'files': jobs,
+    }
+    with open(report_path, 'w') as file:
+        json.dump(report, file, indent=2)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export .blend files to MDL/MDX with background Blender processes")
+    parser.add_argument('manifest', help="JSON file listing the .blend files and settings")
+    parser.add_argument('--report', help="Where to write the JSON report, defaults to next to the manifest")
+    parser.add_argument('--workers', type=int, help="Number of Blender processes to run at once")
+    parser.add_argument('--force', action='store_true', help="Export all files, even unchanged ones")
+    args = parser.parse_args()
+
+    report_path = args.report or os.path.splitext(args.manifest)[0] + '_report.json'
+    report = run_batch(args.manifest, report_path, args.workers, args.force)
+    print("%(ok)d exported, %(skipped)d unchanged, %(failed)d failed" % report['counts'])
+    raise SystemExit(1 if report['counts']['failed'] else 0)
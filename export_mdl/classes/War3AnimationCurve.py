@@ -1,49 +1,78 @@
-import math
+import numpy as np
+from typing import TYPE_CHECKING, Union, Tuple, Dict, Set
 
-import bpy
-from mathutils import Euler
-from typing import Union, Tuple, Dict, Set
+from .. import profiling
+from .animation_curve_utils.sample_fcurves import KeyframeArrays, sample_fcurves, BEZIER, CONSTANT
+from .utils.euler_to_quaternions import euler_to_quaternions
+from .utils.reduce_keyframes import reduce_keyframes
 
-from .utils.split_segment import split_segment
+if TYPE_CHECKING:
+    import bpy
 
 
 class War3AnimationCurve:
-    def __init__(self, fcurves: Dict[Tuple[str, int], Union[int, bpy.types.FCurve]], data_path: str, sequences, scale=1):
+    def __init__(self, fcurves: Dict[Tuple[str, int], Union[int, 'bpy.types.FCurve']], data_path: str, sequences, f2ms,
+                 scale=1):
         frames: Set[float] = set()
 
         self.interpolation = 'Linear'
         self.global_sequence = -1
         self.type = 'Default'
+        self.fingerprint = None  # Content hash, computed by finalize() once the keyframes are final
 
         self.set_type(data_path)
 
-        f2ms = 1000 / bpy.context.scene.render.fps
+        keys = sorted(fcurves.keys(), key=lambda x: x[1])
+        channels = [fcurves[key] for key in keys]
+        keyframe_arrays = [KeyframeArrays(fcurve) for fcurve in channels]
 
-        self.parse_fcurve_values(f2ms, fcurves, frames, sequences)
+        self.parse_fcurve_values(f2ms, channels, keyframe_arrays, frames, sequences)
 
         if len(frames) <= 1:
             self.interpolation = 'Linear'
 
         self.add_start_and_end_frames(f2ms, frames, sequences)
 
-        self.keyframes = {}
+        # The sampled curve, before any transform_vec/transform_rot is applied to the keyframe dicts below
+        self.frame_array = np.array(sorted(frames), dtype=np.float64)
+        profiling.count('keyframes sampled', len(self.frame_array))
+        self.value_array, self.handle_left_array, self.handle_right_array = \
+            self.interpret_fcurves(data_path, channels, keyframe_arrays, self.frame_array, scale)
+
+        frame_list = self.frame_array.tolist()
+        self.keyframes = dict(zip(frame_list, map(tuple, self.value_array.tolist())))
         self.handles_right = {}
         self.handles_left = {}
-        self.curves = []
-
-        for frame in frames:
-            values = []
-            handle_left = []
-            handle_right = []
-
-            values, handle_left, handle_right = self.interpret_fcurves(data_path, fcurves, frame, scale)
-
-            self.rotation_is_quaternation(data_path, frame, values)
-
-            self.set_handles(data_path, frame, handle_left, handle_right)
+        if self.interpolation == 'Bezier':
+            self.handles_left = dict(zip(frame_list, map(tuple, self.handle_left_array.tolist())))
+            self.handles_right = dict(zip(frame_list, map(tuple, self.handle_right_array.tolist())))
+
+    @classmethod
+    def from_samples(cls, data_path: str, frames, values):
+        # A linear curve through values that were sampled rather than read from fcurves, e.g. a baked pose
+        curve = cls.__new__(cls)
+        curve.interpolation = 'Linear'
+        curve.global_sequence = -1
+        curve.type = 'Default'
+        curve.fingerprint = None
+        curve.set_type(data_path)
+
+        curve.frame_array = np.asarray(frames, dtype=np.float64)
+        curve.value_array = np.asarray(values, dtype=np.float64).reshape(len(curve.frame_array), -1)
+        profiling.count('keyframes sampled', len(curve.frame_array))
+        curve.handle_left_array = curve.handle_right_array = curve.value_array[:0]
+
+        curve.keyframes = dict(zip(curve.frame_array.tolist(), map(tuple, curve.value_array.tolist())))
+        curve.handles_left = {}
+        curve.handles_right = {}
+        return curve
 
     def __eq__(self, other):
         if isinstance(self, other.__class__):
+            if self is other:
+                return True
+            if hash(self) != hash(other):
+                return False
             if self.interpolation != other.interpolation:
                 return False
             if self.global_sequence != other.global_sequence:
@@ -59,51 +88,41 @@ class War3AnimationCurve:
         return not self.__eq__(other)
 
     def __hash__(self):
+        # Hashing on demand would let a later transform_vec/transform_rot leave a stale hash behind
+        if self.fingerprint is None:
+            raise ValueError("Animation curve hashed before finalize()")
+        return self.fingerprint
+
+    def finalize(self):
+        # Computes the fingerprint, once every transform has been applied to the keyframes. Changing them
+        # afterwards requires another finalize(); optimize clears the fingerprint until then.
         values = [self.interpolation, self.global_sequence, self.type]
         values.append(tuple(sorted(self.keyframes.items())))
         values.append(tuple(sorted(self.handles_left.items())))
         values.append(tuple(sorted(self.handles_right.items())))
-        return hash(tuple(values))
+        self.fingerprint = hash(tuple(values))
+        return self
 
-    def set_handles(self, data_path, frame, handle_left, handle_right):
+    def interpret_fcurves(self, data_path: str, channels, keyframe_arrays, frames, scale):
+        # Values and (for Bezier curves) the handles of all channels at all frames, sampled in one go
+        sample_frames = frames
         if self.interpolation == 'Bezier':
-            if 'rotation' in data_path and 'quaternion' not in data_path:
-                self.handles_left[frame] = tuple(Euler(math.radians(x) for x in handle_left).to_quaternion())
-                self.handles_right[frame] = tuple(Euler(math.radians(x) for x in handle_right).to_quaternion())
-            else:
-                self.handles_left[frame] = tuple(handle_right)
-                self.handles_right[frame] = tuple(handle_right)
-
-    def rotation_is_quaternation(self, data_path, frame: float, values):
+            sample_frames = np.concatenate((frames, frames - 1, frames + 1))
+
+        samples = sample_fcurves(channels, keyframe_arrays, sample_frames) * scale
+
+        if 'color' in data_path:
+            samples = samples[:, ::-1]  # Colors are stored in reverse
+
+        if 'hide_render' in data_path:
+            samples = 1 - samples  # Hide_Render is the opposite of visibility!
+
         if 'rotation' in data_path and 'quaternion' not in data_path:  # Warcraft 3 only uses quaternions!
-            self.keyframes[frame] = tuple(Euler(values).to_quaternion())
-        else:
-            self.keyframes[frame] = tuple(values)
-
-    def interpret_fcurves(self, data_path: str,
-                          fcurves: Dict[Tuple[str, int], Union[int, bpy.types.FCurve]],
-                          frame: float, scale):
-        values = []
-        handle_left = []
-        handle_right = []
-        keys = fcurves.keys()
-        keys = sorted(keys, key=lambda x: x[1])
-        for key in keys:
-            self.curves.append(fcurves[key])
-            value = fcurves[key].evaluate(frame)
-            values.append(value * scale)
-
-            if 'color' in data_path:
-                values = values[::-1]  # Colors are stored in reverse
-
-            if 'hide_render' in data_path:
-                values = [1 - v for v in values]  # Hide_Render is the opposite of visibility!
-
-            if self.interpolation == 'Bezier':
-                h_left = fcurves[key].evaluate(frame - 1)
-                h_right = fcurves[key].evaluate(frame + 1)
-                handle_left.append(h_left)
-                handle_right.append(h_right)
+            samples = euler_to_quaternions(samples)
+
+        values = samples[:len(frames)]
+        handle_left = samples[len(frames):2 * len(frames)]
+        handle_right = samples[2 * len(frames):]
         return values, handle_left, handle_right
 
     def add_start_and_end_frames(self, f2ms: float, frames: Set[float], sequences):
@@ -131,49 +150,68 @@ class War3AnimationCurve:
         if self.type == 'Boolean' or self.type == 'Event':
             self.interpolation = 'DontInterp'
 
-    def parse_fcurve_values(self, f2ms: float, fcurves: Dict[Tuple[str, int], Union[int, bpy.types.FCurve]],
-                            frames: Set[float], sequences):
-        for fcurve in fcurves.values():
-            if len(fcurve.keyframe_points):
-                if fcurve.keyframe_points[0].interpolation == 'BEZIER' and self.type != 'Rotation':
+    def parse_fcurve_values(self, f2ms: float, channels, keyframe_arrays, frames: Set[float], sequences):
+        for fcurve, keys in zip(channels, keyframe_arrays):
+            if len(keys.interpolation):
+                if keys.interpolation[0] == BEZIER and self.type != 'Rotation':
                     # Nonlinear interpolation for rotations is disabled for now
                     self.interpolation = 'Bezier'
-                elif fcurve.keyframe_points[0].interpolation == 'CONSTANT':
+                elif keys.interpolation[0] == CONSTANT:
                     self.interpolation = 'DontInterp'
 
             for mod in fcurve.modifiers:
                 if mod.type == 'CYCLES':
                     self.global_sequence = max(self.global_sequence, int(fcurve.range()[1] * f2ms))
 
-            for keyframe in fcurve.keyframe_points:
-                frame: float = keyframe.co[0] * f2ms
-                for sequence in sequences:
-                    if (sequence.start <= frame <= sequence.end) or self.global_sequence > 0:
-                        frames.add(keyframe.co[0])
-                        break
-
-    def optimize(self, tolerance, sequences):
-
-        f2ms = 1000 / bpy.context.scene.render.fps
-
-        if self.interpolation == 'Bezier':
-            self.interpolation = 'Linear'  # This feature doesn't support bezier as of right now
-
-        print('Before: %d' % len(self.keyframes))
-
-        new_keys = []
-        for sequence in sequences:
-            start = int(round(sequence.start / f2ms))
-            end = int(round(sequence.end / f2ms))
-            new_keys += [(start, self.keyframes[start]), (end, self.keyframes[end])]
-            new_keys += split_segment(self.keyframes, self.type, (start, self.keyframes[start]),
-                                     (end, self.keyframes[end]), tolerance)
-
-        self.keyframes.clear()
-        self.keyframes.update(new_keys)
-        print('After: %d' % len(self.keyframes))
-
-    def get_wc3_animation_curve(anim_data, data_path, num_indices, sequences, scale=1):
+            key_frames = keys.co[:, 0]
+            times = key_frames * f2ms
+            in_sequence = np.zeros(len(times), dtype=bool)
+            for sequence in sequences:
+                in_sequence |= ((sequence.start <= times) & (times <= sequence.end)) | (self.global_sequence > 0)
+            frames.update(key_frames[in_sequence].tolist())
+
+    def optimize(self, tolerance, sequences, f2ms):
+        # The tolerance is one value, one per channel, or a dict of either by curve type. Curve types missing from
+        # the dict are left as they are.
+        if isinstance(tolerance, dict):
+            if self.type not in tolerance:
+                return
+            tolerance = tolerance[self.type]
+        keyframe_count = len(self.keyframes)
+
+        frames = sorted(self.keyframes.keys())
+        times = np.array(frames, dtype=np.float64)
+        values = np.array([self.keyframes[frame] for frame in frames], dtype=np.float64)
+        handles_left = handles_right = None
+        if self.interpolation in {'Bezier', 'Hermite'}:
+            handles_left = np.array([self.handles_left[frame] for frame in frames], dtype=np.float64)
+            handles_right = np.array([self.handles_right[frame] for frame in frames], dtype=np.float64)
+
+        # Sequence start and end frames are always kept, keyframes outside of the sequences are dropped
+        if self.global_sequence > 0:
+            ranges = [(times[0], times[-1])] if len(times) else []
+        else:
+            ranges = [(int(round(sequence.start / f2ms)), int(round(sequence.end / f2ms))) for sequence in sequences]
+
+        keep = set()
+        for start, end in ranges:
+            inside = np.flatnonzero((times >= start) & (times <= end))
+            if len(inside):
+                kept = reduce_keyframes(times[inside], values[inside], self.type, tolerance, self.interpolation,
+                                        None if handles_left is None else handles_left[inside],
+                                        None if handles_right is None else handles_right[inside])
+                keep.update(inside[kept].tolist())
+
+        kept_frames = [frames[i] for i in sorted(keep)]
+        for keys in (self.keyframes, self.handles_left, self.handles_right):
+            if len(keys):
+                new_keys = [(frame, keys[frame]) for frame in kept_frames]
+                keys.clear()
+                keys.update(new_keys)
+        self.fingerprint = None
+        profiling.count('keyframes removed', keyframe_count - len(self.keyframes))
+
+    def get_wc3_animation_curve(anim_data, data_path, num_indices, sequences, f2ms, scale=1):
         curves = {}
 
         if anim_data and anim_data.action:
@@ -185,5 +223,5 @@ class War3AnimationCurve:
                     # Hence, the split returns the name after the last dot.
 
         if len(curves):
-            return War3AnimationCurve(curves, data_path, sequences, scale)
+            return War3AnimationCurve(curves, data_path, sequences, f2ms, scale)
         return None
@@ -0,0 +1,9 @@
+class War3Camera:
+    # A camera as written to the model, already converted to model space
+    def __init__(self, name, position, target, field_of_view, far_clip, near_clip):
+        self.name = name
+        self.position = position
+        self.target = target
+        self.field_of_view = field_of_view
+        self.far_clip = far_clip
+        self.near_clip = near_clip
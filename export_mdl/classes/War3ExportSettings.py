@@ -1,3 +1,5 @@
+import math
+
 from mathutils import Matrix
 
 
@@ -9,3 +11,36 @@ class War3ExportSettings:
         self.optimize_tolerance = 0.05
         self.use_actions = False
         self.use_skinweights = False
+        self.shortest_floats = False
+        self.bake_animation = False
+        self.weld_vertices = False
+        self.weld_distance = 0.001
+        self.weld_angle = math.radians(1)  # Between normals, in radians
+        self.weld_uv_distance = 0.001
+        self.profile_export = False
+        self.profile_sidecar = False  # Also save the profile as JSON next to the exported file
+
+    @classmethod
+    def from_dict(cls, values):
+        # Settings from plain values, named like the export operator's properties.
+        # Used by the operator and by the batch exporter, which has no operator to read them from.
+        from bpy_extras.io_utils import axis_conversion
+
+        settings = cls()
+        settings.global_matrix = axis_conversion(
+            to_forward=values.get('axis_forward', 'Y'),
+            to_up=values.get('axis_up', 'Z'),
+        ).to_4x4() @ Matrix.Scale(values.get('global_scale', 1), 4)
+
+        for name, value in values.items():
+            if name in {'axis_forward', 'axis_up', 'global_scale'}:
+                continue
+            if name == 'global_matrix' or not hasattr(settings, name):
+                raise ValueError("Unknown export setting: %s" % name)
+            setattr(settings, name, value)
+
+        if settings.bake_animation and settings.use_actions:
+            # Baking steps through the sequence frames with each armature's current action, while action
+            # sequences are spaced out over a timeline no single action plays
+            raise ValueError("Bake Armatures can't be combined with Use Actions")
+        return settings
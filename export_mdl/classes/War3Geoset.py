@@ -1,17 +1,20 @@
-from typing import TextIO, List, Dict
+from typing import TextIO, List, Dict, Tuple
 
 from .War3Vertex import War3Vertex
+from ..formatting import format_block
 from ..utils import f2s, calc_bounds_radius
 
 
 class War3Geoset:
     def __init__(self):
         self.vertices: List[War3Vertex] = []
+        self.vertex_map: Dict[War3Vertex, int] = {}
         self.triangles: [float] = []
-        self.matrices: List[List[str]] = []
-        self.skin_matrices = []
-        self.skin_weights = []
+        self.matrices: List[Tuple[str, ...]] = []
+        self.matrix_map: Dict[Tuple[str, ...], int] = {}
+        self.bone_matrices: Dict[str, List[int]] = {}  # Bone name -> indices of the matrices that use it
         self.objects = []
+        self.welded_vertices = 0  # Nearly identical vertices merged into others by the optional welding
         self.min_extent = None
         self.max_extent = None
         self.mat_name = None
@@ -29,55 +32,71 @@ class War3Geoset:
         # return hash(tuple(sorted(self.__dict__.items())))
         return hash((self.mat_name, hash(self.geoset_anim)))  # Different geoset anims should split geosets
 
-    def write_geoset(self, fw: TextIO.write, material_names, sequences, object_indices: Dict[str, int], settings):
+    def add_vertex(self, vertex: War3Vertex) -> int:
+        index = self.vertex_map.get(vertex)
+        if index is None:
+            index = len(self.vertices)
+            self.vertex_map[vertex] = index
+            self.vertices.append(vertex)
+        return index
+
+    def add_matrix(self, groups, bone_geosets: Dict[str, List['War3Geoset']] = None) -> int:
+        # Parents may be handed over as blender objects, but matrices always refer to bones by name.
+        # bone_geosets is the model's reverse index, updated with every bone this geoset starts using.
+        matrix = tuple(getattr(g, 'name', g) for g in groups)
+        index = self.matrix_map.get(matrix)
+        if index is None:
+            index = len(self.matrices)
+            self.matrix_map[matrix] = index
+            self.matrices.append(matrix)
+            for bone in matrix:
+                if bone not in self.bone_matrices and bone_geosets is not None:
+                    bone_geosets.setdefault(bone, []).append(self)
+                self.bone_matrices.setdefault(bone, []).append(index)
+        return index
+
+    def write_geoset(self, fw: TextIO.write, material_ids, sequences, object_indices: Dict[str, int], settings,
+                     float_mode='FIXED'):
         fw("Geoset {\n")
         # Vertices
         fw("\tVertices %d {\n" % len(self.vertices))
-        for vertex in self.vertices:
-            fw("\t\t{%s, %s, %s},\n" % tuple(map(f2s, vertex.pos)))
+        fw(format_block("\t\t{%s, %s, %s},\n", [vertex.pos for vertex in self.vertices], float_mode))
         fw("\t}\n")
         # Normals
         fw("\tNormals %d {\n" % len(self.vertices))
-        for vertex in self.vertices:
-            fw("\t\t{%s, %s, %s},\n" % tuple(map(f2s, vertex.normal)))
+        fw(format_block("\t\t{%s, %s, %s},\n", [vertex.normal for vertex in self.vertices], float_mode))
         fw("\t}\n")
 
         # TVertices
         fw("\tTVertices %d {\n" % len(self.vertices))
-        for vertex in self.vertices:
-            fw("\t\t{%s, %s},\n" % tuple(map(f2s, vertex.uv)))
+        fw(format_block("\t\t{%s, %s},\n", [vertex.uv for vertex in self.vertices], float_mode))
         fw("\t}\n")
 
         # VertexGroups
         fw("\tVertexGroup {\n")
 
         if not settings.use_skinweights:
-            for vertex in self.vertices:
-                fw("\t\t%d,\n" % vertex.matrix)
+            fw(format_block("\t\t%d,\n", [(vertex.matrix,) for vertex in self.vertices]))
         fw("\t}\n")
 
-        sorted_dict = {}
-        if settings.use_skinweights:
-            skin_groups = {}
-            for name in object_indices:
-                skin_groups[object_indices[name]] = name
-            for index in range(0, len(skin_groups)):
-                sorted_dict[skin_groups[index]] = index
-
         if settings.use_skinweights:
             # Tangents
             fw("\tTangents %d {\n" % len(self.vertices))
+            lines = []
             for vertex in self.vertices:
                 # fw("\t\t{%s, %s, %s, -1},\n" % tuple(map(f2s, vertex[1])))
                 tangents = tuple(map(f2s, vertex.normal)) + tuple({str(sum(vertex.normal) / abs(sum(vertex.normal)))})
-                fw("\t\t{%s, %s, %s, %s},\n" % tuple(tangents))
+                lines.append("\t\t{%s, %s, %s, %s},\n" % tuple(tangents))
+            fw("".join(lines))
             fw("\t}\n")
-            # SkinWeights
+            # SkinWeights, whose bones are indices into the matrices
             fw("\tSkinWeights %d {\n" % len(self.vertices))
+            lines = []
             for vertex in self.vertices:
-                bones = tuple((sorted_dict[name] for name in vertex.bone_list)) + tuple([0, 0, 0, 0])
-                fw("\t\t%s, %s, %s, %s, " % bones[0:4])
-                fw("%s, %s, %s, %s,\n" % tuple(vertex.weight_list))
+                bones = tuple(self.matrix_map[(name,)] for name in vertex.bone_list or ()) + tuple([0, 0, 0, 0])
+                lines.append("\t\t%s, %s, %s, %s, " % bones[0:4])
+                lines.append("%s, %s, %s, %s,\n" % (tuple(vertex.weight_list or ()) + (0, 0, 0, 0))[0:4])
+            fw("".join(lines))
             fw("\t}\n")
 
         # Faces
@@ -89,11 +108,7 @@ class War3Geoset:
         # for triangle in self.triangles:
         #     fw(" %d, %d, %d," % triangle[:])
 
-        all_triangles = []
-        for triangle in self.triangles:
-            for index in triangle:
-                all_triangles.append(str(index))
-        fw(", ".join(all_triangles))
+        fw(", ".join(str(index) for triangle in self.triangles for index in triangle))
         # fw("\t\t\t},\n")
         fw("},\n")
         fw("\t\t}\n")
@@ -103,18 +118,10 @@ class War3Geoset:
         # fw("\t\t}\n")
         fw("\t}\n")
 
-        if settings.use_skinweights:
-            fw("\tGroups %d %d {\n" % (len(self.skin_matrices), sum(len(mtrx) for mtrx in self.skin_matrices)))
-            i = 0
-            for matrix in self.skin_matrices:
-                fw("\t\tMatrices {%s},\n" % ','.join(str(i) for _ in matrix))
-                i = i+1
-            fw("\t}\n")
-        else:
-            fw("\tGroups %d %d {\n" % (len(self.matrices), sum(len(mtrx) for mtrx in self.matrices)))
-            for matrix in self.matrices:
-                fw("\t\tMatrices {%s},\n" % ','.join(str(object_indices[g]) for g in matrix))
-            fw("\t}\n")
+        fw("\tGroups %d %d {\n" % (len(self.matrices), sum(len(mtrx) for mtrx in self.matrices)))
+        for matrix in self.matrices:
+            fw("\t\tMatrices {%s},\n" % ','.join(str(object_indices[g]) for g in matrix))
+        fw("\t}\n")
 
         fw("\tMinimumExtent {%s, %s, %s},\n" % tuple(map(f2s, self.min_extent)))
         fw("\tMaximumExtent {%s, %s, %s},\n" % tuple(map(f2s, self.max_extent)))
@@ -130,6 +137,6 @@ class War3Geoset:
 
             fw("\t}\n")
 
-        fw("\tMaterialID %d,\n" % material_names.index(self.mat_name))
+        fw("\tMaterialID %d,\n" % material_ids[self.mat_name])
 
         fw("}\n")
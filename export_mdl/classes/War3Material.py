@@ -49,12 +49,12 @@ class War3Material:
             layer.no_depth_set = layer_settings.no_depth_set
             layer.alpha_value = layer_settings.alpha
             layer.alpha_anim = get_wc3_animation_curve(mat.animation_data, 'mdl_layers[%d].alpha' % i, 1,
-                                                       model.sequences)  # get_curve(mat, {'mdl_layers[%d].alpha' % i})
+                                                       model.sequences, model.f2ms)  # get_curve(mat, {'mdl_layers[%d].alpha' % i})
 
             if mat.use_nodes:
                 uv_node = mat.node_tree.nodes.get(layer_settings.name)
                 if uv_node is not None and mat.node_tree.animation_data is not None:
-                    layer.texture_anim = War3TextureAnim.get(mat.node_tree.animation_data, uv_node, model.sequences)
+                    layer.texture_anim = War3TextureAnim.get(mat.node_tree.animation_data, uv_node, model.sequences, model.f2ms)
                     if layer.texture_anim is not None:
                         register_global_sequence(model.global_seqs, layer.texture_anim.translation)
                         register_global_sequence(model.global_seqs, layer.texture_anim.rotation)
@@ -1,12 +1,14 @@
 from collections import defaultdict
-from typing import List, Dict
-
-import bpy
+from types import MappingProxyType
+from typing import List, Dict, TYPE_CHECKING
 
 from .War3Geoset import War3Geoset
 from .War3GeosetAnim import War3GeosetAnim
-from .War3Material import War3Material
-from .War3Object import War3Object
+
+if TYPE_CHECKING:  # The writers use War3Model, and must not need bpy
+    import bpy
+    from .War3Material import War3Material
+    from .War3Object import War3Object
 
 
 class War3Model:
@@ -14,7 +16,7 @@ class War3Model:
     default_texture = "Textures\white.blp"
     decimal_places = 5
 
-    def __init__(self, context: bpy.context):
+    def __init__(self, context: 'bpy.types.Context' = None):
         self.objects = defaultdict(set)
         self.objects_all: List[War3Object] = []
         self.object_indices: Dict[str, int] = {}
@@ -22,6 +24,7 @@ class War3Model:
         self.geoset_map = {}
         self.geoset_anims: [War3GeosetAnim] = []
         self.geoset_anim_map = {}
+        self.bone_geosets: Dict[str, List[War3Geoset]] = {}  # Bone name -> geosets with matrices that use it
         self.materials: [War3Material] = []
         self.sequences = []
         self.global_extents_min = 0
@@ -32,5 +35,17 @@ class War3Model:
         self.textures = []
         self.tvertex_anims = []
 
-        self.f2ms = 1000 / context.scene.render.fps  # Frame to millisecond conversion
-        self.name = bpy.path.basename(context.blend_data.filepath).replace(".blend", "")
+        # Positions in the lists above, filled in by build_id_tables once the model is complete
+        self.texture_ids = MappingProxyType({})
+        self.material_ids = MappingProxyType({})
+        self.geoset_ids = MappingProxyType({})
+        self.geoset_anim_ids = MappingProxyType({})
+        self.tvertex_anim_ids = MappingProxyType({})
+        self.global_seq_ids = MappingProxyType({})
+
+        self.f2ms = 1000 / 30  # Frame to millisecond conversion
+        self.name = ""
+        if context is not None:  # Models loaded from an intermediate file have no scene
+            import bpy
+            self.f2ms = 1000 / context.scene.render.fps
+            self.name = bpy.path.basename(context.blend_data.filepath).replace(".blend", "")
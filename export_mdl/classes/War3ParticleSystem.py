@@ -11,7 +11,7 @@ class War3ParticleSystem(War3Object):
         settings = obj.particle_systems[0].settings
 
         self.emitter = settings.mdl_particle_sys
-        self.scale_anim = get_wc3_animation_curve(obj.animation_data, 'scale', 2, model.sequences)
+        self.scale_anim = get_wc3_animation_curve(obj.animation_data, 'scale', 2, model.sequences, model.f2ms)
         register_global_sequence(model.global_seqs, self.scale_anim)
 
         self.emission_rate_anim = None
@@ -27,29 +27,29 @@ class War3ParticleSystem(War3Object):
         # Animated properties
 
         if settings.animation_data is not None:
-            self.emission_rate_anim = get_wc3_animation_curve(settings.animation_data, 'mdl_particle_sys.emission_rate', 1, model.sequences)
+            self.emission_rate_anim = get_wc3_animation_curve(settings.animation_data, 'mdl_particle_sys.emission_rate', 1, model.sequences, model.f2ms)
             register_global_sequence(model.global_seqs, self.emission_rate_anim)
 
-            self.speed_anim = get_wc3_animation_curve(settings.animation_data, 'mdl_particle_sys.speed', 1, model.sequences)
+            self.speed_anim = get_wc3_animation_curve(settings.animation_data, 'mdl_particle_sys.speed', 1, model.sequences, model.f2ms)
             register_global_sequence(model.global_seqs, self.speed_anim)
 
-            self.life_span_anim = get_wc3_animation_curve(settings.animation_data, 'mdl_particle_sys.life_span', 1, model.sequences)
+            self.life_span_anim = get_wc3_animation_curve(settings.animation_data, 'mdl_particle_sys.life_span', 1, model.sequences, model.f2ms)
             register_global_sequence(model.global_seqs, self.life_span_anim)
 
-            self.gravity_anim = get_wc3_animation_curve(settings.animation_data, 'mdl_particle_sys.gravity', 1, model.sequences)
+            self.gravity_anim = get_wc3_animation_curve(settings.animation_data, 'mdl_particle_sys.gravity', 1, model.sequences, model.f2ms)
             register_global_sequence(model.global_seqs, self.gravity_anim)
 
-            self.variation_anim = get_wc3_animation_curve(settings.animation_data, 'mdl_particle_sys.variation', 1, model.sequences)
+            self.variation_anim = get_wc3_animation_curve(settings.animation_data, 'mdl_particle_sys.variation', 1, model.sequences, model.f2ms)
             register_global_sequence(model.global_seqs, self.variation_anim)
 
-            self.latitude_anim = get_wc3_animation_curve(settings.animation_data, 'mdl_particle_sys.latitude', 1, model.sequences)
+            self.latitude_anim = get_wc3_animation_curve(settings.animation_data, 'mdl_particle_sys.latitude', 1, model.sequences, model.f2ms)
             register_global_sequence(model.global_seqs, self.latitude_anim)
 
-            self.longitude_anim = get_wc3_animation_curve(settings.animation_data, 'mdl_particle_sys.longitude', 1, model.sequences)
+            self.longitude_anim = get_wc3_animation_curve(settings.animation_data, 'mdl_particle_sys.longitude', 1, model.sequences, model.f2ms)
             register_global_sequence(model.global_seqs, self.longitude_anim)
 
-            self.alpha_anim = get_wc3_animation_curve(settings.animation_data, 'mdl_particle_sys.alpha', 1, model.sequences)
+            self.alpha_anim = get_wc3_animation_curve(settings.animation_data, 'mdl_particle_sys.alpha', 1, model.sequences, model.f2ms)
             register_global_sequence(model.global_seqs, self.alpha_anim)
 
-            self.ribbon_color_anim = get_wc3_animation_curve(settings.animation_data, 'mdl_particle_sys.ribbon_color', 3, model.sequences)
+            self.ribbon_color_anim = get_wc3_animation_curve(settings.animation_data, 'mdl_particle_sys.ribbon_color', 3, model.sequences, model.f2ms)
             register_global_sequence(model.global_seqs, self.ribbon_color_anim)
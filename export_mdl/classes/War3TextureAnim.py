@@ -28,16 +28,16 @@ class War3TextureAnim:
         return hash((hash(self.translation), hash(self.rotation), hash(self.scale)))
 
     @staticmethod
-    def get(anim_data, uv_node, sequences):
+    def get(anim_data, uv_node, sequences, f2ms):
         anim = War3TextureAnim()
         if anim_data.action:
             if len(uv_node.inputs) > 1: # 2.81 Mapping Node
-                anim.translation = get_wc3_animation_curve(anim_data, 'nodes["%s"].inputs["Location"].default_value' % uv_node.name, 3, sequences)
-                anim.rotation = get_wc3_animation_curve(anim_data, 'nodes["%s"].inputs["Rotation"].default_value' % uv_node.name, 3, sequences)
-                anim.scale = get_wc3_animation_curve(anim_data, 'nodes["%s"].inputs["Scale"].default_value' % uv_node.name, 3, sequences)
+                anim.translation = get_wc3_animation_curve(anim_data, 'nodes["%s"].inputs["Location"].default_value' % uv_node.name, 3, sequences, f2ms)
+                anim.rotation = get_wc3_animation_curve(anim_data, 'nodes["%s"].inputs["Rotation"].default_value' % uv_node.name, 3, sequences, f2ms)
+                anim.scale = get_wc3_animation_curve(anim_data, 'nodes["%s"].inputs["Scale"].default_value' % uv_node.name, 3, sequences, f2ms)
             else:
-                anim.translation = get_wc3_animation_curve(anim_data, 'nodes["%s"].translation' % uv_node.name, 3, sequences)
-                anim.rotation = get_wc3_animation_curve(anim_data, 'nodes["%s"].rotation' % uv_node.name, 3, sequences)
-                anim.scale = get_wc3_animation_curve(anim_data, 'nodes["%s"].scale' % uv_node.name, 3, sequences)
+                anim.translation = get_wc3_animation_curve(anim_data, 'nodes["%s"].translation' % uv_node.name, 3, sequences, f2ms)
+                anim.rotation = get_wc3_animation_curve(anim_data, 'nodes["%s"].rotation' % uv_node.name, 3, sequences, f2ms)
+                anim.scale = get_wc3_animation_curve(anim_data, 'nodes["%s"].scale' % uv_node.name, 3, sequences, f2ms)
 
         return anim if any((anim.translation, anim.rotation, anim.scale)) else None
@@ -1,13 +1,12 @@
-class War3Vertex:
-    # def __init__(self, pos: [float], normal: [float], uv: [float], matrix, skin, tangent: [float]):
-    def __init__(self, pos: [float], normal: [float], uv: [float], matrix, bone_list, weight_list, tangent: [float]):
-        self.pos: [float] = pos
-        self.normal: [float] = normal
-        self.tangent: [float] = tangent
-        self.uv: [float] = uv
-        self.matrix = matrix
-        # self.skin = skin
-        self.bone_list = bone_list
-        self.weight_list = weight_list
-        # self.weight_list = []
-        # self.bone_list = []
+from typing import NamedTuple, Optional, Tuple
+
+
+class War3Vertex(NamedTuple):
+    # Hashable so that geosets can weld identical corners through a dictionary lookup
+    pos: Tuple[float, float, float]
+    normal: Tuple[float, float, float]
+    uv: Tuple[float, float]
+    matrix: Optional[int]
+    bone_list: Optional[Tuple[str, ...]]
+    weight_list: Optional[Tuple[int, ...]]
+    tangent: Optional[Tuple[float, ...]]
@@ -0,0 +1,31 @@
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import bpy
+
+# Fcurves of every action seen during an export, by action and data path, then by array index.
+# Built the first time an action is looked up, so actions shared between objects are only indexed once.
+action_indices = {}
+
+
+def clear_action_indices():
+    # Actions can be edited or removed between exports, so each export starts from scratch
+    action_indices.clear()
+
+
+def get_action_index(action: 'bpy.types.Action'):
+    key = action.as_pointer()
+    index = action_indices.get(key)
+    if index is None:
+        index = {}
+        for fcurve in action.fcurves:
+            index.setdefault(fcurve.data_path, {})[fcurve.array_index] = fcurve
+        action_indices[key] = index
+    return index
+
+
+def get_fcurves(anim_data: 'bpy.types.AnimData', data_path: str):
+    # The channels of data_path in the active action, by array index; empty if it isn't animated
+    if anim_data and anim_data.action:
+        return get_action_index(anim_data.action).get(data_path, {})
+    return {}
@@ -0,0 +1,18 @@
+from ... import profiling
+
+# Finalized curves of the current export. Identical tracks on different objects are replaced by a single
+# instance, so they are stored once and compare by identity.
+curve_registry = {}
+
+
+def clear_curve_registry():
+    curve_registry.clear()
+
+
+def intern_curve(curve):
+    if curve is None:
+        return None
+    interned = curve_registry.setdefault(curve.finalize(), curve)
+    if interned is not curve:
+        profiling.count('curves interned')
+    return interned
@@ -1,18 +1,24 @@
-import bpy
+from typing import TYPE_CHECKING
 
 from ..War3AnimationCurve import War3AnimationCurve
+from .action_index import get_fcurves
 
+if TYPE_CHECKING:
+    import bpy
 
-def get_wc3_animation_curve(anim_data: bpy.types.AnimData, data_path: str, num_indices: int, sequences, scale=1):
+
+def get_wc3_animation_curve(anim_data: 'bpy.types.AnimData', data_path: str, num_indices: int, sequences, f2ms,
+                            scale=1):
     curves = {}
 
-    if anim_data and anim_data.action:
+    channels = get_fcurves(anim_data, data_path)
+    if len(channels):
         for index in range(num_indices):
-            curve = anim_data.action.fcurves.find(data_path, index=index)
+            curve = channels.get(index)
             if curve is not None:
                 curves[(data_path.split('.')[-1], index)] = curve
                 # For now, i'm just interested in the type, not the whole data path. Hence, the split returns the name after the last dot.
 
     if len(curves):
-        return War3AnimationCurve(curves, data_path, sequences, scale)
+        return War3AnimationCurve(curves, data_path, sequences, f2ms, scale)
     return None
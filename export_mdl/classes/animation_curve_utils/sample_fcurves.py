@@ -0,0 +1,117 @@
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import bpy
+
+# Values of the keyframe interpolation enum, as returned by foreach_get
+CONSTANT = 0
+LINEAR = 1
+BEZIER = 2
+
+exact_threshold = 0.0001  # Frames this close to a keyframe get its exact value, like fcurve.evaluate does
+
+
+class KeyframeArrays:
+    # All keyframe points of an fcurve, read in bulk with foreach_get.
+    def __init__(self, fcurve: 'bpy.types.FCurve'):
+        points = fcurve.keyframe_points
+        count = len(points)
+
+        self.co = np.empty(count * 2, dtype=np.float32)
+        points.foreach_get('co', self.co)
+        self.co = self.co.reshape(count, 2).astype(np.float64)
+
+        self.handle_left = np.empty(count * 2, dtype=np.float32)
+        points.foreach_get('handle_left', self.handle_left)
+        self.handle_left = self.handle_left.reshape(count, 2).astype(np.float64)
+
+        self.handle_right = np.empty(count * 2, dtype=np.float32)
+        points.foreach_get('handle_right', self.handle_right)
+        self.handle_right = self.handle_right.reshape(count, 2).astype(np.float64)
+
+        self.interpolation = np.empty(count, dtype=np.int32)
+        points.foreach_get('interpolation', self.interpolation)
+
+
+def can_sample(fcurve, keys: KeyframeArrays):
+    # Modifiers, easing modes and linear extrapolation are left to fcurve.evaluate
+    return (len(keys.co) > 0 and len(fcurve.modifiers) == 0 and fcurve.extrapolation == 'CONSTANT'
+            and np.all(keys.interpolation <= BEZIER))
+
+
+def solve_bezier_x(x0, x1, x2, x3, x):
+    # The x coordinate of a segment is monotonic once the handles are corrected, so bisect for t
+    low = np.zeros_like(x)
+    high = np.ones_like(x)
+    for _ in range(40):
+        t = (low + high) * 0.5
+        s = 1 - t
+        too_far = s * s * s * x0 + 3 * s * s * t * x1 + 3 * s * t * t * x2 + t * t * t * x3 > x
+        high = np.where(too_far, t, high)
+        low = np.where(too_far, low, t)
+    return (low + high) * 0.5
+
+
+def evaluate_segments(keys: KeyframeArrays, frames):
+    xs = keys.co[:, 0]
+    ys = keys.co[:, 1]
+
+    values = np.empty(len(frames))
+    before = frames <= xs[0]
+    after = frames >= xs[-1]
+    values[before] = ys[0]
+    values[after] = ys[-1]
+
+    inside = ~(before | after)
+    f = frames[inside]
+    i = np.clip(np.searchsorted(xs, f, side='right') - 1, 0, len(xs) - 2)
+    mode = keys.interpolation[i]
+
+    x0, y0 = xs[i], ys[i]
+    x3, y3 = xs[i + 1], ys[i + 1]
+
+    result = y0.copy()  # CONSTANT
+    linear = mode == LINEAR
+    result[linear] = y0[linear] + (y3[linear] - y0[linear]) * (f[linear] - x0[linear]) / (x3[linear] - x0[linear])
+
+    bezier = mode == BEZIER
+    if bezier.any():
+        b = i[bezier]
+        p0 = keys.co[b]
+        p3 = keys.co[b + 1]
+        h1 = p0 - keys.handle_right[b]
+        h2 = p3 - keys.handle_left[b + 1]
+
+        # Scale the handles down if they overlap in time, same as Blender does before evaluating
+        length = p3[:, 0] - p0[:, 0]
+        handle_length = np.abs(h1[:, 0]) + np.abs(h2[:, 0])
+        fac = np.where(handle_length > length, length / np.where(handle_length > 0, handle_length, 1), 1)
+        p1 = p0 - fac[:, None] * h1
+        p2 = p3 - fac[:, None] * h2
+
+        t = solve_bezier_x(p0[:, 0], p1[:, 0], p2[:, 0], p3[:, 0], f[bezier])
+        s = 1 - t
+        result[bezier] = s * s * s * p0[:, 1] + 3 * s * s * t * p1[:, 1] + 3 * s * t * t * p2[:, 1] + t * t * t * p3[:, 1]
+
+    # Exact hits return the keyframe value itself
+    nearest = np.clip(np.searchsorted(xs, f), 0, len(xs) - 1)
+    for candidate in (nearest, np.maximum(nearest - 1, 0)):
+        hit = np.abs(xs[candidate] - f) < exact_threshold
+        result[hit] = ys[candidate[hit]]
+
+    values[inside] = result
+    return values
+
+
+def sample_fcurves(fcurves, keyframe_arrays, frames):
+    # Evaluates every fcurve at every frame; returns an array of shape (frames, fcurves)
+    frames = np.asarray(frames, dtype=np.float64)
+    samples = np.empty((len(frames), len(fcurves)))
+    for channel, (fcurve, keys) in enumerate(zip(fcurves, keyframe_arrays)):
+        if can_sample(fcurve, keys):
+            samples[:, channel] = evaluate_segments(keys, frames)
+        else:
+            samples[:, channel] = [fcurve.evaluate(frame) for frame in frames.tolist()]
+    return samples
@@ -1,4 +1,5 @@
 import bpy
+import numpy as np
 from mathutils import Vector
 from typing import Tuple, Optional
 
@@ -7,6 +8,7 @@ from ..War3Model import War3Model
 from ..War3Object import War3Object
 from ..War3AnimationCurve import War3AnimationCurve
 from ..animation_curve_utils.get_wc3_animation_curve import get_wc3_animation_curve
+from .bake_armatures import get_bake_frames
 from .is_animated_ugg import is_animated_ugg
 from .get_visibility import get_visibility
 from .register_global_sequence import register_global_sequence
@@ -15,8 +17,11 @@ from ..utils.transform_vec import transform_vec
 
 
 def add_bones(war3_model: War3Model, billboard_lock: Tuple[bool, bool, bool],
-              billboarded: bool, bpy_obj: bpy.types.Object, parent: bpy.types.Object, settings: War3ExportSettings):
-    visibility = get_visibility(war3_model.sequences, bpy_obj)
+              billboarded: bool, bpy_obj: bpy.types.Object, parent: bpy.types.Object, settings: War3ExportSettings,
+              baked=None):
+    # Generator, yielding the fraction of bones done after each bone so that long exports can report progress.
+    # With bake_animation, baked holds the armature's tracks from bake_armatures.
+    visibility = get_visibility(war3_model.sequences, war3_model.f2ms, bpy_obj)
     anim_loc, anim_rot, anim_scale, is_animated = is_animated_ugg(war3_model, bpy_obj, settings)
     root = War3Object(bpy_obj.name)
 
@@ -53,7 +58,11 @@ def add_bones(war3_model: War3Model, billboard_lock: Tuple[bool, bool, bool],
     root.billboarded = billboarded
     root.billboard_lock = billboard_lock
     war3_model.objects['bone'].add(root)
-    for b in bpy_obj.pose.bones:
+
+    if settings.bake_animation:
+        frames = get_bake_frames(war3_model.sequences, war3_model.f2ms)
+
+    for index, b in enumerate(bpy_obj.pose.bones):
         bone = War3Object(b.name)
         if b.parent is not None:
             bone.parent = b.parent.name
@@ -62,25 +71,34 @@ def add_bones(war3_model: War3Model, billboard_lock: Tuple[bool, bool, bool],
 
         bone.pivot = bpy_obj.matrix_world @ Vector(b.bone.head_local)  # Armature space to world space
         bone.pivot = settings.global_matrix @ Vector(bone.pivot)  # Axis conversion
+
+        if settings.bake_animation:
+            bone.anim_loc = bone.anim_rot = bone.anim_scale = None
+            if baked is not None:
+                add_baked_curves(war3_model, bone, bpy_obj, b, frames, [track[:, index] for track in baked], settings)
+            war3_model.objects['bone'].add(bone)
+            yield (index + 1) / len(bpy_obj.pose.bones)
+            continue
+
         data_path = 'pose.bones[\"' + b.name + '\"].%s'
 
-        bone.anim_loc = get_wc3_animation_curve(bpy_obj.animation_data, data_path % 'location', 3, war3_model.sequences)
+        bone.anim_loc = get_wc3_animation_curve(bpy_obj.animation_data, data_path % 'location', 3, war3_model.sequences, war3_model.f2ms)
         # get_curves(obj, data_path % 'location', (0, 1, 2))
         if settings.optimize_animation and bone.anim_loc is not None:
-            bone.anim_loc.optimize(settings.optimize_tolerance, war3_model.sequences)
+            bone.anim_loc.optimize(settings.optimize_tolerance, war3_model.sequences, war3_model.f2ms)
 
-        bone.anim_rot = get_wc3_animation_curve(bpy_obj.animation_data, data_path % 'rotation_quaternion', 4, war3_model.sequences)
+        bone.anim_rot = get_wc3_animation_curve(bpy_obj.animation_data, data_path % 'rotation_quaternion', 4, war3_model.sequences, war3_model.f2ms)
         # get_curves(obj, data_path % 'rotation_quaternion', (0, 1, 2, 3))
         if bone.anim_rot is None:
-            bone.anim_rot = get_wc3_animation_curve(bpy_obj.animation_data, data_path % 'rotation_euler', 3, war3_model.sequences)
+            bone.anim_rot = get_wc3_animation_curve(bpy_obj.animation_data, data_path % 'rotation_euler', 3, war3_model.sequences, war3_model.f2ms)
 
         if settings.optimize_animation and bone.anim_rot is not None:
-            bone.anim_rot.optimize(settings.optimize_tolerance, war3_model.sequences)
+            bone.anim_rot.optimize(settings.optimize_tolerance, war3_model.sequences, war3_model.f2ms)
 
-        bone.anim_scale = get_wc3_animation_curve(bpy_obj.animation_data, data_path % 'scale', 3, war3_model.sequences)
+        bone.anim_scale = get_wc3_animation_curve(bpy_obj.animation_data, data_path % 'scale', 3, war3_model.sequences, war3_model.f2ms)
         # get_curves(obj, data_path % 'scale', (0, 1, 2))
         if settings.optimize_animation and bone.anim_scale is not None:
-            bone.anim_scale.optimize(settings.optimize_tolerance, war3_model.sequences)
+            bone.anim_scale.optimize(settings.optimize_tolerance, war3_model.sequences, war3_model.f2ms)
 
         register_global_sequence(war3_model.global_seqs, bone.anim_scale)
 
@@ -98,3 +116,28 @@ def add_bones(war3_model: War3Model, billboard_lock: Tuple[bool, bool, bool],
             register_global_sequence(war3_model.global_seqs, bone.anim_rot)
 
         war3_model.objects['bone'].add(bone)
+        yield (index + 1) / len(bpy_obj.pose.bones)
+
+
+def add_baked_curves(war3_model: War3Model, bone: War3Object, bpy_obj: bpy.types.Object, b: bpy.types.PoseBone,
+                     frames, baked, settings: War3ExportSettings):
+    locations, rotations, scales = baked
+    m = bpy_obj.matrix_world @ b.bone.matrix_local
+
+    # Same transforms as transform_vec and transform_rot apply to fcurve based tracks, for all frames at once
+    loc_matrix = np.array((settings.global_matrix @ m.to_3x3().to_4x4()).to_3x3())
+    rot_matrix = np.array(settings.global_matrix.to_3x3().normalized() @ m.to_3x3().normalized())
+    locations = locations @ loc_matrix.T
+    rotations = np.concatenate((rotations[:, :1], rotations[:, 1:] @ rot_matrix.T), axis=1)
+
+    # Tracks that never leave the rest pose aren't written
+    if not np.allclose(locations, 0, atol=1e-6):
+        bone.anim_loc = War3AnimationCurve.from_samples('location', frames, locations)
+    if not np.allclose(np.abs(rotations[:, 0]), 1, atol=1e-6):
+        bone.anim_rot = War3AnimationCurve.from_samples('rotation_quaternion', frames, rotations)
+    if not np.allclose(scales, 1, atol=1e-6):
+        bone.anim_scale = War3AnimationCurve.from_samples('scale', frames, scales)
+
+    for curve in (bone.anim_loc, bone.anim_rot, bone.anim_scale):
+        if curve is not None and settings.optimize_animation:
+            curve.optimize(settings.optimize_tolerance, war3_model.sequences, war3_model.f2ms)
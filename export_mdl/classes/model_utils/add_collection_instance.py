@@ -0,0 +1,31 @@
+from mathutils import Matrix
+
+from ..War3Model import War3Model
+from .is_animated_ugg import is_animated_ugg
+from .make_mesh import make_mesh, create_bone_and_stuff
+from ... import profiling
+
+
+def add_collection_instance(war3_model: War3Model, billboard_lock, billboarded, context, mats, bpy_obj, parent,
+                            settings):
+    # The meshes of an empty's instanced collection, each placed where the instance shows it. They are attached
+    # to the empty's parent, or to a bone made for the empty if it is animated or has no parent.
+    anim_loc, anim_rot, anim_scale, is_animated = is_animated_ugg(war3_model, bpy_obj, settings)
+    parent = create_bone_and_stuff(anim_loc, anim_rot, anim_scale, None, billboard_lock, billboarded, None,
+                                   is_animated, bpy_obj, parent, settings, war3_model)
+
+    for instanced_obj, matrix_world in get_instanced_objects(bpy_obj.instance_collection, bpy_obj.matrix_world):
+        profiling.count('instanced meshes')
+        make_mesh(war3_model, billboard_lock, billboarded, context, mats, instanced_obj, parent, settings,
+                  matrix_world)
+
+
+def get_instanced_objects(collection, matrix_world):
+    # The mesh and curve objects of the collection and its children, with their place in the scene.
+    # Collections instanced inside the collection are expanded as well.
+    matrix_world = matrix_world @ Matrix.Translation(-collection.instance_offset)
+    for bpy_obj in collection.all_objects:
+        if bpy_obj.type in ('MESH', 'CURVE'):
+            yield bpy_obj, matrix_world @ bpy_obj.matrix_world
+        elif bpy_obj.type == 'EMPTY' and bpy_obj.instance_type == 'COLLECTION' and bpy_obj.instance_collection:
+            yield from get_instanced_objects(bpy_obj.instance_collection, matrix_world @ bpy_obj.matrix_world)
@@ -13,7 +13,7 @@ from ..utils.transform_vec import transform_vec
 
 
 def add_empties_animations(war3_model: War3Model, billboard_lock, billboarded, bpy_obj, parent, settings):
-    visibility = get_visibility(war3_model.sequences, bpy_obj)
+    visibility = get_visibility(war3_model.sequences, war3_model.f2ms, bpy_obj)
     anim_loc, anim_rot, anim_scale, is_animated = is_animated_ugg(war3_model, bpy_obj, settings)
     if bpy_obj.name.startswith("SND") or bpy_obj.name.startswith("UBR") or bpy_obj.name.startswith(
             "FTP") or bpy_obj.name.startswith("SPL"):
@@ -21,7 +21,7 @@ def add_empties_animations(war3_model: War3Model, billboard_lock, billboarded, b
         eventobj.pivot = settings.global_matrix @ Vector(bpy_obj.location)
 
         for datapath in ('["event_track"]', '["eventtrack"]', '["EventTrack"]'):
-            eventobj.track = get_wc3_animation_curve(bpy_obj.animation_data, datapath, 1, war3_model.sequences)
+            eventobj.track = get_wc3_animation_curve(bpy_obj.animation_data, datapath, 1, war3_model.sequences, war3_model.f2ms)
             # get_curve(obj, ['["eventtrack"]', '["EventTrack"]', '["event_track"]'])
 
             if eventobj.track is not None:
@@ -11,7 +11,7 @@ from ..utils.transform_vec import transform_vec
 
 
 def add_particle_systems(war3_model: War3Model, billboard_lock, billboarded, mats, bpy_obj, parent, settings):
-    visibility = get_visibility(war3_model.sequences, bpy_obj)
+    visibility = get_visibility(war3_model.sequences, war3_model.f2ms, bpy_obj)
     anim_loc, anim_rot, anim_scale, is_animated = is_animated_ugg(war3_model, bpy_obj, settings)
     data = bpy_obj.particle_systems[0].settings
 
@@ -55,6 +55,6 @@ def add_particle_systems(war3_model: War3Model, billboard_lock, billboarded, mat
         else:
             # Add the material to the list, in case it's unused
             mat = particle_sys.emitter.ribbon_material
-            mats.add(mat)
+            mats.setdefault(mat)
 
             war3_model.objects['ribbon'].add(particle_sys)
@@ -0,0 +1,32 @@
+import numpy as np
+
+
+def add_vertex_groups(bpy_obj, geoset):
+    # Vertex groups from the geoset's matrices, or from its skin weights, whose bones are indices into the
+    # matrices. Vertices are added to a group in one call per weight, with the vertices of each (bone, weight)
+    # found in one sort rather than one pass over the vertices per weight.
+    groups = {}
+
+    def add(bone, indices, weight):
+        if bone not in groups:
+            groups[bone] = bpy_obj.vertex_groups.new(name=bone)
+        groups[bone].add(indices.tolist(), weight, 'REPLACE')
+
+    if geoset.skin_weights is not None:
+        names = dict((i, matrix[0]) for i, matrix in enumerate(geoset.matrices) if len(matrix))
+        skin = geoset.skin_weights.astype(np.int64)
+        for slot in range(4):
+            bones, weights = skin[:, slot], skin[:, slot + 4]
+            used = np.flatnonzero(np.isin(bones, list(names)) & (weights > 0))
+            keys, key_ids = np.unique(bones[used] * 256 + weights[used], return_inverse=True)
+            key_ids = key_ids.reshape(-1)
+            vertices = used[np.argsort(key_ids, kind='stable')]
+            ends = np.cumsum(np.bincount(key_ids, minlength=len(keys)))
+            for key, indices in zip(keys.tolist(), np.split(vertices, ends[:-1])):
+                add(names[key // 256], indices, (key % 256) / 255)
+    else:
+        for index, matrix in enumerate(geoset.matrices):
+            indices = np.flatnonzero(geoset.vertex_groups == index)
+            if len(indices):
+                for bone in matrix:
+                    add(bone, indices, 1 / len(matrix))
@@ -0,0 +1,80 @@
+import bpy
+import numpy as np
+
+
+def get_bake_frames(sequences, f2ms):
+    frames = set()
+    for sequence in sequences:
+        frames.update(range(int(round(sequence.start / f2ms)), int(round(sequence.end / f2ms)) + 1))
+    return np.array(sorted(frames), dtype=np.int64)
+
+
+def matrices_to_quaternions(matrices):
+    # Rotation matrices of shape (..., 3, 3) to WXYZ quaternions of shape (..., 4)
+    m = matrices
+    trace = m[..., 0, 0] + m[..., 1, 1] + m[..., 2, 2]
+    candidates = np.stack((
+        np.stack((1 + trace, m[..., 2, 1] - m[..., 1, 2], m[..., 0, 2] - m[..., 2, 0], m[..., 1, 0] - m[..., 0, 1]), -1),
+        np.stack((m[..., 2, 1] - m[..., 1, 2], 1 + m[..., 0, 0] - m[..., 1, 1] - m[..., 2, 2], m[..., 0, 1] + m[..., 1, 0], m[..., 0, 2] + m[..., 2, 0]), -1),
+        np.stack((m[..., 0, 2] - m[..., 2, 0], m[..., 0, 1] + m[..., 1, 0], 1 - m[..., 0, 0] + m[..., 1, 1] - m[..., 2, 2], m[..., 1, 2] + m[..., 2, 1]), -1),
+        np.stack((m[..., 1, 0] - m[..., 0, 1], m[..., 0, 2] + m[..., 2, 0], m[..., 1, 2] + m[..., 2, 1], 1 - m[..., 0, 0] - m[..., 1, 1] + m[..., 2, 2]), -1),
+    ), -2)
+    # Use whichever form has the largest (and so the best conditioned) leading term
+    best = np.argmax(np.stack((trace, m[..., 0, 0], m[..., 1, 1], m[..., 2, 2]), -1), axis=-1)
+    quats = np.take_along_axis(candidates, best[..., None, None], axis=-2)[..., 0, :]
+    quats /= np.linalg.norm(quats, axis=-1, keepdims=True)
+    return quats
+
+
+def bake_armatures(armatures, frames):
+    # Steps the scene through the frames once and reads the evaluated pose of every bone of every armature, so
+    # constraints, IK and drivers end up in the tracks. Returns, per armature name, the local (basis) location,
+    # WXYZ rotation and scale of every bone at every frame, in arrays of shape (frames, bones, 3 or 4).
+    scene = bpy.context.scene
+    poses = [np.empty((len(frames), len(bpy_obj.pose.bones) * 16), dtype=np.float32) for bpy_obj in armatures]
+    current_frame = scene.frame_current
+    try:
+        for i, frame in enumerate(frames.tolist()):
+            scene.frame_set(frame)
+            for bpy_obj, armature_poses in zip(armatures, poses):
+                bpy_obj.pose.bones.foreach_get('matrix', armature_poses[i])
+    finally:
+        scene.frame_set(current_frame)
+    return {bpy_obj.name: poses_to_basis(bpy_obj, armature_poses) for bpy_obj, armature_poses in zip(armatures, poses)}
+
+
+def poses_to_basis(bpy_obj: bpy.types.Object, poses):
+    # The armature's pose matrices, as read by foreach_get, to the location, rotation and scale of each bone
+    pose_bones = bpy_obj.pose.bones
+    bone_count = len(pose_bones)
+    frame_count = len(poses)
+
+    rest = np.array([b.bone.matrix_local for b in pose_bones], dtype=np.float64).reshape(bone_count, 4, 4)
+
+    names = [b.name for b in pose_bones]
+    parents = np.array([names.index(b.parent.name) if b.parent is not None else -1 for b in pose_bones])
+    has_parent = parents >= 0
+
+    # The rest matrix of each bone relative to its parent's
+    rest_relative = rest.copy()
+    rest_relative[has_parent] = np.linalg.inv(rest[parents[has_parent]]) @ rest[has_parent]
+    rest_relative_inv = np.linalg.inv(rest_relative)
+
+    # foreach_get flattens matrices column by column
+    poses = poses.reshape(frame_count, bone_count, 4, 4).transpose(0, 1, 3, 2).astype(np.float64)
+
+    # pose = parent_pose @ rest_relative @ basis, solved for basis
+    parent_poses = np.broadcast_to(np.eye(4), poses.shape).copy()
+    parent_poses[:, has_parent] = poses[:, parents[has_parent]]
+    basis = rest_relative_inv @ np.linalg.inv(parent_poses) @ poses
+
+    locations = basis[..., :3, 3]
+    scales = np.linalg.norm(basis[..., :3, :3], axis=-2)
+    rotations = matrices_to_quaternions(basis[..., :3, :3] / np.where(scales > 0, scales, 1)[..., None, :])
+
+    # Keep consecutive quaternions in the same hemisphere, so the tracks don't take the long way around
+    flips = np.sum(rotations[1:] * rotations[:-1], axis=-1) < 0
+    signs = np.cumprod(np.where(flips, -1.0, 1.0), axis=0)
+    rotations[1:] *= signs[..., None]
+
+    return locations, rotations, scales
@@ -0,0 +1,20 @@
+from types import MappingProxyType
+
+from ..War3Model import War3Model
+
+
+def build_id_tables(war3_model: War3Model):
+    # Read-only maps from each item to its position in the model's lists, so the writers don't search the lists.
+    # Like list.index, the first occurrence wins.
+    def ids(items):
+        table = {}
+        for i, item in enumerate(items):
+            table.setdefault(item, i)
+        return MappingProxyType(table)
+
+    war3_model.texture_ids = ids(war3_model.textures)
+    war3_model.material_ids = ids(mat.name for mat in war3_model.materials)
+    war3_model.geoset_ids = ids(war3_model.geosets)
+    war3_model.geoset_anim_ids = ids(war3_model.geoset_anims)
+    war3_model.tvertex_anim_ids = ids(war3_model.tvertex_anims)
+    war3_model.global_seq_ids = ids(war3_model.global_seqs)
@@ -0,0 +1,12 @@
+from mathutils import Vector
+
+from ..War3Camera import War3Camera
+
+
+def create_camera(bpy_obj, settings):
+    position = settings.global_matrix @ Vector(bpy_obj.location)
+    matrix = settings.global_matrix @ bpy_obj.matrix_world
+    target = position + matrix.to_quaternion() @ Vector((0.0, 0.0, -1.0))  # Target is just a point in front of the camera
+
+    return War3Camera(bpy_obj.name, tuple(position), tuple(target), bpy_obj.data.angle,
+                      bpy_obj.data.clip_end * 10, bpy_obj.data.clip_start * 10)
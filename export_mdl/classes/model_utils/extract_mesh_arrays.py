@@ -0,0 +1,59 @@
+import bpy
+import numpy as np
+
+
+class MeshArrays:
+    # Flat copies of the mesh data that make_mesh needs, read in bulk with foreach_get.
+    def __init__(self):
+        self.positions = None  # (vertices, 3) float32
+        self.tri_vertices = None  # (triangles, 3) int32
+        self.tri_loops = None  # (triangles, 3) int32
+        self.tri_split_normals = None  # (triangles, 3, 3) float32, the normal of each triangle corner
+        self.tri_materials = None  # (triangles,) int32
+        self.loop_uvs = None  # (loops, 2) float32, None if the mesh has no uv layer
+        # Vertex group weights, vertex by vertex: the number each vertex has, and their group indices and weights
+        self.group_counts = None  # (vertices,) int32
+        self.group_indices = None  # (weights,) int32
+        self.group_weights = None  # (weights,) float32
+
+
+def extract_mesh_arrays(bpy_mesh: bpy.types.Mesh) -> MeshArrays:
+    arrays = MeshArrays()
+
+    num_verts = len(bpy_mesh.vertices)
+    num_tris = len(bpy_mesh.loop_triangles)
+
+    arrays.positions = np.empty(num_verts * 3, dtype=np.float32)
+    bpy_mesh.vertices.foreach_get('co', arrays.positions)
+    arrays.positions.shape = (num_verts, 3)
+
+    arrays.tri_vertices = np.empty(num_tris * 3, dtype=np.int32)
+    bpy_mesh.loop_triangles.foreach_get('vertices', arrays.tri_vertices)
+    arrays.tri_vertices.shape = (num_tris, 3)
+
+    arrays.tri_loops = np.empty(num_tris * 3, dtype=np.int32)
+    bpy_mesh.loop_triangles.foreach_get('loops', arrays.tri_loops)
+    arrays.tri_loops.shape = (num_tris, 3)
+
+    # Split normals: the face normal on flat faces, and with auto smooth, sharp edges or custom normals,
+    # different normals on either side of an edge
+    arrays.tri_split_normals = np.empty(num_tris * 9, dtype=np.float32)
+    bpy_mesh.loop_triangles.foreach_get('split_normals', arrays.tri_split_normals)
+    arrays.tri_split_normals.shape = (num_tris, 3, 3)
+
+    arrays.tri_materials = np.empty(num_tris, dtype=np.int32)
+    bpy_mesh.loop_triangles.foreach_get('material_index', arrays.tri_materials)
+
+    if len(bpy_mesh.uv_layers):
+        num_loops = len(bpy_mesh.loops)
+        arrays.loop_uvs = np.empty(num_loops * 2, dtype=np.float32)
+        bpy_mesh.uv_layers.active.data.foreach_get('uv', arrays.loop_uvs)
+        arrays.loop_uvs.shape = (num_loops, 2)
+
+    # Vertex groups have no foreach_get, so they are gathered in one pass over the vertices instead
+    elements = [group for vert in bpy_mesh.vertices for group in vert.groups]
+    arrays.group_counts = np.fromiter((len(vert.groups) for vert in bpy_mesh.vertices), dtype=np.int32, count=num_verts)
+    arrays.group_indices = np.fromiter((group.group for group in elements), dtype=np.int32, count=len(elements))
+    arrays.group_weights = np.fromiter((group.weight for group in elements), dtype=np.float32, count=len(elements))
+
+    return arrays
@@ -8,43 +8,80 @@ from ..War3Material import War3Material
 from ..War3MaterialLayer import War3MaterialLayer
 from ..War3Model import War3Model
 from .add_bones import add_bones
+from .add_collection_instance import add_collection_instance
 from .add_empties_animations import add_empties_animations
 from .add_lights import add_lights
+from .bake_armatures import bake_armatures, get_bake_frames
 from .add_particle_systems import add_particle_systems
+from .build_id_tables import build_id_tables
+from .create_camera import create_camera
 from .create_collision_shapes import create_collision_shapes
 from .get_parent import get_parent
 from .get_sequences import get_sequences
 from .get_actions import get_actions
+from ..animation_curve_utils.action_index import clear_action_indices
+from ..animation_curve_utils.curve_registry import clear_curve_registry
 from ..animation_curve_utils.space_actions import space_actions
 from .get_visibility import get_visibility
+from .intern_model_curves import intern_model_curves
 from .make_mesh import make_mesh
 from .register_global_sequence import register_global_sequence
+from ... import profiling
 from ...utils import calc_extents
 
 
 def from_scene(war3_model: War3Model, context: bpy.context, settings: War3ExportSettings):
+    for _ in from_scene_steps(war3_model, context, settings):
+        pass
+
+
+def from_scene_steps(war3_model: War3Model, context: bpy.context, settings: War3ExportSettings):
+    # Reads the scene one object at a time (and one bone at a time for armatures),
+    # yielding the fraction of objects done after each step
 
     scene: bpy.types.Scene = context.scene
+    clear_action_indices()
+    clear_curve_registry()
 
-    if settings.use_actions:
-        war3_model.sequences = get_actions(war3_model.f2ms)
-        space_actions(war3_model.sequences)
-    else:
-        war3_model.sequences = get_sequences(war3_model.f2ms, scene)
+    with profiling.span("sequences"):
+        if settings.use_actions:
+            war3_model.sequences = get_actions(war3_model.f2ms)
+            space_actions(war3_model.sequences)
+        else:
+            war3_model.sequences = get_sequences(war3_model.f2ms, scene)
 
     # objects: List[bpy.types.Object] = []
     objects: Union[List[bpy.types.Object], bpy.types.bpy_prop_collection, bpy.types.SceneObjects] = []
-    materials = set()
+    materials = {}  # Used bpy materials, in order of first use so material ids don't depend on set order
 
     if settings.use_selection:
         objects = list(obj for obj in scene.objects if obj.select_get() and obj.visible_get())
     else:
         objects = list(obj for obj in scene.objects if obj.visible_get())
 
-    parse_bpy_objects(context, materials, objects, settings, war3_model)
+    # All armatures are baked in one pass over the frames, rather than one pass per armature
+    baked_armatures = {}
+    if settings.bake_animation:
+        frames = get_bake_frames(war3_model.sequences, war3_model.f2ms)
+        armatures = [obj for obj in objects if obj.type == 'ARMATURE']
+        if len(frames) and len(armatures):
+            with profiling.span("bake_armatures"):
+                baked_armatures = bake_armatures(armatures, frames)
+
+    with profiling.span("objects"):
+        for i, bpy_obj in enumerate(objects):
+            for fraction in parse_bpy_object(context, materials, bpy_obj, settings, war3_model, baked_armatures):
+                yield (i + fraction) / len(objects)
+            yield (i + 1) / len(objects)
 
     war3_model.geosets = list(war3_model.geoset_map.values())
-    war3_model.materials = [War3Material.get(mat, war3_model) for mat in materials]
+    if settings.weld_vertices:
+        for i, geoset in enumerate(war3_model.geosets):
+            name = "geoset %d (%s)" % (i, geoset.mat_name)
+            profiling.count(name + ": vertices welded", geoset.welded_vertices)
+            profiling.count(name + ": vertices left", len(geoset.vertices))
+    with profiling.span("materials"):
+        war3_model.materials = [War3Material.get(mat, war3_model) for mat in materials]
 
     # Add default material if no other materials present
     if any((x for x in war3_model.geosets if x.mat_name == "default")):
@@ -53,14 +90,16 @@ def from_scene(war3_model: War3Model, context: bpy.context, settings: War3Export
         war3_model.materials.append(default_mat)
 
     war3_model.materials = sorted(war3_model.materials, key=lambda x: x.priority_plane)
+    with profiling.span("intern_curves"):
+        intern_model_curves(war3_model)
 
     layers = list(itertools.chain.from_iterable([material.layers for material in war3_model.materials]))
-    war3_model.textures = list(set((layer.texture for layer in layers)))
-    # Convert to set and back to list for unique entries
+    war3_model.textures = list(dict.fromkeys(layer.texture for layer in layers))
+    # Unique entries, in the order they are first used
 
     # Demote bones to helpers if they have no attached geosets
     for bone in war3_model.objects['bone']:
-        if not any([geoset for geoset in war3_model.geosets if bone.name in itertools.chain.from_iterable(geoset.matrices)]):
+        if bone.name not in war3_model.bone_geosets:
             war3_model.objects['helper'].add(bone)
 
     war3_model.objects['bone'] -= war3_model.objects['helper']
@@ -69,7 +108,7 @@ def from_scene(war3_model: War3Model, context: bpy.context, settings: War3Export
         if particle_sys.emitter.texture_path not in war3_model.textures:
             war3_model.textures.append(particle_sys.emitter.texture_path)
 
-    war3_model.tvertex_anims = list(set((layer.texture_anim for layer in layers if layer.texture_anim is not None)))
+    war3_model.tvertex_anims = list(dict.fromkeys(layer.texture_anim for layer in layers if layer.texture_anim is not None))
 
     vertices_all = []
 
@@ -97,7 +136,7 @@ def from_scene(war3_model: War3Model, context: bpy.context, settings: War3Export
             register_global_sequence(war3_model.global_seqs, geoset.geoset_anim.alpha_anim)
             register_global_sequence(war3_model.global_seqs, geoset.geoset_anim.color_anim)
 
-            for bone in itertools.chain.from_iterable(geoset.matrices):
+            for bone in geoset.bone_matrices:
                 war3_model.geoset_anim_map[bone] = geoset.geoset_anim
 
     # Account for particle systems when calculating bounds
@@ -105,48 +144,61 @@ def from_scene(war3_model: War3Model, context: bpy.context, settings: War3Export
         vertices_all.append(tuple(x + y/2 for x, y in zip(particle_sys.pivot, particle_sys.dimensions)))
         vertices_all.append(tuple(x - y/2 for x, y in zip(particle_sys.pivot, particle_sys.dimensions)))
 
-    war3_model.geoset_anims = list(set(g.geoset_anim for g in war3_model.geosets if g.geoset_anim is not None))
+    war3_model.geoset_anims = list(dict.fromkeys(g.geoset_anim for g in war3_model.geosets if g.geoset_anim is not None))
 
     war3_model.global_extents_min, war3_model.global_extents_max = calc_extents(vertices_all) if len(vertices_all) else ((0, 0, 0), (0, 0, 0))
     war3_model.global_seqs = sorted(war3_model.global_seqs)
+    build_id_tables(war3_model)
 
 
-def parse_bpy_objects(context, materials,
-                      objects: Union[List[bpy.types.Object], bpy.types.bpy_prop_collection, bpy.types.SceneObjects],
-                      settings: War3ExportSettings, war3_model: War3Model):
-    for bpy_obj in objects:
-        parent: bpy.types.Object = get_parent(bpy_obj)
+def parse_bpy_object(context, materials, bpy_obj: bpy.types.Object, settings: War3ExportSettings, war3_model: War3Model,
+                     baked_armatures):
+    # Generator; only armatures yield, with the fraction of their bones done
+    parent: bpy.types.Object = get_parent(bpy_obj)
 
-        billboarded = False
-        billboard_lock = (False, False, False)
-        if hasattr(bpy_obj, "mdl_billboard"):
-            bb = bpy_obj.mdl_billboard
-            billboarded = bb.billboarded
-            billboard_lock = (bb.billboard_lock_z, bb.billboard_lock_y, bb.billboard_lock_x)
-            # NOTE: Axes are listed backwards (same as with colors)
+    billboarded = False
+    billboard_lock = (False, False, False)
+    if hasattr(bpy_obj, "mdl_billboard"):
+        bb = bpy_obj.mdl_billboard
+        billboarded = bb.billboarded
+        billboard_lock = (bb.billboard_lock_z, bb.billboard_lock_y, bb.billboard_lock_x)
+        # NOTE: Axes are listed backwards (same as with colors)
 
-        # Animations
-        visibility = get_visibility(war3_model.sequences, bpy_obj)
+    # Animations
+    visibility = get_visibility(war3_model.sequences, war3_model.f2ms, bpy_obj)
 
-        # Particle Systems
-        if len(bpy_obj.particle_systems):
+    # Particle Systems
+    if len(bpy_obj.particle_systems):
+        with profiling.span("add_particle_systems"):
             add_particle_systems(war3_model, billboard_lock, billboarded, materials, bpy_obj, parent, settings)
 
-        # Collision Shapes
-        elif bpy_obj.type == 'EMPTY' and bpy_obj.name.startswith('Collision'):
+    # Collision Shapes
+    elif bpy_obj.type == 'EMPTY' and bpy_obj.name.startswith('Collision'):
+        with profiling.span("create_collision_shapes"):
             create_collision_shapes(war3_model, bpy_obj, parent, settings)
 
-        elif bpy_obj.type == 'MESH' or bpy_obj.type == 'CURVE':
+    elif bpy_obj.type == 'MESH' or bpy_obj.type == 'CURVE':
+        with profiling.span("make_mesh"):
             make_mesh(war3_model, billboard_lock, billboarded, context, materials, bpy_obj, parent, settings)
 
-        elif bpy_obj.type == 'EMPTY':
+    elif bpy_obj.type == 'EMPTY' and bpy_obj.instance_type == 'COLLECTION' and bpy_obj.instance_collection:
+        with profiling.span("add_collection_instance"):
+            add_collection_instance(war3_model, billboard_lock, billboarded, context, materials, bpy_obj, parent,
+                                    settings)
+
+    elif bpy_obj.type == 'EMPTY':
+        with profiling.span("add_empties_animations"):
             add_empties_animations(war3_model, billboard_lock, billboarded, bpy_obj, parent, settings)
 
-        elif bpy_obj.type == 'ARMATURE':
-            add_bones(war3_model, billboard_lock, billboarded, bpy_obj, parent, settings)
+    elif bpy_obj.type == 'ARMATURE':
+        with profiling.span("add_bones"):
+            yield from add_bones(war3_model, billboard_lock, billboarded, bpy_obj, parent, settings,
+                                 baked_armatures.get(bpy_obj.name))
 
-        elif bpy_obj.type in ('LAMP', 'LIGHT'):
+    elif bpy_obj.type in ('LAMP', 'LIGHT'):
+        with profiling.span("add_lights"):
             add_lights(war3_model, billboard_lock, billboarded, bpy_obj, settings)
 
-        elif bpy_obj.type == 'CAMERA':
-            war3_model.cameras.append(bpy_obj)
+    elif bpy_obj.type == 'CAMERA':
+        with profiling.span("create_camera"):
+            war3_model.cameras.append(create_camera(bpy_obj, settings))
@@ -0,0 +1,36 @@
+import bpy
+import numpy as np
+
+
+def geoset_to_mesh(geoset, name):
+    # A mesh with the geoset's triangles, UVs and normals, filled with foreach_set.
+    # geoset holds the arrays of read_mdl(build_geosets=False).
+    triangles = geoset.triangles.astype(np.int32)
+    corners = triangles.ravel()
+
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(geoset.positions))
+    mesh.vertices.foreach_set('co', geoset.positions.astype(np.float32).ravel())
+    mesh.loops.add(len(corners))
+    mesh.loops.foreach_set('vertex_index', corners)
+    mesh.polygons.add(len(triangles))
+    mesh.polygons.foreach_set('loop_start', np.arange(0, len(corners), 3, dtype=np.int32))
+    if not bpy.types.MeshPolygon.bl_rna.properties['loop_total'].is_readonly:  # Derived since Blender 4.0
+        mesh.polygons.foreach_set('loop_total', np.full(len(triangles), 3, dtype=np.int32))
+    mesh.polygons.foreach_set('use_smooth', np.ones(len(triangles), dtype=bool))
+
+    uvs = geoset.uvs[corners].astype(np.float32)
+    uvs[:, 1] = 1 - uvs[:, 1]  # The exporter flips them the same way
+    mesh.uv_layers.new().data.foreach_set('uv', uvs.ravel())
+
+    mesh.update()
+    mesh.validate(clean_customdata=False)
+
+    normals = geoset.normals.astype(np.float32)
+    lengths = np.linalg.norm(normals, axis=1)
+    if np.all(lengths > 0):
+        if hasattr(mesh, 'use_auto_smooth'):  # Needed for custom normals before Blender 4.1
+            mesh.use_auto_smooth = True
+        mesh.normals_split_custom_set_from_vertices(normals / lengths[:, None])
+    return mesh
+
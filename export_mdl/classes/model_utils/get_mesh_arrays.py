@@ -0,0 +1,75 @@
+from collections import Counter, OrderedDict
+
+import bpy
+from bpy.app.handlers import persistent
+
+from .extract_mesh_arrays import MeshArrays, extract_mesh_arrays
+from .mesh_fingerprint import mesh_fingerprint
+from .prepare_mesh import prepare_mesh
+from .transform_mesh_arrays import transform_mesh_arrays
+from ... import profiling
+
+# Fingerprint -> arrays of the mesh in local space, least recently used first. Kept until another .blend file is
+# loaded, or until the arrays are the least recently used once the cache is over its size limit. Objects that
+# share mesh data and modifiers, like linked duplicates and the objects of collection instances, share an entry.
+mesh_cache = OrderedDict()
+mesh_cache_limit = 256 * 1024 * 1024  # Bytes
+object_fingerprints = {}  # Object name -> fingerprint of its mesh in the last export
+fingerprint_users = Counter()  # Fingerprint -> number of objects in object_fingerprints with it
+
+
+def get_mesh_arrays(bpy_obj, context, matrix) -> MeshArrays:
+    # The arrays of the object's evaluated and triangulated mesh, transformed with the matrix. The mesh is only
+    # evaluated if no object with the same fingerprint has been, in this export or an earlier one.
+    with profiling.span("mesh_fingerprint"):
+        fingerprint = mesh_fingerprint(bpy_obj)
+    arrays = mesh_cache.get(fingerprint) if fingerprint is not None else None
+
+    if arrays is None:
+        with profiling.span("prepare_mesh"):
+            bpy_mesh = prepare_mesh(bpy_obj, context)
+        try:
+            with profiling.span("extract_mesh_arrays"):
+                arrays = extract_mesh_arrays(bpy_mesh)
+        finally:
+            # Also on errors, so a failed or cancelled export leaves no temporary meshes behind
+            bpy.data.meshes.remove(bpy_mesh)
+        if fingerprint is not None:
+            add_to_cache(fingerprint, arrays)
+    else:
+        mesh_cache.move_to_end(fingerprint)
+        profiling.count('meshes reused')
+
+    # Arrays no object uses anymore are dropped
+    old_fingerprint = object_fingerprints.pop(bpy_obj.name_full, None)
+    if fingerprint is not None:
+        object_fingerprints[bpy_obj.name_full] = fingerprint
+        fingerprint_users[fingerprint] += 1
+    if old_fingerprint is not None:
+        fingerprint_users[old_fingerprint] -= 1
+        if fingerprint_users[old_fingerprint] <= 0:
+            del fingerprint_users[old_fingerprint]
+            mesh_cache.pop(old_fingerprint, None)
+
+    with profiling.span("transform_mesh_arrays"):
+        return transform_mesh_arrays(arrays, matrix)
+
+
+def add_to_cache(fingerprint, arrays):
+    mesh_cache[fingerprint] = arrays
+    size = sum(arrays_size(cached) for cached in mesh_cache.values())
+    while size > mesh_cache_limit and len(mesh_cache) > 1:
+        _, dropped = mesh_cache.popitem(last=False)
+        size -= arrays_size(dropped)
+
+
+def arrays_size(arrays: MeshArrays):
+    return sum(array.nbytes for array in vars(arrays).values() if array is not None)
+
+
+@persistent
+def clear_mesh_cache(*args):
+    # The meshes of one .blend file are of no use for another
+    mesh_cache.clear()
+    object_fingerprints.clear()
+    fingerprint_users.clear()
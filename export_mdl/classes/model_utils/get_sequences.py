@@ -1,8 +1,10 @@
 from ..War3AnimationSequence import War3AnimationSequence
+from ...properties.War3SequenceProperties import update_marker_index
 
 
 def get_sequences(f2ms, scene):
     sequences = []
+    update_marker_index(scene)  # Markers may have moved without a depsgraph update
 
     for sequence in scene.mdl_sequences:
         sequences.append(War3AnimationSequence(sequence.name, sequence.start * f2ms, sequence.end * f2ms, sequence.non_looping, sequence.move_speed, sequence.rarity))
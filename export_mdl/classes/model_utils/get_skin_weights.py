@@ -0,0 +1,42 @@
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .extract_mesh_arrays import MeshArrays
+
+
+def get_skin_weights(arrays: 'MeshArrays', group_bones, max_bones=4, total=255):
+    # The max_bones largest bone weights of every vertex, as (vertices, max_bones) arrays of bones and of weights
+    # that add up to total. group_bones maps the object's vertex group indices to bones, -1 for the groups that
+    # aren't bones. Unused slots, and all slots of vertices without bone weights, have bone -1 and weight 0.
+    num_verts = len(arrays.group_counts)
+    vertices = np.repeat(np.arange(num_verts), arrays.group_counts)
+    group_bones = np.append(np.asarray(group_bones, dtype=np.int64), -1)  # Groups the object doesn't have are -1
+    bones = group_bones[np.minimum(arrays.group_indices, len(group_bones) - 1)]
+    weights = arrays.group_weights.astype(np.float64)
+    used = (bones >= 0) & (weights > 0)
+    vertices, bones, weights = vertices[used], bones[used], weights[used]
+
+    # Heaviest first within each vertex; the sort is stable, so equal weights keep the vertex's group order
+    order = np.lexsort((-weights, vertices))
+    vertices, bones, weights = vertices[order], bones[order], weights[order]
+    starts = np.searchsorted(vertices, vertices)
+    slots = np.arange(len(vertices)) - starts
+    kept = slots < max_bones
+
+    skin_bones = np.full((num_verts, max_bones), -1, dtype=np.int64)
+    skin_weights = np.zeros((num_verts, max_bones), dtype=np.float64)
+    skin_bones[vertices[kept], slots[kept]] = bones[kept]
+    skin_weights[vertices[kept], slots[kept]] = weights[kept]
+
+    # Largest remainder rounding: every weight is rounded down, and the units that are missing from the total go
+    # to the weights that lost the most. Unlike rounding each weight, the result always adds up to total.
+    sums = skin_weights.sum(axis=1, keepdims=True)
+    scaled = np.divide(skin_weights * total, sums, out=np.zeros_like(skin_weights), where=sums > 0)
+    quantized = np.floor(scaled)
+    missing = np.where(sums[:, 0] > 0, total - quantized.sum(axis=1), 0)
+    ranks = np.argsort(np.argsort(quantized - scaled, axis=1, kind='stable'), axis=1, kind='stable')
+    quantized += ranks < missing[:, None]
+    skin_bones[quantized == 0] = -1  # Weights too small to survive the rounding
+    return skin_bones, quantized.astype(np.int64)
@@ -0,0 +1,17 @@
+from ..War3AnimationCurve import War3AnimationCurve
+from ..War3Model import War3Model
+from ..animation_curve_utils.curve_registry import intern_curve
+
+
+def intern_model_curves(war3_model: War3Model):
+    # Once all tracks are transformed and optimized, swap every curve for its shared interned instance
+    holders = [obj for objects in war3_model.objects.values() for obj in objects]
+    holders += [geoset.geoset_anim for geoset in war3_model.geosets if geoset.geoset_anim is not None]
+    for material in war3_model.materials:
+        holders += material.layers
+        holders += [layer.texture_anim for layer in material.layers if layer.texture_anim is not None]
+
+    for holder in holders:
+        for attr, value in list(vars(holder).items()):
+            if isinstance(value, War3AnimationCurve):
+                setattr(holder, attr, intern_curve(value))
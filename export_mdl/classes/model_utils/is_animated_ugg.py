@@ -5,26 +5,26 @@ from ..animation_curve_utils.get_wc3_animation_curve import get_wc3_animation_cu
 
 def is_animated_ugg(war3_model: War3Model, obj, settings):
 # def is_animated_ugg(war3_model, obj, settings):
-    anim_loc = get_wc3_animation_curve(obj.animation_data, 'location', 3, war3_model.sequences)
+    anim_loc = get_wc3_animation_curve(obj.animation_data, 'location', 3, war3_model.sequences, war3_model.f2ms)
     # get_curves(obj, 'location', (0, 1, 2))
 
     if anim_loc is not None and settings.optimize_animation:
-        anim_loc.optimize(settings.optimize_tolerance, war3_model.sequences)
+        anim_loc.optimize(settings.optimize_tolerance, war3_model.sequences, war3_model.f2ms)
 
-    anim_rot = get_wc3_animation_curve(obj.animation_data, 'rotation_quaternion', 4, war3_model.sequences)
+    anim_rot = get_wc3_animation_curve(obj.animation_data, 'rotation_quaternion', 4, war3_model.sequences, war3_model.f2ms)
     # get_curves(obj, 'rotation_quaternion', (0, 1, 2, 3))
 
     if anim_rot is None:
-        anim_rot = get_wc3_animation_curve(obj.animation_data, 'rotation_euler', 3, war3_model.sequences)
+        anim_rot = get_wc3_animation_curve(obj.animation_data, 'rotation_euler', 3, war3_model.sequences, war3_model.f2ms)
 
     if anim_rot is not None and settings.optimize_animation:
-        anim_rot.optimize(settings.optimize_tolerance, war3_model.sequences)
+        anim_rot.optimize(settings.optimize_tolerance, war3_model.sequences, war3_model.f2ms)
 
-    anim_scale = get_wc3_animation_curve(obj.animation_data, 'scale', 3, war3_model.sequences)
+    anim_scale = get_wc3_animation_curve(obj.animation_data, 'scale', 3, war3_model.sequences, war3_model.f2ms)
     # get_curves(obj, 'scale', (0, 1, 2))
 
     if anim_scale is not None and settings.optimize_animation:
-        anim_scale.optimize(settings.optimize_tolerance, war3_model.sequences)
+        anim_scale.optimize(settings.optimize_tolerance, war3_model.sequences, war3_model.f2ms)
 
     is_animated = any((anim_loc, anim_rot, anim_scale))
     return anim_loc, anim_rot, anim_scale, is_animated
@@ -1,5 +1,5 @@
 import bpy
-from mathutils import Vector
+import numpy as np
 from typing import List
 
 # import export_mdl.classes.animation_curve_utils.get_wc3_animation_curve
@@ -10,19 +10,29 @@ from ..War3Model import War3Model
 from ..War3Vertex import War3Vertex
 from ..animation_curve_utils.get_wc3_animation_curve import get_wc3_animation_curve
 from .is_animated_ugg import is_animated_ugg
-from .prepare_mesh import prepare_mesh
+from .get_mesh_arrays import get_mesh_arrays
+from .get_skin_weights import get_skin_weights
+from .weld_vertices import weld_vertices
 from .create_bone import create_bone
 from .get_visibility import get_visibility
 from .register_global_sequence import register_global_sequence
 from ..utils.transform_rot import transform_rot
 from ..utils.transform_vec import transform_vec
-from ...utils import rnd
-
-
-def make_mesh(war3_model: War3Model, billboard_lock, billboarded, context, mats, bpy_obj, parent, settings):
-    visibility = get_visibility(war3_model.sequences, bpy_obj)
-    anim_loc, anim_rot, anim_scale, is_animated = is_animated_ugg(war3_model, bpy_obj, settings)
-    bpy_mesh = prepare_mesh(bpy_obj, context, settings.global_matrix @ bpy_obj.matrix_world)
+from ... import profiling
+from ...utils import rnd_array
+
+
+def make_mesh(war3_model: War3Model, billboard_lock, billboarded, context, mats, bpy_obj, parent, settings,
+              matrix_world=None):
+    # matrix_world is given for the objects of collection instances. Those are placed with it, and follow the
+    # parent given for the instance instead of being animated themselves.
+    visibility = get_visibility(war3_model.sequences, war3_model.f2ms, bpy_obj)
+    if matrix_world is None:
+        anim_loc, anim_rot, anim_scale, is_animated = is_animated_ugg(war3_model, bpy_obj, settings)
+        matrix_world = bpy_obj.matrix_world
+    else:
+        anim_loc, anim_rot, anim_scale, is_animated = None, None, None, False
+    arrays = get_mesh_arrays(bpy_obj, context, settings.global_matrix @ matrix_world)
 
     # Geoset Animation
     geoset_anim, geoset_anim_hash = get_geoset_anim(bpy_obj, visibility, war3_model)
@@ -37,25 +47,30 @@ def make_mesh(war3_model: War3Model, billboard_lock, billboarded, context, mats,
     if armature is not None:
         bone_names = set(b.name for b in armature.object.data.bones)
 
-    # Make a list of all bones to use if saving skin weights
-    temp_skin_matrices = None
-    if settings.use_skinweights and len(bone_names):
-        temp_skin_matrices = list([b.name] for b in armature.object.data.bones)
-
     parent = create_bone_and_stuff(anim_loc, anim_rot, anim_scale, armature, billboard_lock, billboarded, geoset_anim,
                                    is_animated, bpy_obj, parent, settings, war3_model)
 
-    mesh_geosets = set()
-    for tri in bpy_mesh.loop_triangles:
-        # p = bpy_mesh.polygons[f.index]
-        # Textures and materials
-        material_name = "default"
-        if bpy_obj.material_slots and len(bpy_obj.material_slots):
-            bpy_material = bpy_obj.material_slots[tri.material_index].material
-            if bpy_material is not None:
-                material_name = bpy_material.name
-                mats.add(bpy_material)
-
+    with profiling.span("vertex_groups"):
+        vertex_group_ids, group_list, vertex_skin_ids, skin_list = get_vertex_groups(bone_names, armature, arrays,
+                                                                                    bpy_obj, parent, settings)
+    profiling.count('triangles', len(arrays.tri_vertices))
+
+    # Attributes of every triangle corner, in the same order as the triangles
+    corners = arrays.tri_vertices.ravel()
+    coords = rnd_array(arrays.positions[corners])
+    # Corners with different split normals become different vertices below, which splits the mesh along hard edges
+    norms = rnd_array(arrays.tri_split_normals.reshape(-1, 3))
+    if arrays.loop_uvs is not None:
+        uvs = arrays.loop_uvs[arrays.tri_loops.ravel()]
+    else:
+        uvs = np.zeros((len(corners), 2), dtype=np.float32)
+    uvs[:, 1] = 1 - uvs[:, 1].astype(np.float64)  # For some reason, uv Y coordinates appear flipped. This should fix that.
+    tverts = rnd_array(uvs)
+    corner_group_ids = vertex_group_ids[corners]
+    corner_skin_ids = vertex_skin_ids[corners]
+
+    mesh_geosets = []
+    for material_name, tri_indices in get_material_triangles(bpy_obj, arrays.tri_materials, mats):
         if (material_name, geoset_anim_hash) in war3_model.geoset_map.keys():
             geoset = war3_model.geoset_map[(material_name, geoset_anim_hash)]
         else:
@@ -67,78 +82,175 @@ def make_mesh(war3_model: War3Model, billboard_lock, billboarded, context, mats,
 
             war3_model.geoset_map[(material_name, geoset_anim_hash)] = geoset
 
-        if settings.use_skinweights:
-            geoset.skin_matrices = temp_skin_matrices
-
-        # Vertices, faces, and matrices
-        vertex_map = {}
-        for vert, loop in zip(tri.vertices, tri.loops):
-            co = bpy_mesh.vertices[vert].co
-            coord = (rnd(co.x), rnd(co.y), rnd(co.z))
-            n = bpy_mesh.vertices[vert].normal if tri.use_smooth else tri.normal
-            norm = (rnd(n.x), rnd(n.y), rnd(n.z))
-            uv = bpy_mesh.uv_layers.active.data[loop].uv if len(bpy_mesh.uv_layers) else Vector((0.0, 0.0))
-            uv[1] = 1 - uv[1]  # For some reason, uv Y coordinates appear flipped. This should fix that.
-            tvert = (rnd(uv.x), rnd(uv.y))
-            groups = None
-            skins = None
-            bone_list = None
-            weight_list = None
-            matrix = 0
-            if armature is not None:
-                vertex_groups = sorted(bpy_mesh.vertices[vert].groups[:], key=lambda x: x.weight, reverse=True)
-                # Sort bones by descending weight
-                if len(vertex_groups) and not settings.use_skinweights:
-                    groups = get_matrice_groups(bone_names, bpy_obj, vertex_groups)
-                elif len(vertex_groups) and settings.use_skinweights:
-                    # skins = get_skins(bone_names, geoset, bpy_obj, vertex_groups)
-                    bone_list, weight_list = get_skins2(bone_names, geoset, bpy_obj, vertex_groups)
-
-            if parent is not None and (groups is None or len(groups) == 0):
-                groups = [parent]
-
-            if groups is not None:
-                if groups not in geoset.matrices:
-                    geoset.matrices.append(groups)
-                matrix = geoset.matrices.index(groups)
+        corner_indices = (tri_indices[:, None] * 3 + np.arange(3)).ravel()
 
+        # Matrices are registered in the order their first vertex shows up
+        group_ids = corner_group_ids[corner_indices]
+        matrix_lookup = np.zeros(len(group_list) + 1, dtype=np.int64)  # Last slot is for vertices without groups
+        used_ids, first_use = np.unique(group_ids, return_index=True)
+        for group_id in used_ids[np.argsort(first_use)]:
+            if group_id >= 0:
+                matrix_lookup[group_id] = geoset.add_matrix(group_list[group_id], war3_model.bone_geosets)
+        matrices = matrix_lookup[group_ids]
+
+        # With skin weights, every bone the geoset's vertices use is a matrix of its own, and the skin weights
+        # refer to these. Only bones with weights in the geoset are added.
+        if settings.use_skinweights:
+            vertex_keys = corner_skin_ids[corner_indices]
+            used_ids, first_use = np.unique(vertex_keys, return_index=True)
+            for skin_id in used_ids[np.argsort(first_use)].tolist():
+                for bone in skin_list[skin_id][0] or ():
+                    geoset.add_matrix([bone], war3_model.bone_geosets)
+        else:
+            vertex_keys = matrices
+
+        # Vertices, faces, and matrices. Corners that are identical in every attribute are welded:
+        # np.unique merges them within this mesh, and the geoset's vertex map merges them with other meshes.
+        rows = np.column_stack((coords[corner_indices], norms[corner_indices], tverts[corner_indices], vertex_keys))
+        _, first_corner, inverse = np.unique(rows, axis=0, return_index=True, return_inverse=True)
+        order = np.argsort(first_corner)
+        unique_corners = corner_indices[first_corner[order]]
+        unique_keys = vertex_keys[first_corner[order]]
+
+        # Optionally, vertices that are only nearly identical are welded as well
+        welded_to = np.arange(len(order))
+        if settings.weld_vertices:
+            with profiling.span("weld_vertices"):
+                welded_to = weld_vertices(coords[unique_corners], norms[unique_corners], tverts[unique_corners],
+                                          unique_keys, settings.weld_distance, settings.weld_angle,
+                                          settings.weld_uv_distance)
+        welded = int(np.count_nonzero(welded_to != np.arange(len(order))))
+        if settings.weld_vertices:
+            geoset.welded_vertices += welded
+            profiling.count('vertices welded', welded)
+
+        vertex_data = zip(map(tuple, coords[unique_corners].tolist()),
+                          map(tuple, norms[unique_corners].tolist()),
+                          map(tuple, tverts[unique_corners].tolist()),
+                          unique_keys.tolist(),
+                          welded_to.tolist())
+        slots = np.empty(len(order), dtype=np.int64)
+        vertex_count = len(geoset.vertices)
+        order = order.tolist()
+        for k, (u, (coord, norm, tvert, key, target)) in enumerate(zip(order, vertex_data)):
+            if target != k:
+                slots[u] = slots[order[target]]
+                continue
             if settings.use_skinweights:
-                # vertex = (coord, norm, tvert, skins)
+                bone_list, weight_list = skin_list[key]
                 vertex = War3Vertex(coord, norm, tvert, None, bone_list, weight_list, None)
             else:
-                # vertex = (coord, norm, tvert, matrix)
-                # vertex = War3Vertex(coord, norm, tvert, matrix, None, None)
-                vertex = War3Vertex(coord, norm, tvert, matrix, None, None, None)
-
-            if vertex not in geoset.vertices:
-                geoset.vertices.append(vertex)
-
-            vertex_map[vert] = geoset.vertices.index(vertex)
+                vertex = War3Vertex(coord, norm, tvert, key, None, None, None)
+            slots[u] = geoset.add_vertex(vertex)
+        profiling.count('vertices deduplicated', len(corner_indices) - (len(geoset.vertices) - vertex_count) - welded)
 
-        # Triangles, normals, vertices, and UVs
-        geoset.triangles.append(
-            (vertex_map[tri.vertices[0]], vertex_map[tri.vertices[1]], vertex_map[tri.vertices[2]]))
+        # Triangles, normals, vertices, and UVs. Welding can collapse triangles, which are left out.
+        triangles = slots[inverse.reshape(-1)].reshape(-1, 3)
+        if welded:
+            triangles = triangles[(triangles[:, 0] != triangles[:, 1]) & (triangles[:, 1] != triangles[:, 2]) &
+                                  (triangles[:, 2] != triangles[:, 0])]
+        geoset.triangles.extend(map(tuple, triangles.tolist()))
 
-        mesh_geosets.add(geoset)
+        mesh_geosets.append(geoset)
 
     for geoset in mesh_geosets:
         geoset.objects.append(bpy_obj)
         if not len(geoset.matrices) and parent is not None:
-            geoset.matrices.append([parent])
+            geoset.add_matrix([parent], war3_model.bone_geosets)
 
-    # obj.to_mesh_clear()
-    bpy.data.meshes.remove(bpy_mesh)
+
+def get_material_triangles(bpy_obj, tri_materials, mats):
+    # Textures and materials. Yields the triangle indices of each material, in order of first appearance
+    used_indices, first_use = np.unique(tri_materials, return_index=True)
+    material_indices = {}
+    for material_index in used_indices[np.argsort(first_use)].tolist():
+        material_name = "default"
+        if bpy_obj.material_slots and len(bpy_obj.material_slots):
+            bpy_material = bpy_obj.material_slots[material_index].material
+            if bpy_material is not None:
+                material_name = bpy_material.name
+                mats.setdefault(bpy_material)
+        material_indices.setdefault(material_name, []).append(material_index)
+
+    for material_name, indices in material_indices.items():
+        yield material_name, np.flatnonzero(np.isin(tri_materials, indices))
+
+
+def get_vertex_groups(bone_names, armature, arrays, bpy_obj, parent, settings):
+    # Resolves the matrix group (or skin) of each mesh vertex once, rather than once per triangle corner
+    num_verts = len(arrays.positions)
+    vertex_group_ids = np.full(num_verts, -1, dtype=np.int64)
+    group_list = []
+    vertex_skin_ids = np.zeros(num_verts, dtype=np.int64)
+    skin_list = [(None, None)]  # Vertices without any skin share the first entry
+
+    if settings.use_skinweights:
+        vertex_skin_ids, skin_list = get_skins(bone_names, arrays, bpy_obj, parent)
+        return vertex_group_ids, group_list, vertex_skin_ids, skin_list
+
+    if armature is None:
+        if parent is not None:
+            group_list.append([parent])
+            vertex_group_ids[:] = 0
+        return vertex_group_ids, group_list, vertex_skin_ids, skin_list
+
+    group_index = {}
+    group_ends = np.cumsum(arrays.group_counts).tolist()
+    group_indices = arrays.group_indices.tolist()
+    group_weights = arrays.group_weights.tolist()
+    start = 0
+    for i, end in enumerate(group_ends):
+        groups = None
+        # Sort bones by descending weight
+        vertex_groups = sorted(zip(group_indices[start:end], group_weights[start:end]), key=lambda x: x[1], reverse=True)
+        start = end
+        if len(vertex_groups):
+            groups = get_matrice_groups(bone_names, bpy_obj, vertex_groups)
+
+        if parent is not None and (groups is None or len(groups) == 0):
+            groups = [parent]
+
+        if groups is not None:
+            key = tuple(groups)
+            if key not in group_index:
+                group_index[key] = len(group_list)
+                group_list.append(groups)
+            vertex_group_ids[i] = group_index[key]
+
+    return vertex_group_ids, group_list, vertex_skin_ids, skin_list
+
+
+def get_skins(bone_names, arrays, bpy_obj, parent):
+    # Warcraft 800+ do support vertex (skin) weights; 4 per vertex which sum up to 255.
+    # Returns the skin of each vertex as an index into a list of unique (bone names, weights) pairs.
+    group_names = [vg.name for vg in bpy_obj.vertex_groups]
+    group_bones = [i if name in bone_names else -1 for i, name in enumerate(group_names)]
+    skin_bones, skin_weights = get_skin_weights(arrays, group_bones)
+
+    skins, vertex_skin_ids = np.unique(np.column_stack((skin_bones, skin_weights)), axis=0, return_inverse=True)
+    skin_list = []
+    for skin in skins.tolist():
+        bones, weights = skin[:4], skin[4:]
+        if bones[0] >= 0:
+            skin_list.append((tuple(group_names[b] for b in bones if b >= 0), tuple(weights)))
+        elif parent is not None:
+            # Vertices without bone weights follow the mesh's parent, like they do without skin weights
+            skin_list.append(((getattr(parent, 'name', parent),), (255, 0, 0, 0)))
+        else:
+            skin_list.append((None, None))
+    return vertex_skin_ids.reshape(-1), skin_list
 
 
 def get_matrice_groups(bone_names, obj, vertex_groups) -> List[str]:
-    # Warcraft 800 does not support vertex weights, so we exclude groups with too small influence
-    groups = list(obj.vertex_groups[vg.group].name for vg in vertex_groups if
-                  (obj.vertex_groups[vg.group].name in bone_names and vg.weight > 0.25))[:3]
+    # Warcraft 800 does not support vertex weights, so we exclude groups with too small influence.
+    # vertex_groups are (group index, weight) pairs.
+    groups = list(obj.vertex_groups[group].name for group, weight in vertex_groups if
+                  (obj.vertex_groups[group].name in bone_names and weight > 0.25))[:3]
     if not len(groups):
-        for vg in vertex_groups:
+        for group, weight in vertex_groups:
             # If we didn't find a group, just take the best match (the list is already sorted by weight)
-            if obj.vertex_groups[vg.group].name in bone_names:
-                groups = [obj.vertex_groups[vg.group].name]
+            if obj.vertex_groups[group].name in bone_names:
+                groups = [obj.vertex_groups[group].name]
                 break
     return groups
 
@@ -156,42 +268,8 @@ def get_matrice_groups1(bone_names, obj, vertex_groups):
     return groups
 
 
-def get_skins(bone_names, geoset, obj, vertex_groups):
-    # Warcraft 800+ do support vertex (skin) weights; 4 per vertex which sum up to 255
-    bone_list = (list(geoset.skin_matrices.index([obj.vertex_groups[vg.group].name]) for vg in vertex_groups if
-                      (obj.vertex_groups[vg.group].name in bone_names)) + [0] * 4)[:4]
-    weight_list = (list(vg.weight for vg in vertex_groups if (obj.vertex_groups[vg.group].name in bone_names)) + [
-        0] * 4)[:4]
-    tot_weight = sum(weight_list)
-    w_conv = 255 / tot_weight
-    weight_list = [round(i * w_conv) for i in weight_list]
-    # Ugly fix to make sure total weight is 255
-
-    weight_adjust = 255 - sum(weight_list)
-    weight_list[0] = int(weight_list[0] + weight_adjust)
-    skins = bone_list + weight_list
-    return skins
-
-
-def get_skins2(bone_names, geoset, obj, vertex_groups):
-    # Warcraft 800+ do support vertex (skin) weights; 4 per vertex which sum up to 255
-    bone_list = (list(obj.vertex_groups[vg.group].name for vg in vertex_groups if
-                      (obj.vertex_groups[vg.group].name in bone_names)))[:4]
-    weight_list = (list(vg.weight for vg in vertex_groups if (obj.vertex_groups[vg.group].name in bone_names)) + [
-        0] * 4)[:4]
-    tot_weight = sum(weight_list)
-    w_conv = 255 / tot_weight
-    weight_list = [round(i * w_conv) for i in weight_list]
-    # Ugly fix to make sure total weight is 255
-
-    weight_adjust = 255 - sum(weight_list)
-    weight_list[0] = int(weight_list[0] + weight_adjust)
-    # skins = bone_list + weight_list
-    return bone_list, weight_list
-
-
 def get_geoset_anim(obj, visibility, war3_model):
-    vertex_color_anim = get_wc3_animation_curve(obj.animation_data, 'color', 3, war3_model.sequences)
+    vertex_color_anim = get_wc3_animation_curve(obj.animation_data, 'color', 3, war3_model.sequences, war3_model.f2ms)
     vertex_color = None
     if any(i < 0.999 for i in obj.color[:3]):
         vertex_color = tuple(obj.color[:3])
@@ -205,10 +283,14 @@ def get_geoset_anim(obj, visibility, war3_model):
                 if hasattr(mat.node_tree, "animation_data"):
                     vertex_color_anim = get_wc3_animation_curve(
                         mat.node_tree.animation_data, 'nodes["VertexColor"].%s[0].default_value' % attr, 3,
-                        war3_model.sequences)
+                        war3_model.sequences, war3_model.f2ms)
     geoset_anim = None
     geoset_anim_hash = 0
     if any((vertex_color, vertex_color_anim, visibility)):
+        # Geoset anim tracks are never transformed, so they are final here
+        for curve in (vertex_color_anim, visibility):
+            if curve is not None:
+                curve.finalize()
         geoset_anim = War3GeosetAnim(vertex_color, vertex_color_anim, visibility)
         geoset_anim_hash = hash(geoset_anim)  # The hash is a bit complex, so we precompute it
     return geoset_anim, geoset_anim_hash
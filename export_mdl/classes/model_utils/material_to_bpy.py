@@ -0,0 +1,31 @@
+import bpy
+
+# Replaceable ids with their own texture type in the layer settings, the others use '36' and an id
+replaceable_types = {'1', '2', '11', '31', '32', '33', '34', '35'}
+filter_modes = {'None', 'Blend', 'Transparent', 'Additive', 'AddAlpha', 'Modulate', 'Modulate2x'}
+
+
+def material_to_bpy(material, name):
+    # A Blender material with the add-on's layer settings, the reverse of War3Material.parse_material_layers
+    bpy_material = bpy.data.materials.new(name)
+    bpy_material.priority_plane = material.priority_plane
+    for i, layer in enumerate(material.layers):
+        layer_settings = bpy_material.mdl_layers.add()
+        layer_settings.name = "Layer %d" % i
+        if layer.texture.startswith("ReplaceableId"):
+            replaceable_id = layer.texture.split()[-1]
+            if replaceable_id in replaceable_types:
+                layer_settings.texture_type = replaceable_id
+            else:
+                layer_settings.texture_type = '36'
+                layer_settings.replaceable_id = int(replaceable_id)
+        else:
+            layer_settings.path = layer.texture
+        if layer.filter_mode in filter_modes:
+            layer_settings.filter_mode = layer.filter_mode
+        layer_settings.unshaded = layer.unshaded
+        layer_settings.two_sided = layer.two_sided
+        layer_settings.no_depth_test = layer.no_depth_test
+        layer_settings.no_depth_set = layer.no_depth_set
+        layer_settings.alpha = min(max(layer.alpha_value, 0.0), 1.0)
+    return bpy_material
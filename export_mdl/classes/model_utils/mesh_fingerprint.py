@@ -0,0 +1,132 @@
+import hashlib
+
+import bpy
+import numpy as np
+
+# Modifiers whose result can change without any of their settings changing, e.g. with the current frame
+uncached_modifiers = {'NODES', 'OCEAN', 'WAVE', 'PARTICLE_SYSTEM', 'PARTICLE_INSTANCE', 'EXPLODE', 'CLOTH',
+                      'SOFT_BODY', 'COLLISION', 'DYNAMIC_PAINT', 'FLUID', 'FLUID_SIMULATION', 'SMOKE',
+                      'MESH_CACHE', 'MESH_SEQUENCE_CACHE', 'SURFACE'}
+# foreach_get names, widths and types of the generic attribute types
+attribute_values = {'FLOAT': ('value', 1, np.float32), 'INT': ('value', 1, np.int32), 'INT8': ('value', 1, np.int32),
+                    'BOOLEAN': ('value', 1, bool), 'FLOAT2': ('vector', 2, np.float32),
+                    'INT32_2D': ('value', 2, np.int32), 'FLOAT_VECTOR': ('vector', 3, np.float32),
+                    'FLOAT_COLOR': ('color', 4, np.float32), 'BYTE_COLOR': ('color', 4, np.float32),
+                    'QUATERNION': ('value', 4, np.float32)}
+
+
+def mesh_fingerprint(bpy_obj):
+    # A digest of everything the object's evaluated mesh depends on in local space: the mesh data, and the modifier
+    # stack and the objects it refers to. Objects with the same mesh data and modifiers have the same fingerprint.
+    # None if the mesh can't be cached.
+    if bpy_obj.type != 'MESH' or any(m.type in uncached_modifiers for m in bpy_obj.modifiers):
+        return None
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.array([s < 0 for s in bpy_obj.scale]).tobytes())  # prepare_mesh flips negatively scaled meshes
+
+    mesh = bpy_obj.data
+    for collection, name, width, dtype in ((mesh.vertices, 'co', 3, np.float32),
+                                           (mesh.edges, 'vertices', 2, np.int32),
+                                           (mesh.loops, 'vertex_index', 1, np.int32),
+                                           (mesh.polygons, 'loop_start', 1, np.int32),
+                                           (mesh.polygons, 'material_index', 1, np.int32),
+                                           (mesh.polygons, 'use_smooth', 1, bool)):
+        add_array(digest, collection, name, width, dtype)
+    if hasattr(mesh.edges, 'use_edge_sharp'):
+        add_array(digest, mesh.edges, 'use_edge_sharp', 1, bool)
+    for uv_layer in mesh.uv_layers:
+        digest.update(uv_layer.name.encode())
+        add_array(digest, uv_layer.data, 'uv', 2, np.float32)
+    for attribute in mesh.attributes:
+        if attribute.data_type in attribute_values:
+            digest.update(attribute.name.encode())
+            add_array(digest, attribute.data, *attribute_values[attribute.data_type])
+
+    if mesh.has_custom_normals:
+        if hasattr(mesh, 'corner_normals'):  # Blender 4.1+
+            add_array(digest, mesh.corner_normals, 'vector', 3, np.float32)
+        else:
+            add_split_normals(digest, mesh)
+    if hasattr(mesh, 'use_auto_smooth'):
+        digest.update(repr((mesh.use_auto_smooth, mesh.auto_smooth_angle)).encode())
+
+    if uses_vertex_groups(bpy_obj):
+        # Vertex groups have no bulk access, so they are only read for objects whose result depends on them
+        digest.update(b'vertex groups')
+        digest.update(repr([[(g.group, g.weight) for g in v.groups] for v in mesh.vertices]).encode())
+
+    if mesh.shape_keys is not None:
+        add_settings(digest, mesh.shape_keys)
+        for key_block in mesh.shape_keys.key_blocks:
+            add_settings(digest, key_block)
+            add_array(digest, key_block.data, 'co', 3, np.float32)
+
+    world_space = False
+    for modifier in bpy_obj.modifiers:
+        world_space |= add_settings(digest, modifier)
+    if world_space:
+        # The modifiers work with the object's position relative to other objects or to the world
+        digest.update(np.array(bpy_obj.matrix_world, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def add_array(digest, collection, name, width, dtype):
+    values = np.empty(len(collection) * width, dtype=dtype)
+    collection.foreach_get(name, values)
+    digest.update(values.tobytes())
+
+
+def add_split_normals(digest, mesh):
+    # Before Blender 4.1 split normals have to be calculated before they can be read. That is done on a copy of the
+    # mesh data, since calc_normals_split on the mesh itself would write to the user's mesh. The modifiers are
+    # hashed separately, so the copy doesn't need evaluating.
+    temp_mesh = mesh.copy()
+    try:
+        temp_mesh.calc_normals_split()
+        add_array(digest, temp_mesh.loops, 'normal', 3, np.float32)
+    finally:
+        bpy.data.meshes.remove(temp_mesh)
+
+
+def uses_vertex_groups(bpy_obj):
+    # Whether the vertex weights can change the exported mesh: through the armature modifier, which make_mesh reads
+    # the bones of each vertex for, or through a modifier limited to a vertex group
+    if not len(bpy_obj.vertex_groups):
+        return False
+    for modifier in bpy_obj.modifiers:
+        if modifier.type == 'ARMATURE':
+            return True
+        for prop in modifier.bl_rna.properties:
+            if prop.type == 'STRING' and prop.identifier.startswith('vertex_group'):
+                if getattr(modifier, prop.identifier):
+                    return True
+    return False
+
+
+def add_settings(digest, struct):
+    # The struct's own properties. Objects it points to add their transform, and armatures their pose as well,
+    # since that is what a modifier reads from them. True if the struct refers to other objects or to world space.
+    world_space = False
+    for prop in struct.bl_rna.properties:
+        if prop.identifier == 'rna_type' or prop.type == 'COLLECTION':
+            continue
+        value = getattr(struct, prop.identifier)
+        if prop.type == 'POINTER':
+            if isinstance(value, bpy.types.Object):
+                world_space = True
+                digest.update(value.name_full.encode())
+                digest.update(np.array(value.matrix_world, dtype=np.float64).tobytes())
+                if value.pose is not None:
+                    digest.update(np.array([b.matrix for b in value.pose.bones], dtype=np.float64).tobytes())
+            elif isinstance(value, bpy.types.ID):
+                digest.update(value.name_full.encode())
+            continue
+        if prop.type in {'FLOAT', 'INT', 'BOOLEAN'} and prop.array_length:
+            value = np.array(value).tolist()
+        elif isinstance(value, set):  # Enum flags
+            value = sorted(value)
+        elif value == 'GLOBAL':  # Texture coordinates of e.g. the displace modifier
+            world_space = True
+        digest.update(repr((prop.identifier, value)).encode())
+    return world_space
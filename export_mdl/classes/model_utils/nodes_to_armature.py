@@ -0,0 +1,36 @@
+import bpy
+from mathutils import Vector
+
+from .track_to_fcurves import track_to_fcurves
+
+
+def nodes_to_armature(nodes, context, name, bone_length, fps):
+    # An armature with a bone at the pivot of each node. The bones point along +Y without roll, so their rest
+    # matrices only translate, and the node's tracks can be keyed on the pose bones as they are.
+    armature = bpy.data.armatures.new(name)
+    bpy_obj = bpy.data.objects.new(name, armature)
+    context.collection.objects.link(bpy_obj)
+    context.view_layer.objects.active = bpy_obj
+
+    bpy.ops.object.mode_set(mode='EDIT')
+    edit_bones = {}
+    for node in nodes:
+        edit_bone = armature.edit_bones.new(node.name)
+        edit_bone.head = Vector(node.pivot)
+        edit_bone.tail = Vector(node.pivot) + Vector((0.0, bone_length, 0.0))
+        edit_bones[node.name] = edit_bone
+    for node in nodes:
+        if node.parent in edit_bones:
+            edit_bones[node.name].parent = edit_bones[node.parent]
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+    action = bpy.data.actions.new(name)
+    bpy_obj.animation_data_create().action = action
+    for node in nodes:
+        bpy_obj.pose.bones[node.name].rotation_mode = 'QUATERNION'
+        data_path = 'pose.bones["%s"].' % bpy.utils.escape_identifier(node.name)
+        for track, channel in ((node.anim_loc, 'location'), (node.anim_rot, 'rotation_quaternion'),
+                               (node.anim_scale, 'scale')):
+            if track is not None:
+                track_to_fcurves(action, track, data_path + channel, node.name, fps)
+    return bpy_obj
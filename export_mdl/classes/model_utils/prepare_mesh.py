@@ -2,19 +2,12 @@ import bmesh
 import bpy
 
 
-def prepare_mesh(bpy_obj, context, matrix):
-    mod = None
-    if bpy_obj.data.use_auto_smooth:
-        mod = bpy_obj.modifiers.new("EdgeSplitExport", 'EDGE_SPLIT')
-        mod.split_angle = bpy_obj.data.auto_smooth_angle
-        # mod.use_edge_angle = True
-
+def prepare_mesh(bpy_obj, context):
+    # The evaluated mesh, triangulated, in local space. Hard edges are taken from the split normals after
+    # triangulation, so the object itself is left untouched.
     deps_graph = context.evaluated_depsgraph_get()
     bpy_mesh = bpy.data.meshes.new_from_object(bpy_obj.evaluated_get(deps_graph), preserve_all_data_layers=True, depsgraph=deps_graph)
 
-    if bpy_obj.data.use_auto_smooth:
-        bpy_obj.modifiers.remove(mod)
-
     # Triangulate for web export
     bm = bmesh.new()
     bm.from_mesh(bpy_mesh)
@@ -23,12 +16,12 @@ def prepare_mesh(bpy_obj, context, matrix):
     if any(s < 0 for s in bpy_obj.scale):
         bmesh.ops.recalc_face_normals(bm, faces=bm.faces)
     bmesh.ops.triangulate(bm, faces=bm.faces)
-    bmesh.ops.transform(bm, matrix=matrix, verts=bm.verts)
     bm.to_mesh(bpy_mesh)
     bm.free()
     del bm
 
-    bpy_mesh.calc_normals_split()
+    if hasattr(bpy_mesh, 'calc_normals_split'):  # Split normals are always available since Blender 4.1
+        bpy_mesh.calc_normals_split()
     bpy_mesh.calc_loop_triangles()
 
     return bpy_mesh
@@ -1,2 +1,63 @@
-def to_scene(context):
-    pass
+import bpy
+from mathutils import Vector
+
+from .add_vertex_groups import add_vertex_groups
+from .geoset_to_mesh import geoset_to_mesh
+from .material_to_bpy import material_to_bpy
+from .nodes_to_armature import nodes_to_armature
+from ..War3Model import War3Model
+from ... import profiling
+
+
+def to_scene(war3_model: War3Model, context):
+    # Adds a model from read_mdl(build_geosets=False) to the scene: an armature for the bones and helpers, a
+    # mesh for each geoset, empties for the attachments and timeline markers for the sequences.
+    # Returns the new objects.
+    scene = context.scene
+    fps = scene.render.fps
+    name = war3_model.name or "Model"
+    new_objects = []
+
+    for sequence in war3_model.sequences:
+        for time in (sequence.start, sequence.end):
+            scene.timeline_markers.new(sequence.name, frame=round(time * fps / 1000))
+
+    materials = {material.name: material_to_bpy(material, "%s %s" % (name, material.name))
+                 for material in war3_model.materials}
+
+    armature = None
+    nodes = war3_model.objects['bone'] + war3_model.objects['helper']
+    if len(nodes):
+        size = max(b - a for a, b in zip(war3_model.global_extents_min, war3_model.global_extents_max))
+        with profiling.span("nodes_to_armature"):
+            armature = nodes_to_armature(nodes, context, name, max(size / 50, 0.01), fps)
+        new_objects.append(armature)
+
+    for i, geoset in enumerate(war3_model.geosets):
+        with profiling.span("geoset_to_mesh"):
+            mesh = geoset_to_mesh(geoset, "%s %d" % (name, i))
+        if geoset.mat_name in materials:
+            mesh.materials.append(materials[geoset.mat_name])
+        bpy_obj = bpy.data.objects.new(mesh.name, mesh)
+        context.collection.objects.link(bpy_obj)
+        add_vertex_groups(bpy_obj, geoset)
+        if armature is not None:
+            bpy_obj.parent = armature
+            bpy_obj.modifiers.new("Armature", 'ARMATURE').object = armature
+        new_objects.append(bpy_obj)
+
+    for attachment in war3_model.objects['attachment']:
+        # The exporter takes empties named "... Ref" for attachment points
+        attachment_name = attachment.name if attachment.name.endswith(" Ref") else attachment.name + " Ref"
+        bpy_obj = bpy.data.objects.new(attachment_name, None)
+        context.collection.objects.link(bpy_obj)
+        bpy_obj.location = attachment.pivot
+        if armature is not None and attachment.parent in armature.data.bones:
+            # Children of a bone are placed relative to its tail
+            bpy_obj.parent = armature
+            bpy_obj.parent_type = 'BONE'
+            bpy_obj.parent_bone = attachment.parent
+            bpy_obj.location = Vector(attachment.pivot) - armature.data.bones[attachment.parent].tail_local
+        new_objects.append(bpy_obj)
+
+    return new_objects
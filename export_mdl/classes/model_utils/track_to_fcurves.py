@@ -0,0 +1,23 @@
+import numpy as np
+
+from ..animation_curve_utils.sample_fcurves import BEZIER, CONSTANT, LINEAR
+
+interpolation_modes = {'DontInterp': CONSTANT, 'Linear': LINEAR, 'Hermite': BEZIER, 'Bezier': BEZIER}
+
+
+def track_to_fcurves(action, track, data_path, group, fps):
+    # Keyframes of a track read from a file, with times in milliseconds, as one fcurve per channel.
+    # Tangents aren't read back; curved tracks get Blender's automatic handles.
+    times = sorted(track.keyframes)
+    if not len(times):
+        return
+    frames = np.array(times, dtype=np.float64) * fps / 1000
+    values = np.array([track.keyframes[time] for time in times], dtype=np.float64)
+    modes = np.full(len(times), interpolation_modes.get(track.interpolation, LINEAR), dtype=np.int32)
+
+    for index in range(values.shape[1]):
+        fcurve = action.fcurves.new(data_path, index=index, action_group=group)
+        fcurve.keyframe_points.add(len(times))
+        fcurve.keyframe_points.foreach_set('co', np.column_stack((frames, values[:, index])).astype(np.float32).ravel())
+        fcurve.keyframe_points.foreach_set('interpolation', modes)
+        fcurve.update()
@@ -0,0 +1,24 @@
+import copy
+
+import numpy as np
+
+from .extract_mesh_arrays import MeshArrays
+
+
+def transform_mesh_arrays(arrays: MeshArrays, matrix) -> MeshArrays:
+    # A copy of the arrays with the positions and normals transformed. The other arrays are shared.
+    matrix = np.array(matrix, dtype=np.float64)
+    linear = matrix[:3, :3]
+    transformed = copy.copy(arrays)
+    transformed.positions = (arrays.positions @ linear.T + matrix[:3, 3]).astype(np.float32)
+
+    # Normals transform with the cofactor matrix, the inverse transpose scaled by the determinant. It also
+    # exists for flat matrices, and flips the normals of mirrored meshes, as recalculating them would.
+    cofactor = np.column_stack((np.cross(linear[:, 1], linear[:, 2]),
+                                np.cross(linear[:, 2], linear[:, 0]),
+                                np.cross(linear[:, 0], linear[:, 1])))
+    normals = arrays.tri_split_normals.reshape(-1, 3) @ cofactor.T
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    np.divide(normals, lengths, out=normals, where=lengths > 0)
+    transformed.tri_split_normals = normals.astype(np.float32).reshape(arrays.tri_split_normals.shape)
+    return transformed
@@ -0,0 +1,63 @@
+import numpy as np
+
+# Which of the neighbouring cells to search, per axis: 1 for the cell on the side of the vertex, 0 for its own
+cell_sides = np.array([(x, y, z) for x in (0, 1) for y in (0, 1) for z in (0, 1)], dtype=np.int64)
+
+
+def weld_vertices(positions, normals, uvs, keys, distance, angle, uv_distance):
+    # For each vertex, the index of the vertex it is welded to: itself, or an earlier vertex with the same key
+    # (matrix or skin) whose position, normal and uv are within the distance, angle and uv distance of its own.
+    # Vertices are only welded to vertices that stay, so no vertex moves further than the tolerances, and
+    # vertices on either side of a uv seam or a hard edge stay apart unless the tolerances are that large.
+    # Close vertices are found through a spatial hash grid with cells twice the distance in size. Everything
+    # within the distance of a vertex is in its own cell or in the neighbours on the side of the cell it is in,
+    # so each vertex is only compared with the vertices of 8 cells.
+    count = len(positions)
+    welded_to = np.arange(count)
+    if count < 2 or distance <= 0:
+        return welded_to
+
+    positions = np.asarray(positions, dtype=np.float64)
+    normals = np.asarray(normals, dtype=np.float64)
+    uvs = np.asarray(uvs, dtype=np.float64)
+    halves = np.floor(positions / distance).astype(np.int64)
+    cells = halves // 2
+    directions = np.where(halves % 2, 1, -1)  # Towards the nearer neighbour on each axis
+    hashes = cell_hash(cells)
+    order = np.argsort(hashes, kind='stable')
+    sorted_hashes = hashes[order]
+
+    candidates = []
+    for sides in cell_sides:
+        # The vertices whose cell hashes like the neighbouring cell. Hash collisions only add candidates.
+        neighbour_hashes = cell_hash(cells + directions * sides)
+        starts = np.searchsorted(sorted_hashes, neighbour_hashes, 'left')
+        counts = np.searchsorted(sorted_hashes, neighbour_hashes, 'right') - starts
+        total = counts.sum()
+        if not total:
+            continue
+        vertices = np.repeat(np.arange(count), counts)
+        others = order[np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)]
+        earlier = others < vertices
+        vertices, others = vertices[earlier], others[earlier]
+
+        close = keys[vertices] == keys[others]
+        close &= ((positions[vertices] - positions[others]) ** 2).sum(axis=1) <= distance * distance
+        close &= (normals[vertices] * normals[others]).sum(axis=1) >= np.cos(angle)
+        close &= ((uvs[vertices] - uvs[others]) ** 2).sum(axis=1) <= uv_distance * uv_distance
+        candidates.append(np.column_stack((vertices[close], others[close])))
+
+    if not len(candidates):
+        return welded_to
+    pairs = np.concatenate(candidates)
+    pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+    # Earliest vertices first, so a vertex's candidates have all been settled by the time it is reached
+    welded = welded_to.tolist()
+    for vertex, other in pairs.tolist():
+        if welded[vertex] == vertex and welded[other] == other:
+            welded[vertex] = other
+    return np.array(welded, dtype=np.int64)
+
+
+def cell_hash(cells):
+    return (cells[:, 0] * 73856093) ^ (cells[:, 1] * 19349663) ^ (cells[:, 2] * 83492791)
@@ -0,0 +1,16 @@
+import numpy as np
+
+
+def euler_to_quaternions(angles):
+    # XYZ euler angles of shape (n, 3) to WXYZ quaternions of shape (n, 4), as Euler.to_quaternion() does
+    half = np.asarray(angles, dtype=np.float64) * 0.5
+    ci, cj, ch = np.cos(half).T
+    si, sj, sh = np.sin(half).T
+    cc = ci * ch
+    cs = ci * sh
+    sc = si * ch
+    ss = si * sh
+    return np.stack((cj * cc + sj * ss,
+                     cj * sc - sj * cs,
+                     cj * ss + sj * cc,
+                     cj * cs - sj * sc), axis=1)
@@ -0,0 +1,85 @@
+import numpy as np
+
+
+def slerp(a, b, t):
+    # Row-wise slerp between the quaternions a and b
+    dot = np.sum(a * b, axis=1, keepdims=True)
+    b = np.where(dot < 0, -b, b)  # Take the shortest path
+    dot = np.abs(dot)
+    angle = np.arccos(np.clip(dot, -1, 1))
+    sin = np.sin(angle)
+    close = sin < 1e-6  # Nearly identical rotations, lerp is exact enough
+    safe_sin = np.where(close, 1, sin)
+    wa = np.where(close, 1 - t, np.sin((1 - t) * angle) / safe_sin)
+    wb = np.where(close, t, np.sin(t * angle) / safe_sin)
+    return wa * a + wb * b
+
+
+def interpolate(values, handles_left, handles_right, start, end, t, type1, interpolation):
+    # Where the track would be at t (0-1 within the segment) if the keyframes between start and end were removed
+    a = values[start]
+    b = values[end]
+    if interpolation == 'DontInterp':
+        return np.broadcast_to(a, (len(t), len(a)))
+    if type1 == 'Rotation':
+        return slerp(np.broadcast_to(a, (len(t), len(a))), np.broadcast_to(b, (len(t), len(b))), t)
+    if interpolation == 'Bezier':
+        s = 1 - t
+        return s * s * s * a + 3 * s * s * t * handles_right[start] + 3 * s * t * t * handles_left[end] + t * t * t * b
+    if interpolation == 'Hermite':
+        t2 = t * t
+        t3 = t2 * t
+        return ((2 * t3 - 3 * t2 + 1) * a + (t3 - 2 * t2 + t) * handles_right[start] +
+                (-2 * t3 + 3 * t2) * b + (t3 - t2) * handles_left[end])
+    return a + (b - a) * t
+
+
+def reduce_keyframes(times, values, type1, tolerance, interpolation='Linear', handles_left=None, handles_right=None):
+    # Iterative Douglas-Peucker: keep splitting at the keyframe with the largest error until every removed
+    # keyframe is within tolerance. Returns the sorted indices of the keyframes to keep.
+    # The tolerance is either one distance for the whole value, or an array with one per channel that every channel
+    # of a removed keyframe has to be within. Rotations are compared as a whole with the spherical distance
+    # 1 - |q1 . q2|, which unlike 1 - q1 . q2 doesn't count q and -q, the same rotation, as far apart, against the
+    # smallest of the tolerances.
+    if len(times) < 3:
+        return list(range(len(times)))
+    if type1 == 'Rotation' and interpolation in {'Bezier', 'Hermite'}:
+        # Nonlinear rotations follow their tangents, which the slerp error doesn't account for
+        return list(range(len(times)))
+
+    times = np.asarray(times, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64).reshape(len(times), -1)
+    tolerance = np.asarray(tolerance, dtype=np.float64)
+    if handles_left is not None:
+        handles_left = np.asarray(handles_left, dtype=np.float64).reshape(values.shape)
+        handles_right = np.asarray(handles_right, dtype=np.float64).reshape(values.shape)
+
+    keep = [0, len(times) - 1]
+    segments = [(0, len(times) - 1)]
+    while segments:
+        start, end = segments.pop()
+        if end - start < 2:
+            continue
+
+        inner = np.arange(start + 1, end)
+        t = ((times[inner] - times[start]) / (times[end] - times[start]))[:, None]
+        expected = interpolate(values, handles_left, handles_right, start, end, t, type1, interpolation)
+
+        if type1 == 'Rotation':
+            error = 1 - np.abs(np.sum(values[inner] * expected, axis=1))
+            within = error <= np.min(tolerance)
+        elif tolerance.ndim:
+            error = np.abs(values[inner] - expected)
+            within = np.all(error <= tolerance, axis=1)
+            error = np.max(error - tolerance, axis=1)  # How far each keyframe is outside its tolerances
+        else:
+            error = np.sqrt(np.sum((values[inner] - expected) ** 2, axis=1))
+            within = error <= tolerance
+
+        if not np.all(within):
+            middle = int(inner[np.argmax(error)])
+            keep.append(middle)
+            segments.append((start, middle))
+            segments.append((middle, end))
+
+    return sorted(keep)
@@ -0,0 +1,63 @@
+import os
+
+from .. import profiling
+
+
+class BufferedWriter:
+    # Drop-in for a text file's write(): small writes are collected in a list and
+    # written out in large chunks. The file is written to a temporary path and
+    # only renamed over the target once everything has been written.
+    # With binary=True, write() takes bytes instead of text.
+
+    def __init__(self, filepath, chunk_size=1 << 20, encoding='utf-8', binary=False):
+        self.filepath = filepath
+        self.chunk_size = chunk_size
+        self.encoding = encoding
+        self.binary = binary
+        self.buffer = []
+        self.buffered = 0
+        self.bytes_written = 0
+        self.file = None
+        self.temp_path = None
+
+    def __enter__(self):
+        self.temp_path = self.filepath + ".tmp"
+        self.file = open(self.temp_path, 'wb')
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self.flush()
+            self.file.close()
+            if exc_type is None:
+                os.replace(self.temp_path, self.filepath)
+        finally:
+            if os.path.exists(self.temp_path):
+                os.remove(self.temp_path)
+        return False
+
+    def write(self, text):
+        self.buffer.append(text)
+        self.buffered += len(text)
+        if self.buffered >= self.chunk_size:
+            self.flush()
+
+    def position(self):
+        # Encoded bytes written so far. Flushes first, since buffered text can encode to more bytes than characters.
+        self.flush()
+        return self.bytes_written
+
+    def flush(self):
+        if not self.buffer:
+            return
+        if self.binary:
+            data = b"".join(self.buffer)
+        else:
+            data = "".join(self.buffer).encode(self.encoding)
+        self.buffer.clear()
+        self.buffered = 0
+
+        with profiling.span("file_writes"):
+            self.file.write(data)
+        self.bytes_written += len(data)
@@ -11,7 +11,11 @@
 # ------------------ #
 import datetime
 import getpass
+from typing import TYPE_CHECKING
 
+from .buffered_writer import BufferedWriter
+from .export_steps import export_steps, run_steps
+from .. import profiling
 from .save_attachment_points import save_attachment_points
 from .save_bones import save_bones
 from .save_cameras import save_cameras
@@ -31,24 +35,31 @@ from .save_ribbon_emitters import save_ribbon_emitters
 from .save_sequences import save_sequences
 from .save_texture_animations import save_texture_animations
 from .save_textures import save_textures
-from ..classes.War3ExportSettings import War3ExportSettings
 from ..classes.War3Model import War3Model
-from ..classes.model_utils.from_scene import from_scene
 
+if TYPE_CHECKING:
+    from ..classes.War3ExportSettings import War3ExportSettings
 
-def save(operator, context, settings: War3ExportSettings, filepath="", mdl_version=800):
 
-    scene = context.scene
+def save(operator, context, settings: 'War3ExportSettings', filepath="", mdl_version=800):
+    return run_steps(save_steps(operator, context, settings, filepath, mdl_version))
 
-    current_frame = scene.frame_current
-    scene.frame_set(0)
 
-    model = War3Model(context)
-    from_scene(model, context, settings)
+def save_steps(operator, context, settings: 'War3ExportSettings', filepath="", mdl_version=800):
+    return export_steps(operator, context, settings, filepath,
+                        lambda model: write_mdl_steps(model, settings, filepath, mdl_version))
 
-    scene.frame_set(current_frame)
 
-    with open(filepath, 'w') as output:
+def write_mdl_file(model: War3Model, settings, filepath, mdl_version=800):
+    # Only needs the model and settings, so it also works on a model loaded from an intermediate file
+    run_steps(write_mdl_steps(model, settings, filepath, mdl_version))
+
+
+def write_mdl_steps(model: War3Model, settings, filepath, mdl_version=800):
+    # Writes one section per step, yielding the fraction of sections done
+    float_mode = 'SHORTEST' if settings.shortest_floats else 'FIXED'
+
+    with BufferedWriter(filepath) as output:
         fw = output.write
 
         date = datetime.datetime.now().strftime("%a %b %d %H:%M:%S %Y")
@@ -58,59 +69,29 @@ def save(operator, context, settings: War3ExportSettings, filepath="", mdl_versi
             fw("Version {\n\tFormatVersion %d,\n}\n" % 900)
         else:
             fw("Version {\n\tFormatVersion %d,\n}\n" % mdl_version)
-        # HEADER
-        save_model_header(fw, model)
-
-        # SEQUENCES
-        save_sequences(fw, model)
-
-        # GLOBAL SEQUENCES
-        save_global_sequences(fw, model)
-
-        # TEXTURES
-        save_textures(fw, model)
-
-        # MATERIALS
-        save_materials(fw, model)
-
-        # TEXTURE ANIMATIONS
-        material_names = save_texture_animations(fw, model)
-
-        # GEOSETS
-        save_geosets(fw, material_names, model, settings)
-
-        # GEOSET ANIMS
-        save_geoset_animations(fw, model)
-
-        # BONES
-        save_bones(fw, model)
-
-        # LIGHTS
-        save_lights(fw, model)
-
-        # HELPERS
-        save_helpers(fw, model)
-
-        # ATTACHMENT POINTS
-        save_attachment_points(fw, model)
-
-        # PIVOT POINTS
-        save_pivot_points(fw, model)
-
-        # MODEL EMITTERS
-        save_model_emitters(fw, model)
-
-        # PARTICLE EMITTERS
-        save_particle_emitters(fw, model)
-
-        # RIBBON EMITTERS
-        save_ribbon_emitters(fw, model)
-
-        # CAMERAS
-        save_cameras(fw, model, settings)
-
-        # EVENT OBJECTS
-        save_event_objects(fw, model)
 
-        # COLLISION SHAPES
-        save_collision_shape(fw, model)
+        sections = [
+            ("Header", lambda: save_model_header(fw, model)),
+            ("Sequences", lambda: save_sequences(fw, model)),
+            ("GlobalSequences", lambda: save_global_sequences(fw, model)),
+            ("Textures", lambda: save_textures(fw, model)),
+            ("Materials", lambda: save_materials(fw, model, float_mode)),
+            ("TextureAnims", lambda: save_texture_animations(fw, model, float_mode)),
+            ("Geosets", lambda: save_geosets(fw, model, settings, float_mode)),
+            ("GeosetAnims", lambda: save_geoset_animations(fw, model, float_mode)),
+            ("Bones", lambda: save_bones(fw, model, float_mode)),
+            ("Lights", lambda: save_lights(fw, model, float_mode)),
+            ("Helpers", lambda: save_helpers(fw, model, float_mode)),
+            ("Attachments", lambda: save_attachment_points(fw, model, float_mode)),
+            ("PivotPoints", lambda: save_pivot_points(fw, model)),
+            ("ParticleEmitters", lambda: save_model_emitters(fw, model, float_mode)),
+            ("ParticleEmitters2", lambda: save_particle_emitters(fw, model, float_mode)),
+            ("RibbonEmitters", lambda: save_ribbon_emitters(fw, model, float_mode)),
+            ("Cameras", lambda: save_cameras(fw, model)),
+            ("EventObjects", lambda: save_event_objects(fw, model, float_mode)),
+            ("CollisionShapes", lambda: save_collision_shape(fw, model)),
+        ]
+        for i, (name, save_section) in enumerate(sections):
+            with profiling.span(name, output.position):
+                save_section()
+            yield (i + 1) / len(sections)
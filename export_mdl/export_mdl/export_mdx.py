@@ -0,0 +1,81 @@
+import struct
+from typing import TYPE_CHECKING
+
+from .mdx.save_attachment_points import save_attachment_points
+from .mdx.save_bones import save_bones
+from .mdx.save_cameras import save_cameras
+from .mdx.save_collision_shape import save_collision_shape
+from .mdx.save_event_objects import save_event_objects
+from .mdx.save_geoset_animations import save_geoset_animations
+from .mdx.save_geosets import save_geosets
+from .mdx.save_global_sequences import save_global_sequences
+from .mdx.save_helpers import save_helpers
+from .mdx.save_lights import save_lights
+from .mdx.save_materials import save_materials
+from .mdx.save_model_emitters import save_model_emitters
+from .mdx.save_model_header import save_model_header
+from .mdx.save_particle_emitters import save_particle_emitters
+from .mdx.save_pivot_points import save_pivot_points
+from .mdx.save_ribbon_emitters import save_ribbon_emitters
+from .mdx.save_sequences import save_sequences
+from .mdx.save_texture_animations import save_texture_animations
+from .mdx.save_textures import save_textures
+from .buffered_writer import BufferedWriter
+from .export_steps import export_steps, run_steps
+from .write_mdx import pack_chunk
+from .. import profiling
+from ..classes.War3Model import War3Model
+
+if TYPE_CHECKING:
+    from ..classes.War3ExportSettings import War3ExportSettings
+
+
+def save(operator, context, settings: 'War3ExportSettings', filepath="", mdx_version=800):
+    return run_steps(save_steps(operator, context, settings, filepath, mdx_version))
+
+
+def save_steps(operator, context, settings: 'War3ExportSettings', filepath="", mdx_version=800):
+    return export_steps(operator, context, settings, filepath,
+                        lambda model: write_mdx_steps(model, settings, filepath, mdx_version))
+
+
+def write_mdx_file(model: War3Model, settings, filepath, mdx_version=800):
+    run_steps(write_mdx_steps(model, settings, filepath, mdx_version))
+
+
+def write_mdx_steps(model: War3Model, settings, filepath, mdx_version=800):
+    # Builds one chunk per step, yielding the fraction of chunks done
+    version = 900 if settings.use_skinweights else mdx_version
+
+    # Chunks are written in the same order as the MDL sections, through a temporary file that only replaces the
+    # target once the whole model has been written
+    sections = [
+        ("Header", lambda: save_model_header(model)),
+        ("Sequences", lambda: save_sequences(model)),
+        ("GlobalSequences", lambda: save_global_sequences(model)),
+        ("Textures", lambda: save_textures(model)),
+        ("Materials", lambda: save_materials(model, version)),
+        ("TextureAnims", lambda: save_texture_animations(model)),
+        ("Geosets", lambda: save_geosets(model, settings, version)),
+        ("GeosetAnims", lambda: save_geoset_animations(model)),
+        ("Bones", lambda: save_bones(model)),
+        ("Lights", lambda: save_lights(model)),
+        ("Helpers", lambda: save_helpers(model)),
+        ("Attachments", lambda: save_attachment_points(model)),
+        ("PivotPoints", lambda: save_pivot_points(model)),
+        ("ParticleEmitters", lambda: save_model_emitters(model)),
+        ("ParticleEmitters2", lambda: save_particle_emitters(model)),
+        ("RibbonEmitters", lambda: save_ribbon_emitters(model)),
+        ("Cameras", lambda: save_cameras(model)),
+        ("EventObjects", lambda: save_event_objects(model)),
+        ("CollisionShapes", lambda: save_collision_shape(model)),
+    ]
+
+    with BufferedWriter(filepath, binary=True) as output:
+        output.write(b'MDLX' + pack_chunk(b'VERS', struct.pack('<I', version)))
+        for i, (name, save_section) in enumerate(sections):
+            with profiling.span(name):
+                chunk = save_section()
+                profiling.count('bytes', len(chunk))
+            output.write(chunk)
+            yield (i + 1) / len(sections)
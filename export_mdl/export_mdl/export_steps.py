@@ -0,0 +1,50 @@
+import os
+from typing import TYPE_CHECKING
+
+from .. import profiling
+from ..classes.War3Model import War3Model
+
+if TYPE_CHECKING:
+    from ..classes.War3ExportSettings import War3ExportSettings
+
+# Share of the progress bar taken by reading the scene, the rest is for writing the file
+extraction_share = 0.8
+
+
+def export_steps(operator, context, settings: 'War3ExportSettings', filepath, write_steps):
+    # The whole export as a generator that yields its progress (0 to 1) between steps, so the modal operator can
+    # run it a few steps at a time. write_steps(model) yields the progress of writing the file. Closing the
+    # generator cancels the export: the frame is restored and no file is left behind. The context is used at every
+    # step, so steps that run after the caller returns need bpy.context rather than an operator's context.
+    from ..classes.model_utils.from_scene import from_scene_steps
+
+    if settings.profile_export:
+        profiling.start(os.path.basename(filepath))
+    try:
+        scene = context.scene
+
+        current_frame = scene.frame_current
+        scene.frame_set(0)
+        try:
+            model = War3Model(context)
+            with profiling.span("from_scene"):
+                for progress in from_scene_steps(model, context, settings):
+                    yield progress * extraction_share
+        finally:
+            scene.frame_set(current_frame)
+
+        with profiling.span("write_file"):
+            for progress in write_steps(model):
+                yield extraction_share + progress * (1 - extraction_share)
+    finally:
+        report = profiling.stop()
+    return profiling.report_profile(report, operator, filepath, settings.profile_sidecar)
+
+
+def run_steps(steps):
+    # Runs a step generator to the end and returns its result
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
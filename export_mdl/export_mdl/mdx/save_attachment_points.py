@@ -0,0 +1,14 @@
+import struct
+
+from ..write_mdx import pack_chunk, pack_inclusive, pack_node, pack_node_tracks, pack_string, write_mdx_curve
+from ...classes.War3Model import War3Model
+
+
+def save_attachment_points(model: War3Model):
+    data = bytearray()
+    for i, attachment in enumerate(model.objects['attachment']):
+        attachment_data = pack_node(attachment, attachment.name, 0x800, model, pack_node_tracks(attachment, model))
+        attachment_data += pack_string("", 260) + struct.pack('<I', i)
+        attachment_data += write_mdx_curve(attachment.visibility, b'KATV', model)
+        data += pack_inclusive(attachment_data)
+    return pack_chunk(b'ATCH', bytes(data)) if len(data) else b''
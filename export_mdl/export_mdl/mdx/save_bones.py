@@ -0,0 +1,24 @@
+import struct
+
+from ..write_mdx import NONE, pack_chunk, pack_node, pack_node_tracks
+from ...classes.War3Model import War3Model
+
+
+def save_bones(model: War3Model):
+    data = bytearray()
+    for bone in model.objects['bone']:
+        name = bone.name.replace('.', '_')
+        if not name.lower().startswith("bone"):
+            name = "Bone_" + name
+
+        children = model.bone_geosets.get(bone.name, ())
+        geoset_id = model.geoset_ids[children[0]] if len(children) == 1 else NONE
+
+        if bone.name in model.geoset_anim_map.keys():
+            geoset_anim_id = model.geoset_anim_ids[model.geoset_anim_map[bone.name]]
+        else:
+            geoset_anim_id = NONE
+
+        data += pack_node(bone, name, 0x100, model, pack_node_tracks(bone, model))
+        data += struct.pack('<2I', geoset_id, geoset_anim_id)
+    return pack_chunk(b'BONE', bytes(data)) if len(data) else b''
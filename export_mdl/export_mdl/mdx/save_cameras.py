@@ -0,0 +1,14 @@
+import struct
+
+from ..write_mdx import pack_chunk, pack_inclusive, pack_string
+from ...classes.War3Model import War3Model
+
+
+def save_cameras(model: War3Model):
+    data = bytearray()
+    for camera in model.cameras:
+        camera_data = pack_string(camera.name, 80)
+        camera_data += struct.pack('<3f3f3f', *camera.position, camera.field_of_view, camera.far_clip,
+                                   camera.near_clip, *camera.target)
+        data += pack_inclusive(camera_data)
+    return pack_chunk(b'CAMS', bytes(data)) if len(data) else b''
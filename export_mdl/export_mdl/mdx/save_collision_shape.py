@@ -0,0 +1,15 @@
+import struct
+
+from ..write_mdx import pack_chunk, pack_node, pack_floats
+from ...classes.War3Model import War3Model
+
+
+def save_collision_shape(model: War3Model):
+    data = bytearray()
+    for collider in model.objects['collisionshape']:
+        data += pack_node(collider, collider.name, 0x2000, model)
+        if collider.type == 'Box':
+            data += struct.pack('<I', 0) + pack_floats(x for vert in collider.verts for x in vert)
+        else:
+            data += struct.pack('<I', 2) + pack_floats(collider.verts[0]) + struct.pack('<f', collider.radius)
+    return pack_chunk(b'CLID', bytes(data)) if len(data) else b''
@@ -0,0 +1,10 @@
+from ..write_mdx import pack_chunk, pack_node, pack_node_tracks, write_mdx_events
+from ...classes.War3Model import War3Model
+
+
+def save_event_objects(model: War3Model):
+    data = bytearray()
+    for event in model.objects['eventobject']:
+        data += pack_node(event, event.name, 0x400, model, pack_node_tracks(event, model))
+        data += write_mdx_events(event.track, model)
+    return pack_chunk(b'EVTS', bytes(data)) if len(data) else b''
@@ -0,0 +1,21 @@
+import struct
+
+from ..write_mdx import pack_chunk, pack_inclusive, write_mdx_curve
+from ...classes.War3Model import War3Model
+
+
+def save_geoset_animations(model: War3Model):
+    if not len(model.geoset_anims):
+        return b''
+
+    data = bytearray()
+    for anim in model.geoset_anims:
+        vertex_color = anim.color
+        flags = 0x2 if vertex_color is not None or anim.color_anim is not None else 0
+        color = tuple(reversed(vertex_color[:3])) if vertex_color is not None else (1.0, 1.0, 1.0)
+
+        anim_data = struct.pack('<fI3fI', 1.0, flags, *color, model.geoset_ids[anim.geoset])
+        anim_data += write_mdx_curve(anim.alpha_anim, b'KGAO', model)
+        anim_data += write_mdx_curve(anim.color_anim, b'KGAC', model)
+        data += pack_inclusive(anim_data)
+    return pack_chunk(b'GEOA', bytes(data))
@@ -0,0 +1,75 @@
+import struct
+
+from ..write_mdx import pack_chunk, pack_inclusive, pack_string, pack_extent, pack_floats, pack_uint32s, pack_array
+from ...classes.War3Model import War3Model
+from ...utils import calc_bounds_radius
+
+
+def save_geosets(model: War3Model, settings, version):
+    if not len(model.geosets):
+        return b''
+
+    data = bytearray()
+    for i, geoset in enumerate(model.geosets):
+        check_limits(i, geoset)
+        vertices = geoset.vertices
+        indices = [index for triangle in geoset.triangles for index in triangle]
+        bounds_radius = calc_bounds_radius(geoset.min_extent, geoset.max_extent)
+
+        geoset_data = bytearray()
+        geoset_data += b'VRTX' + struct.pack('<I', len(vertices))
+        geoset_data += pack_floats(x for vertex in vertices for x in vertex.pos)
+        geoset_data += b'NRMS' + struct.pack('<I', len(vertices))
+        geoset_data += pack_floats(x for vertex in vertices for x in vertex.normal)
+        geoset_data += b'PTYP' + struct.pack('<2I', 1, 4)  # A single group of triangles
+        geoset_data += b'PCNT' + struct.pack('<2I', 1, len(indices))
+        geoset_data += b'PVTX' + struct.pack('<I', len(indices)) + pack_array('H', indices)
+
+        matrices = geoset.matrices
+        if settings.use_skinweights:
+            # Every bone the skin weights use is a matrix of its own, the skin weights index into them
+            geoset_data += b'GNDX' + struct.pack('<I', 0)
+        else:
+            geoset_data += b'GNDX' + struct.pack('<I', len(vertices)) + pack_array('B', (v.matrix for v in vertices))
+
+        geoset_data += b'MTGC' + struct.pack('<I', len(matrices)) + pack_uint32s(len(matrix) for matrix in matrices)
+        geoset_data += b'MATS' + struct.pack('<I', sum(len(matrix) for matrix in matrices))
+        geoset_data += pack_uint32s(model.object_indices[name] for matrix in matrices for name in matrix)
+
+        geoset_data += struct.pack('<3I', model.material_ids[geoset.mat_name], 0, 0)  # Selection group and flags
+        if version > 800:
+            geoset_data += struct.pack('<I', 0) + pack_string("", 80)  # LOD and LOD name
+
+        geoset_data += pack_extent(geoset.min_extent, geoset.max_extent, bounds_radius)
+        geoset_data += struct.pack('<I', len(model.sequences))
+        for _ in model.sequences:
+            # As of right now, we just use the geoset bounds.
+            geoset_data += pack_extent(geoset.min_extent, geoset.max_extent, bounds_radius)
+
+        if settings.use_skinweights:
+            geoset_data += b'TANG' + struct.pack('<I', len(vertices))
+            geoset_data += pack_floats(x for vertex in vertices for x in
+                                       tuple(vertex.normal) + (-1.0 if sum(vertex.normal) < 0 else 1.0,))
+            skins = []
+            for vertex in vertices:
+                bones = [geoset.matrix_map[(name,)] for name in vertex.bone_list or ()]
+                skins += (bones + [0, 0, 0, 0])[:4]
+                skins += (list(vertex.weight_list or ()) + [0, 0, 0, 0])[:4]
+            geoset_data += b'SKIN' + struct.pack('<I', len(skins)) + pack_array('B', skins)
+
+        geoset_data += b'UVAS' + struct.pack('<I', 1)
+        geoset_data += b'UVBS' + struct.pack('<I', len(vertices))
+        geoset_data += pack_floats(x for vertex in vertices for x in vertex.uv)
+
+        data += pack_inclusive(bytes(geoset_data))
+    return pack_chunk(b'GEOS', bytes(data))
+
+
+def check_limits(index, geoset):
+    # MDX stores vertex indices in 16 bits, and matrix and skin bone indices, which point into the matrices, in 8
+    if len(geoset.vertices) > 65536:
+        raise ValueError("Geoset %d (%s) has %d vertices, MDX allows at most 65536 per geoset" %
+                         (index, geoset.mat_name, len(geoset.vertices)))
+    if len(geoset.matrices) > 256:
+        raise ValueError("Geoset %d (%s) uses %d matrices or skin bones, MDX allows at most 256 per geoset" %
+                         (index, geoset.mat_name, len(geoset.matrices)))
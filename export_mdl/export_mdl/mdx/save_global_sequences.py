@@ -0,0 +1,8 @@
+from ..write_mdx import pack_chunk, pack_uint32s
+from ...classes.War3Model import War3Model
+
+
+def save_global_sequences(model: War3Model):
+    if len(model.global_seqs):
+        return pack_chunk(b'GLBS', pack_uint32s(int(sequence) for sequence in model.global_seqs))
+    return b''
@@ -0,0 +1,13 @@
+from ..write_mdx import pack_chunk, pack_node, pack_node_tracks
+from ...classes.War3Model import War3Model
+
+
+def save_helpers(model: War3Model):
+    data = bytearray()
+    for helper in model.objects['helper']:
+        name = helper.name.replace('.', '_')
+        if not name.lower().startswith("bone"):
+            name = "Bone_" + name
+
+        data += pack_node(helper, name, 0, model, pack_node_tracks(helper, model))
+    return pack_chunk(b'HELP', bytes(data)) if len(data) else b''
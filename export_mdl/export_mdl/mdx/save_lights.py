@@ -0,0 +1,24 @@
+import struct
+
+from ..write_mdx import pack_chunk, pack_inclusive, pack_node, pack_node_tracks, write_mdx_curve
+from ...classes.War3Model import War3Model
+
+light_types = {'Omnidirectional': 0, 'Directional': 1, 'Ambient': 2}
+
+
+def save_lights(model: War3Model):
+    data = bytearray()
+    for light in model.objects['light']:
+        light_data = pack_node(light, light.name, 0x200, model, pack_node_tracks(light, model))
+        light_data += struct.pack('<I2f3ff3ff', light_types[light.type], light.atten_start, light.atten_end,
+                                  *reversed(light.color[:3]), light.intensity,
+                                  *reversed(light.amb_color[:3]), light.amb_intensity)
+        light_data += write_mdx_curve(light.atten_start_anim, b'KLAS', model)
+        light_data += write_mdx_curve(light.atten_end_anim, b'KLAE', model)
+        light_data += write_mdx_curve(light.color_anim, b'KLAC', model)
+        light_data += write_mdx_curve(light.intensity_anim, b'KLAI', model)
+        light_data += write_mdx_curve(light.amb_intensity_anim, b'KLBI', model)
+        light_data += write_mdx_curve(light.amb_color_anim, b'KLBC', model)
+        light_data += write_mdx_curve(light.visibility, b'KLAV', model)
+        data += pack_inclusive(light_data)
+    return pack_chunk(b'LITE', bytes(data)) if len(data) else b''
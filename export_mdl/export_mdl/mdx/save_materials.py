@@ -0,0 +1,40 @@
+import struct
+
+from ..write_mdx import NONE, pack_chunk, pack_inclusive, pack_string, write_mdx_curve
+from ...classes.War3Model import War3Model
+
+filter_modes = {'None': 0, 'Transparent': 1, 'Blend': 2, 'Additive': 3, 'AddAlpha': 4, 'Modulate': 5, 'Modulate2x': 6}
+
+
+def save_materials(model: War3Model, version):
+    if not len(model.materials):
+        return b''
+
+    data = bytearray()
+    for material in model.materials:
+        flags = 0x1 if material.use_const_color is True else 0
+        material_data = struct.pack('<iI', material.priority_plane, flags)
+        if version > 800:
+            material_data += pack_string("", 80)  # Shader
+
+        material_data += b'LAYS' + struct.pack('<I', len(material.layers))
+        for layer in material.layers:
+            shading = 0
+            for flag, value in ((layer.unshaded, 0x1), (layer.two_sided, 0x10), (layer.unfogged, 0x20),
+                                (layer.no_depth_test, 0x40), (layer.no_depth_set, 0x80)):
+                if flag:
+                    shading |= value
+
+            texture_id = model.texture_ids[layer.texture] if layer.texture is not None else 0
+            texture_anim_id = model.tvertex_anim_ids[layer.texture_anim] if layer.texture_anim is not None else NONE
+
+            layer_data = struct.pack('<5If', filter_modes.get(layer.filter_mode, 0), shading, texture_id,
+                                     texture_anim_id, 0, layer.alpha_value)
+            if version > 800:
+                layer_data += struct.pack('<f', 1.0)  # EmissiveGain
+
+            layer_data += write_mdx_curve(layer.alpha_anim, b'KMTA', model)
+            material_data += pack_inclusive(layer_data)
+
+        data += pack_inclusive(material_data)
+    return pack_chunk(b'MTLS', bytes(data))
@@ -0,0 +1,23 @@
+import struct
+
+from ..write_mdx import pack_chunk, pack_inclusive, pack_node, pack_node_tracks, pack_string, write_mdx_curve
+from ...classes.War3Model import War3Model
+
+
+def save_model_emitters(model: War3Model):
+    data = bytearray()
+    for psys in model.objects['particle']:
+        emitter = psys.emitter
+        psys_data = pack_node(psys, psys.name, 0x1000 | 0x8000, model, pack_node_tracks(psys, model))  # EmitterUsesMDL
+        psys_data += struct.pack('<4f', emitter.emission_rate, emitter.gravity, emitter.longitude, emitter.latitude)
+        psys_data += pack_string(emitter.model_path, 260)
+        psys_data += struct.pack('<2f', emitter.life_span, emitter.speed)
+        psys_data += write_mdx_curve(psys.emission_rate_anim, b'KPEE', model)
+        psys_data += write_mdx_curve(psys.gravity_anim, b'KPEG', model)
+        psys_data += write_mdx_curve(psys.longitude_anim, b'KPLN', model)
+        psys_data += write_mdx_curve(psys.latitude_anim, b'KPLT', model)
+        psys_data += write_mdx_curve(psys.life_span_anim, b'KPEL', model)
+        psys_data += write_mdx_curve(psys.speed_anim, b'KPES', model)
+        psys_data += write_mdx_curve(psys.visibility, b'KPEV', model)
+        data += pack_inclusive(psys_data)
+    return pack_chunk(b'PREM', bytes(data)) if len(data) else b''
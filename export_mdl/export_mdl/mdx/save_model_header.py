@@ -0,0 +1,13 @@
+import struct
+
+from ..write_mdx import pack_chunk, pack_string, pack_extent
+from ...classes.War3Model import War3Model
+from ...utils import calc_bounds_radius
+
+
+def save_model_header(model: War3Model):
+    data = pack_string(model.name, 80) + pack_string("", 260)
+    data += pack_extent(model.global_extents_min, model.global_extents_max,
+                        calc_bounds_radius(model.global_extents_min, model.global_extents_max))
+    data += struct.pack('<I', 150)  # BlendTime
+    return pack_chunk(b'MODL', data)
@@ -0,0 +1,50 @@
+import struct
+
+from ..write_mdx import pack_chunk, pack_inclusive, pack_node, pack_node_tracks, pack_array, pack_floats, \
+    write_mdx_curve
+from ...classes.War3Model import War3Model
+
+filter_modes = {'None': 0, 'Blend': 0, 'Additive': 1, 'AddAlpha': 1, 'Modulate': 2, 'Modulate2x': 3,
+                'Transparent': 4}
+
+
+def save_particle_emitters(model: War3Model):
+    data = bytearray()
+    for psys in model.objects['particle2']:
+        emitter = psys.emitter
+
+        flags = 0x1000
+        for flag, value in ((emitter.unshaded, 0x8000), (emitter.sort_far_z, 0x10000), (emitter.line_emitter, 0x20000),
+                            (emitter.unfogged, 0x40000), (emitter.model_space, 0x80000), (emitter.xy_quad, 0x100000)):
+            if flag:
+                flags |= value
+
+        if emitter.head and emitter.tail:
+            head_or_tail = 2
+        elif emitter.tail:
+            head_or_tail = 1
+        else:
+            head_or_tail = 0
+
+        psys_data = pack_node(psys, psys.name, flags, model, pack_node_tracks(psys, model))
+        psys_data += struct.pack('<8f', emitter.speed, emitter.variation, emitter.latitude, emitter.gravity,
+                                 emitter.life_span, emitter.emission_rate, psys.dimensions[1], psys.dimensions[0])
+        psys_data += struct.pack('<4I2f', filter_modes.get(emitter.filter_mode, 0), emitter.rows, emitter.cols,
+                                 head_or_tail, emitter.tail_length, emitter.time)
+        psys_data += pack_floats((*reversed(emitter.start_color), *reversed(emitter.mid_color),
+                                  *reversed(emitter.end_color)))
+        psys_data += pack_array('B', (emitter.start_alpha, emitter.mid_alpha, emitter.end_alpha))
+        psys_data += struct.pack('<3f', emitter.start_scale, emitter.mid_scale, emitter.end_scale)
+        psys_data += struct.pack('<12I', emitter.head_life_start, emitter.head_life_end, emitter.head_life_repeat,
+                                 emitter.head_decay_start, emitter.head_decay_end, emitter.head_decay_repeat,
+                                 emitter.tail_life_start, emitter.tail_life_end, emitter.tail_life_repeat,
+                                 emitter.tail_decay_start, emitter.tail_decay_end, emitter.tail_decay_repeat)
+        psys_data += struct.pack('<2IiI', model.texture_ids[emitter.texture_path], 0, emitter.priority_plane, 0)
+        psys_data += write_mdx_curve(psys.speed_anim, b'KP2S', model)
+        psys_data += write_mdx_curve(psys.variation_anim, b'KP2R', model)
+        psys_data += write_mdx_curve(psys.latitude_anim, b'KP2L', model)
+        psys_data += write_mdx_curve(psys.gravity_anim, b'KP2G', model)
+        psys_data += write_mdx_curve(psys.emission_rate_anim, b'KP2E', model)
+        psys_data += write_mdx_curve(psys.visibility, b'KP2V', model)
+        data += pack_inclusive(psys_data)
+    return pack_chunk(b'PRE2', bytes(data)) if len(data) else b''
@@ -0,0 +1,8 @@
+from ..write_mdx import pack_chunk, pack_floats
+from ...classes.War3Model import War3Model
+
+
+def save_pivot_points(model: War3Model):
+    if len(model.objects_all):
+        return pack_chunk(b'PIVT', pack_floats(x for obj in model.objects_all for x in obj.pivot))
+    return b''
@@ -0,0 +1,26 @@
+import struct
+
+from ..write_mdx import pack_chunk, pack_inclusive, pack_node, pack_node_tracks, write_mdx_curve
+from ...classes.War3Model import War3Model
+
+
+def save_ribbon_emitters(model: War3Model):
+    data = bytearray()
+    for psys in model.objects['ribbon']:
+        emitter = psys.emitter
+        material_id = 0
+        for material in model.materials:
+            if material.name == emitter.ribbon_material.name:
+                material_id = model.material_ids[material.name]
+                break
+
+        psys_data = pack_node(psys, psys.name, 0x4000, model, pack_node_tracks(psys, model))
+        psys_data += struct.pack('<3f3ff5If', psys.dimensions[0] / 2, psys.dimensions[0] / 2, emitter.alpha,
+                                 *reversed(emitter.ribbon_color), emitter.life_span,
+                                 model.texture_ids[emitter.texture_path], int(emitter.emission_rate),
+                                 emitter.rows, emitter.cols, material_id, emitter.gravity)
+        psys_data += write_mdx_curve(psys.alpha_anim, b'KRAL', model)
+        psys_data += write_mdx_curve(psys.ribbon_color_anim, b'KRCO', model)
+        psys_data += write_mdx_curve(psys.visibility, b'KRVS', model)
+        data += pack_inclusive(psys_data)
+    return pack_chunk(b'RIBB', bytes(data)) if len(data) else b''
@@ -0,0 +1,18 @@
+import struct
+
+from ..write_mdx import pack_chunk, pack_string, pack_extent
+from ...classes.War3Model import War3Model
+from ...utils import calc_bounds_radius
+
+
+def save_sequences(model: War3Model):
+    data = bytearray()
+    bounds_radius = calc_bounds_radius(model.global_extents_min, model.global_extents_max)
+    for sequence in model.sequences:
+        move_speed = sequence.movement_speed if 'walk' in sequence.name.lower() else 0
+        rarity = sequence.rarity if sequence.rarity > 0 else 0
+        data += pack_string(sequence.name, 80)
+        data += struct.pack('<2IfIfI', int(sequence.start), int(sequence.end), move_speed,
+                            1 if sequence.non_looping else 0, rarity, 0)
+        data += pack_extent(model.global_extents_min, model.global_extents_max, bounds_radius)
+    return pack_chunk(b'SEQS', bytes(data))
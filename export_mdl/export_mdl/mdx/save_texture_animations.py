@@ -0,0 +1,14 @@
+from ..write_mdx import pack_chunk, pack_inclusive, write_mdx_curve
+from ...classes.War3Model import War3Model
+
+
+def save_texture_animations(model: War3Model):
+    if not len(model.tvertex_anims):
+        return b''
+
+    data = bytearray()
+    for uv_anim in model.tvertex_anims:
+        data += pack_inclusive(write_mdx_curve(uv_anim.translation, b'KTAT', model) +
+                               write_mdx_curve(uv_anim.rotation, b'KTAR', model) +
+                               write_mdx_curve(uv_anim.scale, b'KTAS', model))
+    return pack_chunk(b'TXAN', bytes(data))
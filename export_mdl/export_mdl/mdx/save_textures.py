@@ -0,0 +1,18 @@
+import struct
+
+from ..write_mdx import pack_chunk, pack_string
+from ...classes.War3Model import War3Model
+
+
+def save_textures(model: War3Model):
+    if not len(model.textures):
+        return b''
+
+    data = bytearray()
+    for texture in model.textures:
+        if texture.startswith("ReplaceableId"):
+            data += struct.pack('<I', int(texture.split()[-1])) + pack_string("", 260)
+        else:
+            data += struct.pack('<I', 0) + pack_string(texture, 260)
+        data += struct.pack('<I', 0x1 | 0x2)  # WrapWidth, WrapHeight
+    return pack_chunk(b'TEXS', bytes(data))
@@ -0,0 +1,331 @@
+import json
+import os
+from collections import defaultdict
+
+import numpy as np
+
+from ..classes.War3AnimationSequence import War3AnimationSequence
+from ..classes.War3Camera import War3Camera
+from ..classes.War3Geoset import War3Geoset
+from ..classes.War3GeosetAnim import War3GeosetAnim
+from ..classes.War3Model import War3Model
+from ..classes.War3Vertex import War3Vertex
+from ..classes.model_utils.build_id_tables import build_id_tables
+
+# A War3Model saved as plain data: a JSON file with the nodes, materials and track settings, next to an .npz
+# file with the geometry and keyframes. Loading it gives a model the writers accept, without bpy.
+
+ir_version = 2
+settings_fields = ('use_skinweights', 'shortest_floats')  # All the writers read from the settings
+
+
+class Record:
+    # Attribute bag for loaded nodes, layers and tracks. Hashes by identity, like the objects it stands in for.
+    def __init__(self, **attrs):
+        self.__dict__.update(attrs)
+
+
+def is_track(value):
+    return hasattr(value, 'keyframes') and hasattr(value, 'handles_left')
+
+
+def is_blender_id(value):
+    return hasattr(value, 'bl_rna') and hasattr(value, 'users')
+
+
+class IRWriter:
+    def __init__(self):
+        self.arrays = {}
+        self.tracks = []
+        self.track_ids = {}  # id(curve) -> index, interned curves are stored once
+        self.track_data = defaultdict(list)
+
+    def add_array(self, name, values, dtype):
+        self.arrays[name] = np.asarray(values, dtype=dtype)
+
+    def add_track(self, curve):
+        index = self.track_ids.get(id(curve))
+        if index is not None:
+            return index
+
+        frames = sorted(curve.keyframes.keys())
+        width = len(curve.keyframes[frames[0]]) if len(frames) else 0
+        has_handles = len(curve.handles_left) > 0
+        self.tracks.append({
+            'type': curve.type,
+            'interpolation': curve.interpolation,
+            'global_sequence': curve.global_sequence,
+            'count': len(frames),
+            'width': width,
+            'handles': has_handles,
+        })
+        self.track_data['track_frames'] += frames
+        self.track_data['track_values'] += [x for frame in frames for x in curve.keyframes[frame]]
+        if has_handles:
+            self.track_data['track_handles_left'] += [x for frame in frames for x in curve.handles_left[frame]]
+            self.track_data['track_handles_right'] += [x for frame in frames for x in curve.handles_right[frame]]
+
+        index = len(self.tracks) - 1
+        self.track_ids[id(curve)] = index
+        return index
+
+    def encode(self, value):
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, np.generic):
+            return value.item()
+        if is_track(value):
+            return {'$track': self.add_track(value)}
+        if is_blender_id(value):
+            return value.name  # Datablocks are referred to by name, the same as the nodes refer to each other
+        if hasattr(value, 'bl_rna'):
+            return {'$struct': self.snapshot(value)}
+        if isinstance(value, dict):
+            return {'$dict': [[self.encode(k), self.encode(v)] for k, v in value.items()]}
+        return [self.encode(x) for x in value]
+
+    def snapshot(self, struct):
+        # Settings like the particle emitter properties are copied property by property
+        data = {}
+        for prop in struct.bl_rna.properties:
+            name = prop.identifier
+            if name == 'rna_type' or prop.type == 'COLLECTION':
+                continue
+            value = getattr(struct, name)
+            if prop.type == 'POINTER':
+                data[name] = None if value is None else {'$struct': {'name': value.name}}
+            else:
+                data[name] = self.encode(value)
+        return data
+
+    def encode_node(self, obj):
+        return {'class': type(obj).__name__, 'attrs': {k: self.encode(v) for k, v in vars(obj).items()}}
+
+    def encode_geoset(self, index, geoset: War3Geoset, model: War3Model):
+        vertices = geoset.vertices
+        prefix = 'geoset%d_' % index
+        self.add_array(prefix + 'pos', [v.pos for v in vertices], np.float64)
+        self.add_array(prefix + 'normal', [v.normal for v in vertices], np.float64)
+        self.add_array(prefix + 'uv', [v.uv for v in vertices], np.float64)
+        self.add_array(prefix + 'matrix', [-1 if v.matrix is None else v.matrix for v in vertices], np.int64)
+        self.add_array(prefix + 'triangles', geoset.triangles, np.int64)
+
+        tangents = [v.tangent for v in vertices if v.tangent is not None]
+        if len(tangents) == len(vertices) and len(vertices):
+            self.add_array(prefix + 'tangent', tangents, np.float64)
+
+        # Skin data as a table of bone names plus flat per-vertex lists
+        skin_names = sorted(set(name for v in vertices for name in v.bone_list or ()))
+        if len(skin_names):
+            name_ids = {name: i for i, name in enumerate(skin_names)}
+            self.add_array(prefix + 'bone_counts', [-1 if v.bone_list is None else len(v.bone_list) for v in vertices], np.int64)
+            self.add_array(prefix + 'bones', [name_ids[name] for v in vertices for name in v.bone_list or ()], np.int64)
+            self.add_array(prefix + 'weight_counts', [-1 if v.weight_list is None else len(v.weight_list) for v in vertices], np.int64)
+            self.add_array(prefix + 'weights', [w for v in vertices for w in v.weight_list or ()], np.int64)
+
+        return {
+            'mat_name': geoset.mat_name,
+            'min_extent': self.encode(geoset.min_extent),
+            'max_extent': self.encode(geoset.max_extent),
+            'matrices': self.encode(geoset.matrices),
+            'skin_names': skin_names,
+            'objects': self.encode(geoset.objects),
+            'geoset_anim': model.geoset_anim_ids.get(geoset.geoset_anim) if geoset.geoset_anim is not None else None,
+        }
+
+    def finish_tracks(self):
+        for name in ('track_frames', 'track_values', 'track_handles_left', 'track_handles_right'):
+            self.add_array(name, self.track_data[name], np.float64)
+
+
+def model_to_ir(model: War3Model, settings):
+    writer = IRWriter()
+    nodes = {obj.name: writer.encode_node(obj) for obj in model.objects_all}
+
+    meta = {
+        'version': ir_version,
+        'name': model.name,
+        'f2ms': model.f2ms,
+        'settings': {field: getattr(settings, field) for field in settings_fields},
+        'sequences': [writer.encode(vars(sequence)) for sequence in model.sequences],
+        'global_seqs': writer.encode(model.global_seqs),
+        'global_extents': writer.encode((model.global_extents_min, model.global_extents_max)),
+        'textures': writer.encode(model.textures),
+        'tvertex_anims': [{key: writer.encode(getattr(anim, key)) for key in ('translation', 'rotation', 'scale')}
+                          for anim in model.tvertex_anims],
+        'materials': [{
+            'name': material.name,
+            'priority_plane': material.priority_plane,
+            'use_const_color': material.use_const_color,
+            'layers': [{key: (model.tvertex_anim_ids[value] if key == 'texture_anim' and value is not None else writer.encode(value))
+                        for key, value in vars(layer).items()} for layer in material.layers],
+        } for material in model.materials],
+        'geoset_anims': [{
+            'color': writer.encode(anim.color),
+            'color_anim': writer.encode(anim.color_anim),
+            'alpha_anim': writer.encode(anim.alpha_anim),
+            'geoset': model.geoset_ids.get(anim.geoset),
+        } for anim in model.geoset_anims],
+        'geosets': [writer.encode_geoset(i, geoset, model) for i, geoset in enumerate(model.geosets)],
+        'nodes': nodes,
+        'objects': {tag: [obj.name for obj in objects] for tag, objects in model.objects.items()},
+        'objects_all': [obj.name for obj in model.objects_all],
+        'object_indices': model.object_indices,
+        'geoset_anim_map': {bone: model.geoset_anim_ids[anim] for bone, anim in model.geoset_anim_map.items()},
+        'bone_geosets': {bone: [model.geoset_ids[g] for g in geosets] for bone, geosets in model.bone_geosets.items()},
+        'cameras': [writer.encode(vars(camera)) for camera in model.cameras],
+    }
+    writer.finish_tracks()
+    meta['tracks'] = writer.tracks
+    return meta, writer.arrays
+
+
+class IRReader:
+    def __init__(self, meta, arrays):
+        self.arrays = arrays
+        self.tracks = []
+
+        frames = arrays['track_frames'].tolist()
+        values = arrays['track_values'].tolist()
+        handles_left = arrays['track_handles_left'].tolist()
+        handles_right = arrays['track_handles_right'].tolist()
+        frame_offset = value_offset = handle_offset = 0
+        for track in meta['tracks']:
+            count, width = track['count'], track['width']
+            track_frames = frames[frame_offset:frame_offset + count]
+            keyframes = {}
+            lefts = {}
+            rights = {}
+            for i, frame in enumerate(track_frames):
+                keyframes[frame] = tuple(values[value_offset + i * width:value_offset + (i + 1) * width])
+                if track['handles']:
+                    lefts[frame] = tuple(handles_left[handle_offset + i * width:handle_offset + (i + 1) * width])
+                    rights[frame] = tuple(handles_right[handle_offset + i * width:handle_offset + (i + 1) * width])
+            frame_offset += count
+            value_offset += count * width
+            if track['handles']:
+                handle_offset += count * width
+            self.tracks.append(Record(keyframes=keyframes, handles_left=lefts, handles_right=rights, type=track['type'],
+                                      interpolation=track['interpolation'], global_sequence=track['global_sequence']))
+
+    def decode(self, value):
+        if isinstance(value, list):
+            return tuple(self.decode(x) for x in value)
+        if isinstance(value, dict):
+            if '$track' in value:
+                return self.tracks[value['$track']]
+            if '$struct' in value:
+                return Record(**{k: self.decode(v) for k, v in value['$struct'].items()})
+            if '$dict' in value:
+                return {self.decode(k): self.decode(v) for k, v in value['$dict']}
+        return value
+
+    def decode_geoset(self, index, data):
+        prefix = 'geoset%d_' % index
+        arrays = self.arrays
+        count = len(arrays[prefix + 'pos'])
+        positions = arrays[prefix + 'pos'].tolist()
+        normals = arrays[prefix + 'normal'].tolist()
+        uvs = arrays[prefix + 'uv'].tolist()
+        matrices = arrays[prefix + 'matrix'].tolist()
+        tangents = arrays[prefix + 'tangent'].tolist() if prefix + 'tangent' in arrays else [None] * count
+
+        bone_lists = weight_lists = [None] * count
+        if len(data['skin_names']):
+            bone_lists = self.split(arrays[prefix + 'bone_counts'], [data['skin_names'][i] for i in arrays[prefix + 'bones'].tolist()])
+            weight_lists = self.split(arrays[prefix + 'weight_counts'], arrays[prefix + 'weights'].tolist())
+
+        geoset = War3Geoset()
+        geoset.vertices = [War3Vertex(tuple(pos), tuple(normal), tuple(uv), None if matrix < 0 else matrix, bones, weights,
+                                      None if tangent is None else tuple(tangent))
+                           for pos, normal, uv, matrix, bones, weights, tangent
+                           in zip(positions, normals, uvs, matrices, bone_lists, weight_lists, tangents)]
+        geoset.triangles = [tuple(triangle) for triangle in arrays[prefix + 'triangles'].reshape(-1, 3).tolist()]
+        geoset.matrices = [tuple(matrix) for matrix in self.decode(data['matrices'])]
+        geoset.matrix_map = {matrix: i for i, matrix in enumerate(geoset.matrices)}
+        for i, matrix in enumerate(geoset.matrices):
+            for bone in matrix:
+                geoset.bone_matrices.setdefault(bone, []).append(i)
+        geoset.objects = list(self.decode(data['objects']))
+        geoset.min_extent = self.decode(data['min_extent'])
+        geoset.max_extent = self.decode(data['max_extent'])
+        geoset.mat_name = data['mat_name']
+        return geoset
+
+    @staticmethod
+    def split(counts, values):
+        lists = []
+        offset = 0
+        for count in counts.tolist():
+            if count < 0:
+                lists.append(None)
+            else:
+                lists.append(tuple(values[offset:offset + count]))
+                offset += count
+        return lists
+
+
+def ir_to_model(meta, arrays):
+    if meta['version'] != ir_version:
+        raise ValueError("Unsupported intermediate model version %s" % meta['version'])
+
+    reader = IRReader(meta, arrays)
+    decode = reader.decode
+
+    model = War3Model()
+    model.name = meta['name']
+    model.f2ms = meta['f2ms']
+    model.sequences = [War3AnimationSequence(**decode(sequence)) for sequence in meta['sequences']]
+    model.global_seqs = list(decode(meta['global_seqs']))
+    model.global_extents_min, model.global_extents_max = decode(meta['global_extents'])
+    model.textures = list(decode(meta['textures']))
+    model.tvertex_anims = [Record(**{k: decode(v) for k, v in anim.items()}) for anim in meta['tvertex_anims']]
+
+    for data in meta['materials']:
+        layers = []
+        for layer in data['layers']:
+            attrs = {k: decode(v) for k, v in layer.items() if k != 'texture_anim'}
+            texture_anim = layer.get('texture_anim')
+            attrs['texture_anim'] = None if texture_anim is None else model.tvertex_anims[texture_anim]
+            layers.append(Record(**attrs))
+        model.materials.append(Record(name=data['name'], priority_plane=data['priority_plane'],
+                                      use_const_color=data['use_const_color'], layers=layers))
+
+    model.geosets = [reader.decode_geoset(i, data) for i, data in enumerate(meta['geosets'])]
+    for data in meta['geoset_anims']:
+        anim = War3GeosetAnim(decode(data['color']), decode(data['color_anim']), decode(data['alpha_anim']))
+        anim.geoset = None if data['geoset'] is None else model.geosets[data['geoset']]
+        model.geoset_anims.append(anim)
+    for geoset, data in zip(model.geosets, meta['geosets']):
+        if data['geoset_anim'] is not None:
+            geoset.geoset_anim = model.geoset_anims[data['geoset_anim']]
+
+    nodes = {name: Record(**{k: decode(v) for k, v in node['attrs'].items()}) for name, node in meta['nodes'].items()}
+    model.objects = defaultdict(list)
+    for tag, names in meta['objects'].items():
+        model.objects[tag] = [nodes[name] for name in names]
+    model.objects_all = [nodes[name] for name in meta['objects_all']]
+    model.object_indices = dict(meta['object_indices'])
+    model.geoset_anim_map = {bone: model.geoset_anims[i] for bone, i in meta['geoset_anim_map'].items()}
+    model.bone_geosets = {bone: [model.geosets[i] for i in ids] for bone, ids in meta['bone_geosets'].items()}
+    model.cameras = [War3Camera(**decode(camera)) for camera in meta['cameras']]
+
+    build_id_tables(model)
+    settings = Record(**meta['settings'])
+    return model, settings
+
+
+def save_model_ir(model: War3Model, settings, filepath):
+    # Writes filepath as JSON, plus the arrays to the same path with an .npz extension
+    meta, arrays = model_to_ir(model, settings)
+    np.savez_compressed(os.path.splitext(filepath)[0] + '.npz', **arrays)
+    with open(filepath, 'w') as output:
+        json.dump(meta, output, separators=(',', ':'))
+
+
+def load_model_ir(filepath):
+    with open(filepath) as file:
+        meta = json.load(file)
+    with np.load(os.path.splitext(filepath)[0] + '.npz') as data:
+        arrays = {name: data[name] for name in data.files}
+    return ir_to_model(meta, arrays)
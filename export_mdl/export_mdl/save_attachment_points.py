@@ -5,7 +5,7 @@ from .write_mdl import write_mdl
 from ..classes.War3Model import War3Model
 
 
-def save_attachment_points(fw: TextIO.write, model: War3Model):
+def save_attachment_points(fw: TextIO.write, model: War3Model, float_mode='FIXED'):
     if len(model.objects['attachment']):
         for i, attachment in enumerate(model.objects['attachment']):
             fw("Attachment \"%s\" {\n" % attachment.name)
@@ -25,6 +25,6 @@ def save_attachment_points(fw: TextIO.write, model: War3Model):
                 write_mdl(visibility.keyframes, visibility.type,
                           visibility.interpolation, visibility.global_sequence,
                           visibility.handles_left, visibility.handles_right,
-                          "Visibility", fw, model.global_seqs, "\t")
+                          "Visibility", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
                 # write_anim(visibility, "Visibility", fw, global_seqs, "\t", True)
             fw("}\n")
@@ -1,4 +1,3 @@
-import itertools
 from typing import TextIO
 
 from .write_billboard import write_billboard
@@ -6,7 +5,7 @@ from .write_mdl import write_mdl
 from ..classes.War3Model import War3Model
 
 
-def save_bones(fw: TextIO.write, model: War3Model):
+def save_bones(fw: TextIO.write, model: War3Model, float_mode='FIXED'):
     for bone in model.objects['bone']:
         name = bone.name.replace('.', '_')
         if not name.lower().startswith("bone"):
@@ -21,14 +20,14 @@ def save_bones(fw: TextIO.write, model: War3Model):
         if hasattr(bone, "billboarded"):
             write_billboard(fw, bone.billboarded, bone.billboard_lock)
 
-        children = [g for g in model.geosets if bone.name in itertools.chain.from_iterable(g.matrices)]
+        children = model.bone_geosets.get(bone.name, ())
         if len(children) == 1:
-            fw("\tGeosetId %d,\n" % model.geosets.index(children[0]))
+            fw("\tGeosetId %d,\n" % model.geoset_ids[children[0]])
         else:
             fw("\tGeosetId -1,\n")
 
         if bone.name in model.geoset_anim_map.keys():
-            fw("\tGeosetAnimId %d,\n" % model.geoset_anims.index(model.geoset_anim_map[bone.name]))
+            fw("\tGeosetAnimId %d,\n" % model.geoset_anim_ids[model.geoset_anim_map[bone.name]])
         else:
             fw("\tGeosetAnimId None,\n")
 
@@ -36,19 +35,19 @@ def save_bones(fw: TextIO.write, model: War3Model):
             write_mdl(bone.anim_loc.keyframes, bone.anim_loc.type,
                       bone.anim_loc.interpolation, bone.anim_loc.global_sequence,
                       bone.anim_loc.handles_left, bone.anim_loc.handles_right,
-                      "Translation", fw, model.global_seqs, "\t")
+                      "Translation", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
 
         if bone.anim_rot is not None:
             write_mdl(bone.anim_rot.keyframes, bone.anim_rot.type,
                       bone.anim_rot.interpolation, bone.anim_rot.global_sequence,
                       bone.anim_rot.handles_left, bone.anim_rot.handles_right,
-                      "Rotation", fw, model.global_seqs, "\t")
+                      "Rotation", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
 
         if bone.anim_scale is not None:
             write_mdl(bone.anim_scale.keyframes, bone.anim_scale.type,
                       bone.anim_scale.interpolation, bone.anim_scale.global_sequence,
                       bone.anim_scale.handles_left, bone.anim_scale.handles_right,
-                      "Scaling", fw, model.global_seqs, "\t")
+                      "Scaling", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
 
         # Visibility
         fw("}\n")
@@ -4,7 +4,7 @@ from .write_mdl import write_mdl
 from ..classes.War3Model import War3Model
 
 
-def save_event_objects(fw: TextIO.write, model: War3Model):
+def save_event_objects(fw: TextIO.write, model: War3Model, float_mode='FIXED'):
     for event in model.objects['eventobject']:
         fw("EventObject \"%s\" {\n" % event.name)
         if len(model.object_indices) > 1:
@@ -17,6 +17,6 @@ def save_event_objects(fw: TextIO.write, model: War3Model):
             write_mdl(event_track.keyframes, event_track.type,
                       event_track.interpolation, event_track.global_sequence,
                       event_track.handles_left, event_track.handles_right,
-                      "EventTrack", fw, model.global_seqs, "\t")
+                      "EventTrack", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
 
         fw("}\n")
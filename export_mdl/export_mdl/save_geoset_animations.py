@@ -5,7 +5,7 @@ from ..classes.War3Model import War3Model
 from ..utils import f2s
 
 
-def save_geoset_animations(fw: TextIO.write, model: War3Model):
+def save_geoset_animations(fw: TextIO.write, model: War3Model, float_mode='FIXED'):
     if len(model.geoset_anims):
         for anim in model.geoset_anims:
             fw("GeosetAnim {\n")
@@ -17,7 +17,7 @@ def save_geoset_animations(fw: TextIO.write, model: War3Model):
                 write_mdl(alpha.keyframes, alpha.type,
                           alpha.interpolation, alpha.global_sequence,
                           alpha.handles_left, alpha.handles_right,
-                          "Alpha", fw, model.global_seqs, "\t")
+                          "Alpha", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
             else:
                 fw("\tstatic Alpha 1.0,\n")
 
@@ -25,11 +25,11 @@ def save_geoset_animations(fw: TextIO.write, model: War3Model):
                 write_mdl(vertex_color_anim.keyframes, vertex_color_anim.type,
                           vertex_color_anim.interpolation, vertex_color_anim.global_sequence,
                           vertex_color_anim.handles_left, vertex_color_anim.handles_right,
-                          "Color", fw, model.global_seqs, "\t")
+                          "Color", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
 
             elif vertex_color is not None:
                 fw("\tstatic Color {%s, %s, %s},\n" % tuple(map(f2s, reversed(vertex_color[:3]))))
 
-            fw("\tGeosetId %d,\n" % model.geosets.index(anim.geoset))
+            fw("\tGeosetId %d,\n" % model.geoset_ids[anim.geoset])
 
             fw("}\n")
@@ -4,10 +4,11 @@ from ..classes.War3Model import War3Model
 from ..utils import f2s, calc_bounds_radius
 
 
-def save_geosets(fw: TextIO.write, material_names, model: War3Model, settings):
+def save_geosets(fw: TextIO.write, model: War3Model, settings, float_mode='FIXED'):
     if len(model.geosets):
         for geoset in model.geosets:
-            geoset.write_geoset(fw, material_names, model.sequences, model.object_indices, settings)
+            geoset.write_geoset(fw, model.material_ids, model.sequences, model.object_indices, settings,
+                                float_mode)
             # fw("Geoset {\n")
             # # Vertices
             # fw("\tVertices %d {\n" % len(geoset.vertices))
@@ -5,7 +5,7 @@ from .write_mdl import write_mdl
 from ..classes.War3Model import War3Model
 
 
-def save_helpers(fw: TextIO.write, model: War3Model):
+def save_helpers(fw: TextIO.write, model: War3Model, float_mode='FIXED'):
     for helper in model.objects['helper']:
         name = helper.name.replace('.', '_')
 
@@ -26,18 +26,18 @@ def save_helpers(fw: TextIO.write, model: War3Model):
             write_mdl(helper.anim_loc.keyframes, helper.anim_loc.type,
                       helper.anim_loc.interpolation, helper.anim_loc.global_sequence,
                       helper.anim_loc.handles_left, helper.anim_loc.handles_right,
-                      "Translation", fw, model.global_seqs, "\t")
+                      "Translation", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
 
         if helper.anim_rot is not None:
             write_mdl(helper.anim_rot.keyframes, helper.anim_rot.type,
                       helper.anim_rot.interpolation, helper.anim_rot.global_sequence,
                       helper.anim_rot.handles_left, helper.anim_rot.handles_right,
-                      "Rotation", fw, model.global_seqs, "\t")
+                      "Rotation", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
 
         if helper.anim_scale is not None:
             write_mdl(helper.anim_scale.keyframes, helper.anim_scale.type,
                       helper.anim_scale.interpolation, helper.anim_scale.global_sequence,
                       helper.anim_scale.handles_left, helper.anim_scale.handles_right,
-                      "Scaling", fw, model.global_seqs, "\t")
+                      "Scaling", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
 
         fw("}\n")
@@ -6,9 +6,8 @@ from ..classes.War3Model import War3Model
 from ..utils import f2s
 
 
-def save_lights(fw: TextIO.write, model: War3Model):
+def save_lights(fw: TextIO.write, model: War3Model, float_mode='FIXED'):
     for light in model.objects['light']:
-        l = light.object
         fw("Light \"%s\" {\n" % light.name)
         if len(model.object_indices) > 1:
             fw("\tObjectId %d,\n" % model.object_indices[light.name])
@@ -24,7 +23,7 @@ def save_lights(fw: TextIO.write, model: War3Model):
             write_mdl(light.atten_start_anim.keyframes, light.atten_start_anim.type,
                       light.atten_start_anim.interpolation, light.atten_start_anim.global_sequence,
                       light.atten_start_anim.handles_left, light.atten_start_anim.handles_right,
-                      "AttenuationStart", fw, model.global_seqs, "\t")
+                      "AttenuationStart", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
             # write_anim(light.atten_start_anim, "AttenuationStart", fw, global_seqs, "\t")
         else:
             fw("\tstatic AttenuationStart %s,\n" % f2s(light.atten_start))
@@ -33,7 +32,7 @@ def save_lights(fw: TextIO.write, model: War3Model):
             write_mdl(light.atten_end_anim.keyframes, light.atten_end_anim.type,
                       light.atten_end_anim.interpolation, light.atten_end_anim.global_sequence,
                       light.atten_end_anim.handles_left, light.atten_end_anim.handles_right,
-                      "AttenuationEnd",  fw, model.global_seqs, "\t")
+                      "AttenuationEnd",  fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
             # write_anim(light.atten_end_anim, "AttenuationEnd", fw, global_seqs, "\t")
         else:
             fw("\tstatic AttenuationEnd %s,\n" % f2s(light.atten_end))  # TODO: Add animation support
@@ -42,7 +41,7 @@ def save_lights(fw: TextIO.write, model: War3Model):
             write_mdl(light.color_anim.keyframes, light.color_anim.type,
                       light.color_anim.interpolation, light.color_anim.global_sequence,
                       light.color_anim.handles_left, light.color_anim.handles_right,
-                      "Color", fw, model.global_seqs, "\t")
+                      "Color", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
             # write_anim_vec(light.color_anim, "Color", 'color', fw, global_seqs, Matrix(), Matrix())
         else:
             fw("\tstatic Color {%s, %s, %s},\n" % tuple(map(f2s, reversed(light.color[:3]))))
@@ -51,7 +50,7 @@ def save_lights(fw: TextIO.write, model: War3Model):
             write_mdl(light.intensity_anim.keyframes, light.intensity_anim.type,
                       light.intensity_anim.interpolation, light.intensity_anim.global_sequence,
                       light.intensity_anim.handles_left, light.intensity_anim.handles_right,
-                      "Intensity", fw, model.global_seqs, "\t")
+                      "Intensity", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
             # write_anim(light.intensity_anim, "Intensity", fw, global_seqs, "\t")
         else:
             fw("\tstatic Intensity %s,\n" % f2s(light.intensity))
@@ -60,7 +59,7 @@ def save_lights(fw: TextIO.write, model: War3Model):
             write_mdl(light.amb_intensity_anim.keyframes, light.amb_intensity_anim.type,
                       light.amb_intensity_anim.interpolation, light.amb_intensity_anim.global_sequence,
                       light.amb_intensity_anim.handles_left, light.amb_intensity_anim.handles_right,
-                      "AmbIntensity", fw, model.global_seqs, "\t")
+                      "AmbIntensity", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
             # write_anim(light.amb_intensity_anim, "AmbIntensity", fw, global_seqs, "\t")
         else:
             fw("\tstatic AmbIntensity %s,\n" % f2s(light.amb_intensity))
@@ -69,7 +68,7 @@ def save_lights(fw: TextIO.write, model: War3Model):
             write_mdl(light.amb_color_anim.keyframes, light.amb_color_anim.type,
                       light.amb_color_anim.interpolation, light.amb_color_anim.global_sequence,
                       light.amb_color_anim.handles_left, light.amb_color_anim.handles_right,
-                      "AmbColor", fw, model.global_seqs, "\t")
+                      "AmbColor", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
             # write_anim_vec(light.amb_color_anim, "Color", 'color', fw, global_seqs, Matrix(), Matrix())
         else:
             fw("\tstatic AmbColor {%s, %s, %s},\n" % tuple(map(f2s, reversed(light.amb_color[:3]))))
@@ -78,6 +77,6 @@ def save_lights(fw: TextIO.write, model: War3Model):
             write_mdl(light.visibility.keyframes, light.visibility.type,
                       light.visibility.interpolation, light.visibility.global_sequence,
                       light.visibility.handles_left, light.visibility.handles_right,
-                      "Visibility", fw, model.global_seqs, "\t")
+                      "Visibility", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
             # write_anim(light.visibility, "Visibility", fw, global_seqs, "\t", True)
         fw("}\n")
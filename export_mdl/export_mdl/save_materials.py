@@ -5,7 +5,7 @@ from ..classes.War3Model import War3Model
 from ..utils import f2s
 
 
-def save_materials(fw: TextIO.write, model: War3Model):
+def save_materials(fw: TextIO.write, model: War3Model, float_mode='FIXED'):
     if len(model.materials):
         fw("Materials %d {\n" % len(model.materials))
         for material in model.materials:
@@ -39,17 +39,17 @@ def save_materials(fw: TextIO.write, model: War3Model):
                     fw("\t\t\tNoDepthSet,\n")
 
                 if layer.texture is not None:
-                    fw("\t\t\tstatic TextureID %d,\n" % model.textures.index(layer.texture))
+                    fw("\t\t\tstatic TextureID %d,\n" % model.texture_ids[layer.texture])
                 else:
                     fw("\t\t\tstatic TextureID 0,\n")
 
                 if layer.texture_anim is not None:
-                    fw("\t\t\tTVertexAnimId %d,\n" % model.tvertex_anims.index(layer.texture_anim))
+                    fw("\t\t\tTVertexAnimId %d,\n" % model.tvertex_anim_ids[layer.texture_anim])
                 if layer.alpha_anim is not None:
                     write_mdl(layer.alpha_anim.keyframes, layer.alpha_anim.type,
                               layer.alpha_anim.interpolation, layer.alpha_anim.global_sequence,
                               layer.alpha_anim.handles_left, layer.alpha_anim.handles_right,
-                              "Alpha", fw, model.global_seqs, "\t\t")
+                              "Alpha", fw, model.global_seq_ids, model.f2ms, "\t\t", float_mode)
                     # write_anim(layer.alpha_anim, "Alpha", fw, global_seqs, "\t\t")
                 else:
                     fw("\t\t\tstatic Alpha %s,\n" % f2s(layer.alpha_value))
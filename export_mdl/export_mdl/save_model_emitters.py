@@ -5,7 +5,7 @@ from ..classes.War3Model import War3Model
 from ..utils import f2s, rnd
 
 
-def save_model_emitters(fw: TextIO.write, model: War3Model):
+def save_model_emitters(fw: TextIO.write, model: War3Model, float_mode='FIXED'):
     for psys in model.objects['particle']:
         emitter = psys.emitter
         fw("ParticleEmitter \"%s\" {\n" % psys.name)
@@ -20,7 +20,7 @@ def save_model_emitters(fw: TextIO.write, model: War3Model):
             write_mdl(psys.emission_rate_anim.keyframes, psys.emission_rate_anim.type,
                       psys.emission_rate_anim.interpolation, psys.emission_rate_anim.global_sequence,
                       psys.emission_rate_anim.handles_left, psys.emission_rate_anim.handles_right,
-                      "EmissionRate", fw, model.global_seqs, "\t")
+                      "EmissionRate", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
             # write_anim(psys.emission_rate_anim, "EmissionRate", fw, global_seqs, "\t")
         else:
             fw("\tstatic EmissionRate %s,\n" % f2s(rnd(emitter.emission_rate)))
@@ -29,7 +29,7 @@ def save_model_emitters(fw: TextIO.write, model: War3Model):
             write_mdl(psys.gravity_anim.keyframes, psys.gravity_anim.type,
                       psys.gravity_anim.interpolation, psys.gravity_anim.global_sequence,
                       psys.gravity_anim.handles_left, psys.gravity_anim.handles_right,
-                      "Gravity", fw, model.global_seqs, "\t")
+                      "Gravity", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
             # write_anim(psys.gravity_anim, "Gravity", fw, global_seqs, "\t")
         else:
             fw("\tstatic Gravity %s,\n" % f2s(rnd(emitter.gravity)))
@@ -38,7 +38,7 @@ def save_model_emitters(fw: TextIO.write, model: War3Model):
             write_mdl(psys.longitude_anim.keyframes, psys.longitude_anim.type,
                       psys.longitude_anim.interpolation, psys.longitude_anim.global_sequence,
                       psys.longitude_anim.handles_left, psys.longitude_anim.handles_right,
-                      "Longitude", fw, model.global_seqs, "\t")
+                      "Longitude", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
             # write_anim(psys.longitude_anim, "Longitude", fw, global_seqs, "\t")
         else:
             fw("\tstatic Longitude %s,\n" % f2s(rnd(emitter.latitude)))
@@ -47,7 +47,7 @@ def save_model_emitters(fw: TextIO.write, model: War3Model):
             write_mdl(psys.latitude_anim.keyframes, psys.latitude_anim.type,
                       psys.latitude_anim.interpolation, psys.latitude_anim.global_sequence,
                       psys.latitude_anim.handles_left, psys.latitude_anim.handles_right,
-                      "Latitude", fw, model.global_seqs, "\t")
+                      "Latitude", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
             # write_anim(psys.latitude_anim, "Latitude", fw, global_seqs, "\t")
         else:
             fw("\tstatic Latitude %s,\n" % f2s(rnd(emitter.latitude)))
@@ -57,7 +57,7 @@ def save_model_emitters(fw: TextIO.write, model: War3Model):
             write_mdl(visibility.keyframes, visibility.type,
                       visibility.interpolation, visibility.global_sequence,
                       visibility.handles_left, visibility.handles_right,
-                      "Visibility", fw, model.global_seqs, "\t")
+                      "Visibility", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
             # write_anim(visibility, "Visibility", fw, global_seqs, "\t", True)
         fw("\tParticle {\n")
 
@@ -65,7 +65,7 @@ def save_model_emitters(fw: TextIO.write, model: War3Model):
             write_mdl(psys.life_span_anim.keyframes, psys.life_span_anim.type,
                       psys.life_span_anim.interpolation, psys.life_span_anim.global_sequence,
                       psys.life_span_anim.handles_left, psys.life_span_anim.handles_right,
-                      "LifeSpan", fw, model.global_seqs, "\t")
+                      "LifeSpan", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
             # write_anim(psys.life_span_anim, "LifeSpan", fw, global_seqs, "\t\t")
         else:
             fw("\t\tLifeSpan %s,\n" % f2s(rnd(emitter.life_span)))
@@ -74,7 +74,7 @@ def save_model_emitters(fw: TextIO.write, model: War3Model):
             write_mdl(psys.speed_anim.keyframes, psys.speed_anim.type,
                       psys.speed_anim.interpolation, psys.speed_anim.global_sequence,
                       psys.speed_anim.handles_left, psys.speed_anim.handles_right,
-                      "InitVelocity", fw, model.global_seqs, "\t")
+                      "InitVelocity", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
             # write_anim(psys.speed_anim, "InitVelocity", fw, global_seqs, "\t\t")
         else:
             fw("\t\tstatic InitVelocity %s,\n" % f2s(rnd(emitter.speed)))
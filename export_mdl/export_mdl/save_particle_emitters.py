@@ -5,7 +5,7 @@ from ..classes.War3Model import War3Model
 from ..utils import f2s, rnd
 
 
-def save_particle_emitters(fw: TextIO.write, model: War3Model):
+def save_particle_emitters(fw: TextIO.write, model: War3Model, float_mode='FIXED'):
     for psys in model.objects['particle2']:
         emitter = psys.emitter
         fw("ParticleEmitter2 \"%s\" {\n" % psys.name)
@@ -36,7 +36,7 @@ def save_particle_emitters(fw: TextIO.write, model: War3Model):
             write_mdl(psys.speed_anim.keyframes, psys.speed_anim.type,
                       psys.speed_anim.interpolation, psys.speed_anim.global_sequence,
                       psys.speed_anim.handles_left, psys.speed_anim.handles_right,
-                      "Speed", fw, model.global_seqs, "\t")
+                      "Speed", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
             # write_anim(psys.speed_anim, "Speed", fw, global_seqs, "\t")
         else:
             fw("\tstatic Speed %s,\n" % f2s(rnd(emitter.speed)))
@@ -45,7 +45,7 @@ def save_particle_emitters(fw: TextIO.write, model: War3Model):
             write_mdl(psys.variation_anim.keyframes, psys.variation_anim.type,
                       psys.variation_anim.interpolation, psys.variation_anim.global_sequence,
                       psys.variation_anim.handles_left, psys.variation_anim.handles_right,
-                      "Variation", fw, model.global_seqs, "\t")
+                      "Variation", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
             # write_anim(psys.variation_anim, "Variation", fw, global_seqs, "\t")
         else:
             fw("\tstatic Variation %s,\n" % f2s(rnd(emitter.variation)))
@@ -54,7 +54,7 @@ def save_particle_emitters(fw: TextIO.write, model: War3Model):
             write_mdl(psys.latitude_anim.keyframes, psys.latitude_anim.type,
                       psys.latitude_anim.interpolation, psys.latitude_anim.global_sequence,
                       psys.latitude_anim.handles_left, psys.latitude_anim.handles_right,
-                      "Latitude", fw, model.global_seqs, "\t")
+                      "Latitude", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
             # write_anim(psys.latitude_anim, "Latitude", fw, global_seqs, "\t")
         else:
             fw("\tstatic Latitude %s,\n" % f2s(rnd(emitter.latitude)))
@@ -63,7 +63,7 @@ def save_particle_emitters(fw: TextIO.write, model: War3Model):
             write_mdl(psys.gravity_anim.keyframes, psys.gravity_anim.type,
                       psys.gravity_anim.interpolation, psys.gravity_anim.global_sequence,
                       psys.gravity_anim.handles_left, psys.gravity_anim.handles_right,
-                      "Gravity", fw, model.global_seqs, "\t")
+                      "Gravity", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
             # write_anim(psys.gravity_anim, "Gravity", fw, global_seqs, "\t")
         else:
             fw("\tstatic Gravity %s,\n" % f2s(rnd(emitter.gravity)))
@@ -73,7 +73,7 @@ def save_particle_emitters(fw: TextIO.write, model: War3Model):
             write_mdl(visibility.keyframes, visibility.type,
                       visibility.interpolation, visibility.global_sequence,
                       visibility.handles_left, visibility.handles_right,
-                      "Visibility", fw, model.global_seqs, "\t")
+                      "Visibility", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
             # write_anim(visibility, "Visibility", fw, global_seqs, "\t", True)
 
         fw("\tLifeSpan %s,\n" % f2s(rnd(emitter.life_span)))
@@ -82,7 +82,7 @@ def save_particle_emitters(fw: TextIO.write, model: War3Model):
             write_mdl(psys.emission_rate_anim.keyframes, psys.emission_rate_anim.type,
                       psys.emission_rate_anim.interpolation, psys.emission_rate_anim.global_sequence,
                       psys.emission_rate_anim.handles_left, psys.emission_rate_anim.handles_right,
-                      "EmissionRate", fw, model.global_seqs, "\t")
+                      "EmissionRate", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
             # write_anim(psys.emission_rate_anim, "EmissionRate", fw, global_seqs, "\t")
         else:
             fw("\tstatic EmissionRate %s,\n" % f2s(rnd(emitter.emission_rate)))
@@ -92,7 +92,7 @@ def save_particle_emitters(fw: TextIO.write, model: War3Model):
             write_mdl(psys.scale_anim.keyframes, psys.scale_anim.type,
                       psys.scale_anim.interpolation, psys.scale_anim.global_sequence,
                       psys.scale_anim.handles_left, psys.scale_anim.handles_right,
-                      "Width", fw, model.global_seqs, "\t")
+                      "Width", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
             # write_anim(psys.scale_anim[('scale', 1)], "Width", fw, global_seqs, "\t", scale=psys.dimensions[1])
         else:
             fw("\tstatic Width %s,\n" % f2s(rnd(psys.dimensions[1])))
@@ -101,7 +101,7 @@ def save_particle_emitters(fw: TextIO.write, model: War3Model):
             write_mdl(psys.scale_anim.keyframes, psys.scale_anim.type,
                       psys.scale_anim.interpolation, psys.scale_anim.global_sequence,
                       psys.scale_anim.handles_left, psys.scale_anim.handles_right,
-                      "Length", fw, model.global_seqs, "\t")
+                      "Length", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
             # write_anim(psys.scale_anim[('scale', 0)], "Length", fw, global_seqs, "\t", scale=psys.dimensions[0])
         else:
             fw("\tstatic Length %s,\n" % f2s(rnd(psys.dimensions[0])))
@@ -135,7 +135,7 @@ def save_particle_emitters(fw: TextIO.write, model: War3Model):
         fw("\tDecayUVAnim {%d, %d, %d},\n" % (emitter.head_decay_start, emitter.head_decay_end, emitter.head_decay_repeat))
         fw("\tTailUVAnim {%d, %d, %d},\n" % ( emitter.tail_life_start, emitter.tail_life_end, emitter.tail_life_repeat))
         fw("\tTailDecayUVAnim {%d, %d, %d},\n" % (emitter.tail_decay_start, emitter.tail_decay_end, emitter.tail_decay_repeat))
-        fw("\tTextureID %d,\n" % model.textures.index(emitter.texture_path))
+        fw("\tTextureID %d,\n" % model.texture_ids[emitter.texture_path])
 
         if emitter.priority_plane != 0:
             fw("\tPriorityPlane %d,\n" % emitter.priority_plane)
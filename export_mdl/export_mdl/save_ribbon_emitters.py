@@ -5,7 +5,7 @@ from ..classes.War3Model import War3Model
 from ..utils import f2s, rnd
 
 
-def save_ribbon_emitters(fw: TextIO.write, model: War3Model):
+def save_ribbon_emitters(fw: TextIO.write, model: War3Model, float_mode='FIXED'):
     for psys in model.objects['ribbon']:
         emitter = psys.emitter
         fw("RibbonEmitter \"%s\" {\n" % psys.name)
@@ -21,7 +21,7 @@ def save_ribbon_emitters(fw: TextIO.write, model: War3Model):
             write_mdl(psys.alpha_anim.keyframes, psys.alpha_anim.type,
                       psys.alpha_anim.interpolation, psys.alpha_anim.global_sequence,
                       psys.alpha_anim.handles_left, psys.alpha_anim.handles_right,
-                      "Alpha", fw, model.global_seqs, "\t")
+                      "Alpha", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
         else:
             fw("\tstatic Alpha %s,\n" % emitter.alpha)
 
@@ -29,19 +29,19 @@ def save_ribbon_emitters(fw: TextIO.write, model: War3Model):
             write_mdl(psys.ribbon_color_anim.keyframes, psys.ribbon_color_anim.type,
                       psys.ribbon_color_anim.interpolation, psys.ribbon_color_anim.global_sequence,
                       psys.ribbon_color_anim.handles_left, psys.ribbon_color_anim.handles_right,
-                      "Color", fw, model.global_seqs, "\t")
+                      "Color", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
             # write_anim_vec(psys.ribbon_color_anim, 'Color', 'ribbon_color', fw, global_seqs, Matrix(), Matrix(), "\t", (2, 1, 0))
         else:
             fw("\tstatic Color {%s, %s, %s},\n" % tuple(map(f2s, reversed(emitter.ribbon_color))))
 
-        fw("\tstatic TextureSlot %d,\n" % model.textures.index(emitter.texture_path))
+        fw("\tstatic TextureSlot %d,\n" % model.texture_ids[emitter.texture_path])
 
         visibility = psys.visibility
         if visibility is not None:
             write_mdl(visibility.keyframes, visibility.type,
                       visibility.interpolation, visibility.global_sequence,
                       visibility.handles_left, visibility.handles_right,
-                      "Visibility", fw, model.global_seqs, "\t")
+                      "Visibility", fw, model.global_seq_ids, model.f2ms, "\t", float_mode)
             # write_anim(visibility, "Visibility", fw, global_seqs, "\t", True)
 
         fw("\tEmissionRate %d,\n" % emitter.emission_rate)
@@ -52,6 +52,6 @@ def save_ribbon_emitters(fw: TextIO.write, model: War3Model):
 
         for material in model.materials:
             if material.name == emitter.ribbon_material.name:
-                fw("\tMaterialID %d,\n" % model.materials.index(material))
+                fw("\tMaterialID %d,\n" % model.material_ids[material.name])
                 break
         fw("}\n")
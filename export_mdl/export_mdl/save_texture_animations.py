@@ -4,7 +4,7 @@ from .write_mdl import write_mdl
 from ..classes.War3Model import War3Model
 
 
-def save_texture_animations(fw: TextIO.write, model: War3Model):
+def save_texture_animations(fw: TextIO.write, model: War3Model, float_mode='FIXED'):
     if len(model.tvertex_anims):
         fw("TextureAnims %d {\n" % len(model.tvertex_anims))
         for uv_anim in model.tvertex_anims:
@@ -13,21 +13,19 @@ def save_texture_animations(fw: TextIO.write, model: War3Model):
                 write_mdl(uv_anim.translation.keyframes, uv_anim.translation.type,
                           uv_anim.translation.interpolation, uv_anim.translation.global_sequence,
                           uv_anim.translation.handles_left, uv_anim.translation.handles_right,
-                          "Translation", fw, model.global_seqs, "\t\t")
+                          "Translation", fw, model.global_seq_ids, model.f2ms, "\t\t", float_mode)
 
             if uv_anim.rotation is not None:
                 write_mdl(uv_anim.rotation.keyframes, uv_anim.rotation.type,
                           uv_anim.rotation.interpolation, uv_anim.rotation.global_sequence,
                           uv_anim.rotation.handles_left, uv_anim.rotation.handles_right,
-                          "Rotation", fw, model.global_seqs, "\t\t")
+                          "Rotation", fw, model.global_seq_ids, model.f2ms, "\t\t", float_mode)
 
             if uv_anim.scale is not None:
-                write_mdl(uv_anim.scaling.keyframes, uv_anim.scaling.type,
-                          uv_anim.scaling.interpolation, uv_anim.scaling.global_sequence,
-                          uv_anim.scaling.handles_left, uv_anim.scaling.handles_right,
-                          "Scaling", fw, model.global_seqs, "\t\t")
+                write_mdl(uv_anim.scale.keyframes, uv_anim.scale.type,
+                          uv_anim.scale.interpolation, uv_anim.scale.global_sequence,
+                          uv_anim.scale.handles_left, uv_anim.scale.handles_right,
+                          "Scaling", fw, model.global_seq_ids, model.f2ms, "\t\t", float_mode)
 
             fw("\t}\n")
         fw("}\n")
-    material_names = [mat.name for mat in model.materials]
-    return material_names
@@ -1,57 +1,44 @@
 from typing import TextIO
 
-import bpy
-
-from ..utils import f2s, rnd
+from ..formatting import format_block
+from ..utils import rnd
 
 
 def write_mdl(keyframes, type1, interpolation, global_sequence, handles_left, handles_right, name, fw: TextIO.write,
-              global_seqs, indent="\t"):
-
-    f2ms = 1000 / bpy.context.scene.render.fps
+              global_seq_ids, f2ms, indent="\t", float_mode='FIXED'):
 
     fw(indent + "%s %d {\n" % (name, len(keyframes)))
 
     if type1 != 'Event':
         fw(indent + "\t%s,\n" % interpolation)
     if global_sequence > 0:
-        fw(indent + "\tGlobalSeqId %d,\n" % global_seqs.index(global_sequence))
-
-    for frame in sorted(keyframes.keys()):
-        line = ""
-        n = len(keyframes[frame])
-
-        if n > 1:
-            line += "{ "
-
-        line += '%s, '*(n-1)
-        line += '%s'
+        fw(indent + "\tGlobalSeqId %d,\n" % global_seq_ids[global_sequence])
 
+    frames = sorted(keyframes.keys())
+    if type1 == 'Event':
+        fw(format_block(indent + "\t%d,\n", [(frame * f2ms,) for frame in frames], float_mode))
+    elif len(frames):
+        n = len(keyframes[frames[0]])
         if n > 1:
-            line += ' },\n'
+            line = "{ " + '%s, ' * (n - 1) + '%s },\n'
         else:
-            line += ',\n'
+            line = '%s,\n'
 
-        if type1 == 'Event':
-            fw(indent+"\t%d,\n" % (frame * f2ms))
-        else:
-            keyframe = keyframes[frame]
-
-            if type1 == 'Rotation':
-                keyframe = keyframe[1:] + keyframe[:1]  # MDL quaternions must be on the form XYZW
+        # All keyframes (and tangents) are formatted as one block
+        line_format = indent + "\t%d: " + line
+        if interpolation in ('Bezier', 'Hermite'):
+            line_format += indent + "\t\tInTan " + line + indent + "\t\tOutTan " + line
 
-            s = "\t%d: " % (frame * f2ms)
-            fw(indent+s+line % tuple(f2s(rnd(x)) for x in keyframe))
+        rows = []
+        for frame in frames:
+            values = [keyframes[frame]]
+            if interpolation in ('Bezier', 'Hermite'):
+                values += [handles_left[frame], handles_right[frame]]
 
-            if interpolation == 'Bezier':
-                hl = handles_left[frame]
-                hr = handles_right[frame]
-
-                if type1 == 'Rotation':
-                    hl = hl[1:]+hl[:1]
-                    hr = hr[1:]+hr[:1]
+            if type1 == 'Rotation':
+                values = [v[1:] + v[:1] for v in values]  # MDL quaternions must be on the form XYZW
 
-                fw(indent+"\t\tInTan "+line % tuple(f2s(rnd(x)) for x in hl))
-                fw(indent+"\t\tOutTan "+line % tuple(f2s(rnd(x)) for x in hr))
+            rows.append((frame * f2ms,) + tuple(rnd(x) for v in values for x in v))
+        fw(format_block(line_format, rows, float_mode))
 
     fw(indent+"}\n")
@@ -1,2 +1,105 @@
-def write_mdx():
-    pass
+import struct
+import sys
+from array import array
+
+NONE = 0xFFFFFFFF  # Used for absent ids, e.g. a node without a parent
+
+interpolation_types = {'DontInterp': 0, 'Linear': 1, 'Hermite': 2, 'Bezier': 3}
+
+
+def pack_string(value, size):
+    return struct.pack('<%ds' % size, value.encode('utf-8')[:size - 1])
+
+
+def pack_array(typecode, values):
+    # Bulk conversion of a flat sequence, rather than one struct.pack call per value
+    data = array(typecode, values)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data.tobytes()
+
+
+def pack_floats(values):
+    return pack_array('f', values)
+
+
+def pack_uint32s(values):
+    return pack_array('I', values)
+
+
+def pack_chunk(tag, data):
+    return tag + struct.pack('<I', len(data)) + data
+
+
+def pack_inclusive(data):
+    # Inclusive size: the size field counts itself
+    return struct.pack('<I', len(data) + 4) + data
+
+
+def pack_extent(min_extent, max_extent, bounds_radius):
+    return struct.pack('<7f', bounds_radius, *min_extent, *max_extent)
+
+
+def pack_node(obj, name, flags, model, tracks=b''):
+    object_id = model.object_indices[obj.name]
+    parent_id = model.object_indices[obj.parent] if obj.parent is not None else NONE
+
+    if getattr(obj, "billboarded", False):
+        flags |= 0x8
+    for flag, value in zip(getattr(obj, "billboard_lock", ()), (0x40, 0x20, 0x10)):  # Z, Y, X
+        if flag:
+            flags |= value
+
+    return pack_inclusive(pack_string(name, 80) + struct.pack('<3I', object_id, parent_id, flags) + tracks)
+
+
+def pack_node_tracks(obj, model):
+    return (write_mdx_curve(getattr(obj, "anim_loc", None), b'KGTR', model) +
+            write_mdx_curve(getattr(obj, "anim_rot", None), b'KGRT', model) +
+            write_mdx_curve(getattr(obj, "anim_scale", None), b'KGSC', model))
+
+
+def write_mdx(keyframes, type1, interpolation, global_sequence, handles_left, handles_right, tag, global_seq_ids, f2ms):
+    interpolation_type = interpolation_types[interpolation]
+    global_seq_id = global_seq_ids[global_sequence] if global_sequence > 0 else -1
+
+    data = bytearray(tag)
+    data += struct.pack('<IIi', len(keyframes), interpolation_type, global_seq_id)
+
+    for frame in sorted(keyframes.keys()):
+        keyframe = keyframes[frame]
+
+        if type1 == 'Rotation':
+            keyframe = keyframe[1:] + keyframe[:1]  # MDX quaternions must be on the form XYZW
+
+        data += struct.pack('<i', int(frame * f2ms))
+        data += pack_floats(keyframe)
+
+        if interpolation_type > 1:
+            hl = handles_left[frame]
+            hr = handles_right[frame]
+
+            if type1 == 'Rotation':
+                hl = hl[1:] + hl[:1]
+                hr = hr[1:] + hr[:1]
+
+            data += pack_floats(hl)
+            data += pack_floats(hr)
+
+    return bytes(data)
+
+
+def write_mdx_curve(curve, tag, model):
+    if curve is None:
+        return b''
+    return write_mdx(curve.keyframes, curve.type, curve.interpolation, curve.global_sequence,
+                     curve.handles_left, curve.handles_right, tag, model.global_seq_ids, model.f2ms)
+
+
+def write_mdx_events(curve, model):
+    # Event tracks have no interpolation or values, only the frames at which they fire
+    frames = sorted(curve.keyframes.keys()) if curve is not None else []
+    global_seq_id = -1
+    if curve is not None and curve.global_sequence > 0:
+        global_seq_id = model.global_seq_ids[curve.global_sequence]
+    return b'KEVT' + struct.pack('<Ii', len(frames), global_seq_id) + pack_uint32s(int(f * model.f2ms) for f in frames)
@@ -0,0 +1,109 @@
+import re
+
+import numpy as np
+
+from .utils import f2s
+
+placeholder = re.compile(r'%[sd]')
+
+frac_digits = 6  # Same precision as the '%.6f' in f2s
+max_int_digits = 12
+
+# Characters and trailing zero counts of every three digit group, so digits are looked up a group at a time
+digit_table = np.frombuffer(b''.join(b'%03d' % i for i in range(1000)), dtype=np.uint8).reshape(1000, 3)
+zeros_table = np.array([3 if i == 0 else len(str(i)) - len(str(i).rstrip('0')) for i in range(1000)])
+
+
+def shortest(value):
+    return np.format_float_positional(np.float32(value), unique=True, trim='-')
+
+
+def number_grid(values, is_float):
+    # Renders a column of numbers as a fixed width grid of characters (sign, integer digits, point, decimals)
+    # plus a mask of the characters to keep. Values that can't be rendered exactly here are flagged as inexact.
+    with np.errstate(invalid='ignore'):
+        if is_float:
+            scaled = np.abs(values) * 10 ** frac_digits
+            frac = scaled - np.floor(scaled)
+            # Rounding of the scaled value is only trusted away from ties, where the product's error can't matter
+            exact = np.isfinite(scaled) & (scaled < 2.0 ** 52) & (np.abs(frac - 0.5) > scaled * 2.0 ** -52 + 1e-12)
+            num = np.rint(np.where(exact, scaled, 0)).astype(np.int64)
+            int_part, frac_part = np.divmod(num, 10 ** frac_digits)
+            negative = np.signbit(values)
+        else:
+            truncated = np.trunc(values)  # The same as '%d' does
+            exact = np.isfinite(truncated) & (np.abs(truncated) < 10.0 ** max_int_digits)
+            int_part = np.abs(np.where(exact, truncated, 0)).astype(np.int64)
+            frac_part = np.zeros_like(int_part)
+            negative = truncated < 0
+
+    high, low = np.divmod(frac_part, 1000)
+    decimals = frac_digits - np.where(low == 0, 3 + zeros_table[high], zeros_table[low])
+
+    groups = []
+    rest = int_part
+    while True:
+        rest, group = np.divmod(rest, 1000)
+        groups.insert(0, digit_table[group])
+        if not rest.any():
+            break
+    int_chars = np.concatenate(groups, axis=1)
+    width = int_chars.shape[1]
+
+    chars = np.empty((len(values), 2 + width + frac_digits), dtype=np.uint8)
+    keep = np.empty(chars.shape, dtype=bool)
+    chars[:, 0] = ord('-')
+    keep[:, 0] = negative
+    chars[:, 1:1 + width] = int_chars
+    keep[:, 1:1 + width] = int_part[:, None] >= 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    keep[:, width] = True  # At least one integer digit
+    chars[:, 1 + width] = ord('.')
+    keep[:, 1 + width] = decimals > 0
+    chars[:, 2 + width:2 + width + 3] = digit_table[high]
+    chars[:, 2 + width + 3:] = digit_table[low]
+    keep[:, 2 + width:] = np.arange(frac_digits) < decimals[:, None]
+    return chars, keep, exact
+
+
+def format_block(line_format, rows, float_mode='FIXED'):
+    # Formats one line per row. %s fields are floats, %d fields are integers. With float_mode 'FIXED' the floats are
+    # written exactly as f2s writes them, with 'SHORTEST' as the shortest text that reads back as the same float32.
+    kinds = placeholder.findall(line_format)
+    if not len(rows):
+        return ""
+    values = np.array(rows, dtype=np.float64).reshape(len(rows), len(kinds))
+
+    if float_mode == 'SHORTEST':
+        args = [shortest(v) if kind == '%s' else v for row in values.tolist() for kind, v in zip(kinds, row)]
+        return (line_format * len(values)) % tuple(args)
+
+    grids = []
+    masks = []
+    exact = np.ones(len(values), dtype=bool)
+    for i, part in enumerate(placeholder.split(line_format)):
+        text = np.frombuffer(part.encode('ascii'), dtype=np.uint8)
+        grids.append(np.broadcast_to(text, (len(values), len(text))))
+        masks.append(np.ones((len(values), len(text)), dtype=bool))
+        if i < len(kinds):
+            chars, keep, column_exact = number_grid(values[:, i], kinds[i] == '%s')
+            grids.append(chars)
+            masks.append(keep)
+            exact &= column_exact
+
+    grid = np.concatenate(grids, axis=1)
+    mask = np.concatenate(masks, axis=1)
+    mask[~exact] = False
+    text = grid[mask].tobytes().decode('ascii')
+    if exact.all():
+        return text
+
+    # Splice in the few rows that have to go through f2s
+    offsets = np.cumsum(mask.sum(axis=1)) - mask.sum(axis=1)
+    pieces = []
+    start = 0
+    for row in np.flatnonzero(~exact):
+        pieces.append(text[start:offsets[row]])
+        pieces.append(line_format % tuple(f2s(v) if kind == '%s' else v for kind, v in zip(kinds, values[row])))
+        start = offsets[row]
+    pieces.append(text[start:])
+    return "".join(pieces)
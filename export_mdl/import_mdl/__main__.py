@@ -0,0 +1,29 @@
+# Reads an MDL file and writes it again, e.g. to check in CI that a model survives a round trip:
+#   python -m export_mdl.import_mdl model.mdl copy.mdl    (or copy.mdx for the binary format)
+import argparse
+import sys
+import time
+
+from .read_mdl import read_mdl
+from ..export_mdl.export_mdl import write_mdl_file
+from ..export_mdl.export_mdx import write_mdx_file
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m export_mdl.import_mdl", description="Read an MDL file and write it again")
+    parser.add_argument('input')
+    parser.add_argument('output', help="An .mdl or .mdx file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    model, settings, skipped = read_mdl(args.input)
+    print("Read %s in %.3fs" % (args.input, time.perf_counter() - start))
+    if len(skipped):
+        print("Skipped sections: %s" % ", ".join(dict.fromkeys(skipped)), file=sys.stderr)
+    if args.output.lower().endswith('.mdx'):
+        write_mdx_file(model, settings, args.output)
+    else:
+        write_mdl_file(model, settings, args.output)
+
+
+main()
@@ -0,0 +1,21 @@
+import os
+
+from .read_mdl import read_mdl
+
+
+def load(operator, context, filepath):
+    from ..classes.model_utils.to_scene import to_scene
+
+    model, settings, skipped = read_mdl(filepath, build_geosets=False)
+    if not model.name:
+        model.name = os.path.splitext(os.path.basename(filepath))[0]
+
+    for bpy_obj in context.selected_objects:
+        bpy_obj.select_set(False)
+    new_objects = to_scene(model, context)
+    for bpy_obj in new_objects:
+        bpy_obj.select_set(True)
+
+    if len(skipped):
+        operator.report({'WARNING'}, "Skipped sections that can't be imported yet: %s" % ", ".join(dict.fromkeys(skipped)))
+    return new_objects
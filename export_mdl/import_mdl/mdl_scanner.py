@@ -0,0 +1,117 @@
+import re
+
+import numpy as np
+
+# Splits MDL text into tokens: quoted strings, braces, ':' and ',', and words (numbers and keywords).
+# Whitespace and // comments in front of a token are skipped; a comment always runs to the end of its line.
+token_pattern = re.compile(r'(?:\s|//[^\n]*(?:\n|$))*("[^"\n]*"|[{}:,]|(?!//)[^\s{}:,"]+)')
+# The end of a block of {...} entries, e.g. "{1, 2, 3},\n\t}", and of a block of plain numbers
+nested_block_end = re.compile(r'\}[\s,]*\}')
+flat_block_end = re.compile(r'\}')
+separators = str.maketrans('{},', '   ')
+
+
+class MdlScanner:
+    # Reads an MDL file a chunk at a time. The buffer always ends at a line break, and MDL tokens never span
+    # lines, so a token is never cut in half. Blocks of numbers are parsed as a whole with numpy instead of
+    # token by token; only they need more than one chunk in memory.
+
+    def __init__(self, file, chunk_size=1 << 20):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.rest = ""  # Read from the file, but after the buffer's last line break
+        self.eof = False
+        self.lines_dropped = 0
+        self.peeked = None
+
+    def fill(self):
+        # Appends at least one more line to the buffer, dropping what has been read. False at the end of the file.
+        if self.eof:
+            return False
+        text = self.rest
+        while True:
+            data = self.file.read(self.chunk_size)
+            if not data:
+                self.eof = True
+                break
+            text += data
+            cut = text.rfind('\n')
+            if cut >= 0:
+                self.rest = text[cut + 1:]
+                text = text[:cut + 1]
+                break
+
+        self.lines_dropped += self.buffer.count('\n', 0, self.pos)
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        if self.eof:
+            self.rest = ""
+        return True
+
+    def next(self):
+        # The next token, or None at the end of the file
+        if self.peeked is not None:
+            token, self.peeked = self.peeked, None
+            return token
+        while True:
+            match = token_pattern.match(self.buffer, self.pos)
+            if match is not None:
+                self.pos = match.end()
+                return match.group(1)
+            if not self.fill():
+                return None
+
+    def peek(self):
+        if self.peeked is None:
+            self.peeked = self.next()
+        return self.peeked
+
+    def expect(self, expected):
+        token = self.next()
+        if token != expected:
+            self.error("expected '%s', found '%s'" % (expected, token))
+
+    def skip_block(self):
+        # Skips to the brace that closes the block that was just opened
+        depth = 1
+        while depth:
+            token = self.next()
+            if token is None:
+                self.error("unexpected end of file")
+            elif token == '{':
+                depth += 1
+            elif token == '}':
+                depth -= 1
+
+    def read_numbers(self, nested):
+        # All numbers up to the brace that closes the block that was just opened, as a flat array. nested is
+        # whether the block's entries are wrapped in braces themselves, like the vertices, or not, like the
+        # vertex groups.
+        if self.peeked is not None:
+            self.error("unexpected '%s'" % self.peeked)
+        block_end = nested_block_end if nested else flat_block_end
+        search_from = self.pos
+        while True:
+            match = block_end.search(self.buffer, search_from)
+            if match is not None:
+                break
+            # Only a match starting at the last brace can still be completed by the next lines. fill() moves
+            # the unread text to the start of the buffer.
+            search_from = max(self.pos, self.buffer.rfind('}', self.pos)) - self.pos
+            if not self.fill():
+                self.error("unexpected end of file")
+
+        text = self.buffer[self.pos:match.start()].translate(separators)
+        self.pos = match.end()
+        try:
+            return np.fromstring(text, sep=' ')
+        except ValueError:
+            self.error("expected numbers")
+
+    def line(self):
+        return self.lines_dropped + self.buffer.count('\n', 0, self.pos) + 1
+
+    def error(self, message):
+        raise ValueError("Line %d: %s" % (self.line(), message))
@@ -0,0 +1,137 @@
+from ..export_mdl.model_ir import Record
+from .mdl_scanner import MdlScanner
+
+interpolations = {'DontInterp', 'Linear', 'Hermite', 'Bezier'}
+# Track names in the file -> curve types, as War3AnimationCurve.set_type names them
+track_types = {'Translation': 'Translation', 'Rotation': 'Rotation', 'Scaling': 'Scale', 'Color': 'Color',
+               'Visibility': 'Boolean'}
+
+
+def parse_value(token: str):
+    if token.startswith('"'):
+        return token[1:-1]
+    try:
+        return int(token)
+    except ValueError:
+        pass
+    try:
+        return float(token)
+    except ValueError:
+        return token  # A keyword, like the filter modes
+
+
+def read_block(scanner: MdlScanner):
+    # The entries of the block that was just opened, up to its closing brace, as (key, values) pairs.
+    # "static" is dropped from the keys. Values are numbers and strings, tuples for {...} lists, tracks, and
+    # lists of entries for sub-blocks, like a material's layers.
+    entries = []
+    while True:
+        key = scanner.next()
+        if key == '}':
+            return entries
+        if key is None:
+            scanner.error("unexpected end of file")
+        if key == ',':
+            continue
+        if key == 'static':
+            key = scanner.next()
+        entries.append((key, read_entry_values(scanner, key)))
+
+
+def read_entry_values(scanner: MdlScanner, key):
+    # The values after the key of an entry. An entry ends at a comma, or after its block.
+    values = []
+    while True:
+        token = scanner.peek()
+        if token == '}':
+            return values  # The last entry of a block, without a comma
+        scanner.next()
+        if token == ',':
+            return values
+        if token == '{':
+            values.append(read_braces(scanner, key))
+            if scanner.peek() == ',':
+                scanner.next()
+            return values
+        if token is None:
+            scanner.error("unexpected end of file")
+        values.append(parse_value(token))
+
+
+def read_braces(scanner: MdlScanner, key):
+    first = scanner.peek()
+    if first in interpolations:
+        return read_track(scanner, key)
+    if first[0].isalpha() or first[0] == '_':
+        return read_block(scanner)
+    return read_list(scanner)
+
+
+def read_list(scanner: MdlScanner):
+    values = []
+    while True:
+        token = scanner.next()
+        if token == '}':
+            return tuple(values)
+        if token == '{':
+            values.append(read_list(scanner))
+        elif token is None:
+            scanner.error("unexpected end of file")
+        elif token != ',':
+            values.append(parse_value(token))
+
+
+def read_track_value(scanner: MdlScanner):
+    token = scanner.next()
+    if token == '{':
+        return tuple(float(x) for x in read_list(scanner))
+    return float(parse_value(token)),
+
+
+def read_track(scanner: MdlScanner, key):
+    # A track as the writers take it: keyframes by time, and the global sequence's id, to be replaced by its
+    # duration once the model is read. Rotations are turned from XYZW into WXYZ, like the exporter keeps them.
+    track = Record(type=track_types.get(key, 'Default'), interpolation=scanner.next(), global_sequence=-1,
+                   keyframes={}, handles_left={}, handles_right={})
+    while True:
+        token = scanner.next()
+        if token == '}':
+            break
+        if token == ',':
+            continue
+        if token == 'GlobalSeqId':
+            track.global_sequence = int(scanner.next())
+            continue
+        if token is None:
+            scanner.error("unexpected end of file")
+
+        frame = int(parse_value(token))
+        scanner.expect(':')
+        track.keyframes[frame] = read_track_value(scanner)
+        if scanner.peek() == ',':
+            scanner.next()
+        if scanner.peek() == 'InTan':
+            scanner.next()
+            track.handles_left[frame] = read_track_value(scanner)
+            scanner.expect(',')
+            scanner.expect('OutTan')
+            track.handles_right[frame] = read_track_value(scanner)
+
+    if track.type == 'Rotation':
+        for values in (track.keyframes, track.handles_left, track.handles_right):
+            for frame, value in values.items():
+                values[frame] = value[-1:] + value[:-1]
+    return track
+
+
+def find(entries, key, default=None):
+    # The values of the first entry with the key. Entries with a single value give just the value, and tracks
+    # just the track, without the number of keyframes.
+    for entry_key, values in entries:
+        if entry_key == key:
+            return values[-1] if len(values) == 1 or isinstance(values[-1], Record) else values
+    return default
+
+
+def has(entries, key):
+    return any(entry_key == key for entry_key, _ in entries)
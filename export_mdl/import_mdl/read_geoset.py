@@ -0,0 +1,79 @@
+import numpy as np
+
+from ..export_mdl.model_ir import Record
+from .mdl_scanner import MdlScanner
+from .read_block import find, read_entry_values
+
+# Vertex data blocks -> values per vertex, and whether each vertex is wrapped in braces
+vertex_blocks = {
+    'Vertices': ('positions', 3, True),
+    'Normals': ('normals', 3, True),
+    'TVertices': ('uvs', 2, True),
+    'Tangents': ('tangents', 4, True),
+    'SkinWeights': ('skin_weights', 8, False),
+}
+
+
+def read_geoset(scanner: MdlScanner):
+    # The geoset block that was just opened, as arrays. The matrices still hold object ids and the material is
+    # an index, as the nodes and materials may come later in the file.
+    geoset = Record(positions=None, normals=None, uvs=None, tangents=None, skin_weights=None, vertex_groups=None,
+                    triangles=None, matrices=[], material_id=0, min_extent=None, max_extent=None)
+    entries = []
+    triangles = []
+    while True:
+        key = scanner.next()
+        if key == '}':
+            break
+        if key is None:
+            scanner.error("unexpected end of file")
+        if key == ',':
+            continue
+
+        if key in vertex_blocks:
+            name, width, nested = vertex_blocks[key]
+            count = int(scanner.next())
+            scanner.expect('{')
+            values = scanner.read_numbers(nested)
+            if len(values) != count * width:
+                scanner.error("expected %d values in %s, found %d" % (count * width, key, len(values)))
+            if getattr(geoset, name) is None:  # Only the first set of UVs is kept
+                setattr(geoset, name, values.reshape(count, width))
+        elif key == 'VertexGroup':
+            scanner.expect('{')
+            geoset.vertex_groups = scanner.read_numbers(False).astype(np.int64)
+        elif key == 'Faces':
+            scanner.next()  # Number of groups and of indices
+            scanner.next()
+            scanner.expect('{')
+            while True:
+                token = scanner.next()
+                if token == '}':
+                    break
+                if token == 'Triangles':
+                    scanner.expect('{')
+                    triangles.append(scanner.read_numbers(True).astype(np.int64))
+                elif token is None:
+                    scanner.error("unexpected end of file")
+                else:
+                    scanner.error("unsupported face type '%s'" % token)
+        elif key == 'Groups':
+            values = read_entry_values(scanner, key)
+            geoset.matrices = [tuple(int(i) for i in matrix[0]) for _, matrix in values[-1]]
+        else:
+            entries.append((key, read_entry_values(scanner, key)))
+
+    if geoset.positions is None:
+        scanner.error("geoset without vertices")
+    count = len(geoset.positions)
+    if geoset.normals is None:
+        geoset.normals = np.zeros((count, 3))
+    if geoset.uvs is None:
+        geoset.uvs = np.zeros((count, 2))
+    if geoset.vertex_groups is None or len(geoset.vertex_groups) != count:
+        geoset.vertex_groups = np.zeros(count, dtype=np.int64)
+    geoset.triangles = np.concatenate(triangles).reshape(-1, 3) if len(triangles) else np.zeros((0, 3), np.int64)
+    geoset.material_id = find(entries, 'MaterialID', 0)
+    geoset.min_extent = find(entries, 'MinimumExtent')
+    geoset.max_extent = find(entries, 'MaximumExtent')
+    return geoset
@@ -0,0 +1,292 @@
+from collections import defaultdict
+
+import numpy as np
+
+from .. import profiling
+from ..classes.War3AnimationSequence import War3AnimationSequence
+from ..classes.War3Camera import War3Camera
+from ..classes.War3Geoset import War3Geoset
+from ..classes.War3GeosetAnim import War3GeosetAnim
+from ..classes.War3Model import War3Model
+from ..classes.War3Vertex import War3Vertex
+from ..classes.model_utils.build_id_tables import build_id_tables
+from ..export_mdl.model_ir import Record
+from ..utils import calc_extents
+from .mdl_scanner import MdlScanner
+from .read_block import find, has, read_entry_values
+from .read_geoset import read_geoset
+
+# MDL sections of the nodes that are read, and their tags in War3Model.objects
+node_tags = {'Bone': 'bone', 'Helper': 'helper', 'Attachment': 'attachment'}
+
+
+class MdlReader:
+    # Builds a War3Model section by section. Nodes and geosets refer to each other by ids that may point ahead,
+    # so they are linked up in finish().
+
+    def __init__(self, model: War3Model, build_geosets):
+        self.model = model
+        self.build_geosets = build_geosets
+        self.version = 800
+        self.geosets = []
+        self.geoset_anim_ids = []  # Geoset id of each geoset anim
+        self.nodes = []  # (object id, tag, node, parent id, geoset anim id)
+        self.pivots = np.zeros((0, 3))
+        self.skipped = []
+        self.sections = {
+            'Version': self.read_version,
+            'Model': self.read_model,
+            'Sequences': self.read_sequences,
+            'GlobalSequences': self.read_global_sequences,
+            'Textures': self.read_textures,
+            'Materials': self.read_materials,
+            'TextureAnims': self.read_texture_animations,
+            'GeosetAnim': self.read_geoset_animation,
+            'Bone': self.read_node,
+            'Helper': self.read_node,
+            'Attachment': self.read_node,
+            'Camera': self.read_camera,
+        }
+
+    def read(self, scanner: MdlScanner):
+        while True:
+            section = scanner.next()
+            if section is None:
+                break
+            if section in self.sections:
+                values = read_entry_values(scanner, section)
+                self.sections[section](section, values[:-1], values[-1])
+            elif section == 'Geoset':
+                scanner.expect('{')
+                self.geosets.append(read_geoset(scanner))
+            elif section == 'PivotPoints':
+                scanner.next()
+                scanner.expect('{')
+                self.pivots = scanner.read_numbers(True).reshape(-1, 3)
+            else:
+                # Lights, emitters, event objects and collision shapes aren't read yet
+                token = section
+                while token != '{':
+                    token = scanner.next()
+                    if token is None:
+                        scanner.error("unexpected end of file")
+                scanner.skip_block()
+                self.skipped.append(section)
+
+    def track(self, entries, key):
+        # The track under key, with the global sequence given by its duration like in the exporter
+        track = find(entries, key)
+        if not isinstance(track, Record):
+            return None
+        if track.global_sequence >= 0:
+            track.global_sequence = self.model.global_seqs[track.global_sequence]
+        return track
+
+    def read_version(self, section, header, entries):
+        self.version = find(entries, 'FormatVersion', 800)
+
+    def read_model(self, section, header, entries):
+        self.model.name = header[0] if len(header) else ""
+        self.model.global_extents_min = find(entries, 'MinimumExtent', 0)
+        self.model.global_extents_max = find(entries, 'MaximumExtent', 0)
+
+    def read_sequences(self, section, header, entries):
+        for key, values in entries:
+            if key == 'Anim':
+                name, anim = values
+                start, end = find(anim, 'Interval')
+                self.model.sequences.append(War3AnimationSequence(name, start, end, has(anim, 'NonLooping'),
+                                                                  find(anim, 'MoveSpeed', 270),
+                                                                  find(anim, 'Rarity', -1)))
+
+    def read_global_sequences(self, section, header, entries):
+        self.model.global_seqs = [values[0] for key, values in entries if key == 'Duration']
+
+    def read_textures(self, section, header, entries):
+        for key, values in entries:
+            if key == 'Bitmap':
+                replaceable_id = find(values[0], 'ReplaceableId', 0)
+                texture = "ReplaceableId %d" % replaceable_id if replaceable_id else find(values[0], 'Image', "")
+                self.model.textures.append(texture)
+
+    def read_materials(self, section, header, entries):
+        model = self.model
+        for key, values in entries:
+            if key != 'Material':
+                continue
+            material = values[0]
+            layers = []
+            for layer_key, layer_values in material:
+                if layer_key != 'Layer':
+                    continue
+                layer = layer_values[0]
+                texture_id = find(layer, 'TextureID', 0)
+                if isinstance(texture_id, Record):  # Flipbooks keep their first texture
+                    texture_id = int(next(iter(texture_id.keyframes.values()), (0,))[0])
+                alpha = find(layer, 'Alpha', 1.0)
+                layers.append(Record(
+                    texture=model.textures[texture_id] if texture_id < len(model.textures) else War3Model.default_texture,
+                    filter_mode=find(layer, 'FilterMode', 'None'),
+                    unshaded=has(layer, 'Unshaded'),
+                    two_sided=has(layer, 'TwoSided'),
+                    unfogged=has(layer, 'Unfogged'),
+                    no_depth_test=has(layer, 'NoDepthTest'),
+                    no_depth_set=has(layer, 'NoDepthSet'),
+                    texture_anim=find(layer, 'TVertexAnimId'),  # The texture animations come later
+                    alpha_anim=self.track(layer, 'Alpha'),
+                    alpha_value=1.0 if isinstance(alpha, Record) else alpha,
+                ))
+            # MDL materials have no names, but the geosets refer to them by name
+            model.materials.append(Record(name="Material %d" % len(model.materials), layers=layers,
+                                          priority_plane=find(material, 'PriorityPlane', 0),
+                                          use_const_color=has(material, 'ConstantColor')))
+
+    def read_texture_animations(self, section, header, entries):
+        for key, values in entries:
+            if key == 'TVertexAnim':
+                anim = values[0]
+                self.model.tvertex_anims.append(Record(translation=self.track(anim, 'Translation'),
+                                                       rotation=self.track(anim, 'Rotation'),
+                                                       scale=self.track(anim, 'Scaling')))
+
+    def read_geoset_animation(self, section, header, entries):
+        color = find(entries, 'Color')
+        anim = War3GeosetAnim(tuple(reversed(color)) if isinstance(color, tuple) else None,
+                              self.track(entries, 'Color'), self.track(entries, 'Alpha'))
+        self.model.geoset_anims.append(anim)
+        self.geoset_anim_ids.append(find(entries, 'GeosetId', 0))
+
+    def read_node(self, section, header, entries):
+        node = Record(name=header[0], parent=None, pivot=(0.0, 0.0, 0.0),
+                      anim_loc=self.track(entries, 'Translation'),
+                      anim_rot=self.track(entries, 'Rotation'),
+                      anim_scale=self.track(entries, 'Scaling'),
+                      visibility=self.track(entries, 'Visibility'),
+                      billboarded=has(entries, 'Billboarded'),
+                      billboard_lock=tuple(has(entries, 'BillboardedLock' + axis) for axis in 'ZYX'))
+        geoset_anim_id = find(entries, 'GeosetAnimId')
+        self.nodes.append((find(entries, 'ObjectId', len(self.nodes)), node_tags[section], node,
+                           find(entries, 'Parent', -1), geoset_anim_id if isinstance(geoset_anim_id, int) else -1))
+
+    def read_camera(self, section, header, entries):
+        self.model.cameras.append(War3Camera(header[0], find(entries, 'Position'),
+                                             find(find(entries, 'Target', []), 'Position', (0.0, 0.0, 0.0)),
+                                             find(entries, 'FieldOfView', 0.0), find(entries, 'FarClip', 0.0),
+                                             find(entries, 'NearClip', 0.0)))
+
+    def finish(self):
+        model = self.model
+
+        # Nodes are numbered again without the skipped sections, in the order of their ids
+        self.nodes.sort(key=lambda x: x[0])
+        names = set()
+        file_ids = {}
+        for index, (object_id, tag, node, _, _) in enumerate(self.nodes):
+            name = node.name
+            suffix = 0
+            while node.name in names:  # The writers tell nodes apart by name
+                suffix += 1
+                node.name = "%s.%03d" % (name, suffix)
+            names.add(node.name)
+            file_ids[object_id] = index
+            if 0 <= object_id < len(self.pivots):
+                node.pivot = tuple(self.pivots[object_id].tolist())
+
+        for material in model.materials:
+            for layer in material.layers:
+                if layer.texture_anim is not None:
+                    layer.texture_anim = model.tvertex_anims[layer.texture_anim] \
+                        if layer.texture_anim < len(model.tvertex_anims) else None
+
+        model.objects = defaultdict(list)
+        for object_id, tag, node, parent_id, geoset_anim_id in self.nodes:
+            if parent_id in file_ids:
+                node.parent = self.nodes[file_ids[parent_id]][2].name
+            model.objects[tag].append(node)
+            model.object_indices[node.name] = len(model.objects_all)
+            model.objects_all.append(node)
+            if 0 <= geoset_anim_id < len(model.geoset_anims):
+                model.geoset_anim_map[node.name] = model.geoset_anims[geoset_anim_id]
+
+        # Object ids -> new index, -1 for the skipped ones
+        id_map = np.full(max(list(file_ids) + [0]) + 1, -1, dtype=np.int64)
+        for object_id, index in file_ids.items():
+            if object_id >= 0:
+                id_map[object_id] = index
+
+        def remap(ids):
+            ids = np.asarray(ids, dtype=np.int64)
+            valid = (ids >= 0) & (ids < len(id_map))
+            indices = np.full_like(ids, -1)
+            indices[valid] = id_map[ids[valid]]
+            return indices
+
+        for data in self.geosets:
+            data.matrices = [tuple(model.objects_all[i].name for i in remap(matrix).tolist() if i >= 0)
+                             for matrix in data.matrices]
+            data.mat_name = model.materials[data.material_id].name if data.material_id < len(model.materials) else None
+            if data.min_extent is None or data.max_extent is None:
+                data.min_extent, data.max_extent = calc_extents(data.positions.tolist())
+            data.geoset_anim = None
+
+        if self.build_geosets:
+            model.geosets = [self.build_geoset(data) for data in self.geosets]
+        else:
+            model.geosets = self.geosets
+        for anim, geoset_id in zip(model.geoset_anims, self.geoset_anim_ids):
+            if 0 <= geoset_id < len(model.geosets):
+                anim.geoset = model.geosets[geoset_id]
+                anim.geoset.geoset_anim = anim
+
+        if not isinstance(model.global_extents_min, tuple) or not isinstance(model.global_extents_max, tuple):
+            points = [node.pivot for node in model.objects_all]
+            for data in self.geosets:
+                points += [data.min_extent, data.max_extent]
+            model.global_extents_min, model.global_extents_max = calc_extents(points) if len(points) else \
+                ((0, 0, 0), (0, 0, 0))
+        build_id_tables(model)
+        return Record(use_skinweights=any(data.skin_weights is not None for data in self.geosets),
+                      shortest_floats=False)
+
+    def build_geoset(self, data):
+        model = self.model
+        geoset = War3Geoset()
+        count = len(data.positions)
+        tangents = map(tuple, data.tangents.tolist()) if data.tangents is not None else [None] * count
+        if data.skin_weights is not None:
+            # The skin's bones are indices into the matrices, which each hold a single bone. Slots without weight
+            # are padding.
+            names = dict((i, matrix[0]) for i, matrix in enumerate(data.matrices) if len(matrix))
+            skin = data.skin_weights.astype(np.int64).tolist()
+            vertex_groups = [None] * count
+            bone_lists = [tuple(names[i] for i, weight in zip(row[:4], row[4:]) if weight > 0 and i in names)
+                          for row in skin]
+            weight_lists = [tuple(row[4:]) for row in skin]
+        else:
+            vertex_groups = data.vertex_groups.tolist()
+            bone_lists = weight_lists = [None] * count
+
+        geoset.vertices = list(map(War3Vertex, map(tuple, data.positions.tolist()), map(tuple, data.normals.tolist()),
+                                   map(tuple, data.uvs.tolist()), vertex_groups, bone_lists, weight_lists, tangents))
+        geoset.triangles = list(map(tuple, data.triangles.tolist()))
+        for matrix in data.matrices:
+            geoset.add_matrix(matrix, model.bone_geosets)
+        geoset.min_extent = tuple(data.min_extent)
+        geoset.max_extent = tuple(data.max_extent)
+        geoset.mat_name = data.mat_name
+        return geoset
+
+
+def read_mdl(filepath, build_geosets=True, chunk_size=1 << 20):
+    # Reads an MDL file into a model the writers accept, like load_model_ir, and returns it with the settings it
+    # was written with and the names of the sections that were skipped. Times stay in milliseconds (f2ms is 1).
+    # Without build_geosets, the geosets are left as arrays, which to_scene takes and which need much less
+    # memory than the vertices of a War3Geoset.
+    model = War3Model()
+    model.f2ms = 1
+    reader = MdlReader(model, build_geosets)
+    with profiling.span("read_mdl"):
+        with open(filepath, 'r', encoding='utf-8', errors='replace') as file:
+            reader.read(MdlScanner(file, chunk_size))
+        settings = reader.finish()
+    return model, settings, reader.skipped
@@ -1,10 +1,17 @@
+import time
+import traceback
+
 import bpy
-from bpy.props import StringProperty, BoolProperty, FloatProperty
+from bpy.props import StringProperty, BoolProperty, FloatProperty, EnumProperty
 from bpy.types import Operator
-from bpy_extras.io_utils import orientation_helper, ExportHelper, axis_conversion
-from mathutils import Matrix
+from bpy_extras.io_utils import orientation_helper, ExportHelper
 
 from ..classes.War3ExportSettings import War3ExportSettings
+from ..classes.model_utils.get_mesh_arrays import clear_mesh_cache
+from ..export_mdl.export_steps import run_steps
+
+# Seconds of exporting per timer event in non-blocking mode
+modal_step_time = 0.1
 
 
 @orientation_helper(axis_forward='Y', axis_up='Z')
@@ -16,7 +23,14 @@ class WAR3_OT_export_mdl(Operator, ExportHelper):
     filename_ext = ".mdl"
 
     filter_glob: StringProperty(
-            default="*.mdl", options={'HIDDEN'}
+            default="*.mdl;*.mdx", options={'HIDDEN'}
+            )
+
+    file_format: EnumProperty(
+            name="Format",
+            items=[('MDL', "MDL", "Text format"),
+                   ('MDX', "MDX", "Binary format, smaller and faster to load")],
+            default='MDL'
             )
 
     filepath: StringProperty(
@@ -41,6 +55,12 @@ class WAR3_OT_export_mdl(Operator, ExportHelper):
             description="Remove keyframes if the resulting motion deviates less than the tolerance value."
             )
 
+    bake_animation: BoolProperty(
+            name="Bake Armatures",
+            description="Sample the evaluated pose of every bone at every frame, "
+                        "so constraints, IK and drivers are included in the animation"
+            )
+
     use_actions: BoolProperty(
             name="Use Actions",
             description="Use actions instead of mdl-sequences"
@@ -51,6 +71,65 @@ class WAR3_OT_export_mdl(Operator, ExportHelper):
             description="Use skin weights instead of vertex groups"
             )
 
+    shortest_floats: BoolProperty(
+            name="Shortest Floats",
+            description="Write the shortest decimals that read back as the same 32 bit float, "
+                        "instead of rounding to 6 decimals"
+            )
+
+    weld_vertices: BoolProperty(
+            name="Weld Vertices",
+            description="Merge vertices of a geoset that are within the tolerances of each other in position, "
+                        "normal and UV"
+            )
+
+    weld_distance: FloatProperty(
+            name="Distance",
+            description="How far apart vertices can be to be welded",
+            min=0.0,
+            soft_max=0.1,
+            default=0.001,
+            precision=4,
+            subtype='DISTANCE',
+            unit='LENGTH'
+            )
+
+    weld_angle: FloatProperty(
+            name="Normal Angle",
+            description="How far apart the normals of welded vertices can be, "
+                        "so hard edges stay sharp unless this is larger than their angle",
+            min=0.0,
+            max=3.14159,
+            default=0.0174533,
+            subtype='ANGLE'
+            )
+
+    weld_uv_distance: FloatProperty(
+            name="UV Distance",
+            description="How far apart the UVs of welded vertices can be, "
+                        "so UV seams stay apart unless this is larger than the gap",
+            min=0.0,
+            soft_max=0.1,
+            default=0.001,
+            precision=4
+            )
+
+    profile_export: BoolProperty(
+            name="Profile Export",
+            description="Time each export phase and count the processed data, and show the results in the Info log"
+            )
+
+    profile_sidecar: BoolProperty(
+            name="Save Profile",
+            description="Also save the profile as JSON next to the exported file (.profile.json)"
+            )
+
+    modal_export: BoolProperty(
+            name="Non-Blocking",
+            description="Export in small steps with a progress indicator, so Blender stays responsive. "
+                        "Press Esc to cancel"
+            )
+
     optimize_tolerance: FloatProperty(
             name="Tolerance",
             min=0.001,
@@ -60,38 +139,137 @@ class WAR3_OT_export_mdl(Operator, ExportHelper):
             unit='LENGTH'
             )
 
+    @classmethod
+    def register(cls):
+        if clear_mesh_cache not in bpy.app.handlers.load_post:
+            bpy.app.handlers.load_post.append(clear_mesh_cache)
+
+    @classmethod
+    def unregister(cls):
+        if clear_mesh_cache in bpy.app.handlers.load_post:
+            bpy.app.handlers.load_post.remove(clear_mesh_cache)
+
+    def check(self, context):
+        self.filename_ext = ".mdx" if self.file_format == 'MDX' else ".mdl"
+        return super().check(context)
+
     def execute(self, context):
+        self.filename_ext = ".mdx" if self.file_format == 'MDX' else ".mdl"
         filepath = self.filepath
         filepath = bpy.path.ensure_ext(filepath, self.filename_ext)
 
-        settings: War3ExportSettings = War3ExportSettings()
-        settings.global_matrix = axis_conversion(
-            to_forward=self.axis_forward,
-            to_up=self.axis_up,
-        ).to_4x4() @ Matrix.Scale(self.global_scale, 4)
+        try:
+            settings = War3ExportSettings.from_dict({
+                'axis_forward': self.axis_forward,
+                'axis_up': self.axis_up,
+                'global_scale': self.global_scale,
+                'use_selection': self.use_selection,
+                'optimize_animation': self.optimize_animation,
+                'optimize_tolerance': self.optimize_tolerance,
+                'use_actions': self.use_actions,
+                'bake_animation': self.bake_animation,
+                'use_skinweights': self.use_skinweights,
+                'shortest_floats': self.shortest_floats,
+                'weld_vertices': self.weld_vertices,
+                'weld_distance': self.weld_distance,
+                'weld_angle': self.weld_angle,
+                'weld_uv_distance': self.weld_uv_distance,
+                'profile_export': self.profile_export,
+                'profile_sidecar': self.profile_sidecar,
+            })
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+
+        # The steps get bpy.context rather than the context of this call, which isn't guaranteed to stay valid
+        # once execute returns, while a non-blocking export runs its steps from later timer events
+        if self.file_format == 'MDX':
+            from ..export_mdl import export_mdx
+            steps = export_mdx.save_steps(self, bpy.context, settings, filepath=filepath, mdx_version=800)
+        else:
+            from ..export_mdl import export_mdl
+            steps = export_mdl.save_steps(self, bpy.context, settings, filepath=filepath, mdl_version=800)
+
+        if not self.modal_export or context.window is None:
+            run_steps(steps)
+            return {'FINISHED'}
+
+        wm = context.window_manager
+        self._steps = steps
+        self._scene = context.scene
+        self._timer = wm.event_timer_add(0.01, window=context.window)
+        wm.progress_begin(0, 100)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC' and event.value == 'PRESS':
+            # Closing the steps restores the frame and removes the temporary meshes and the partial file
+            self._steps.close()
+            self.end_modal(context)
+            self.report({'WARNING'}, "Export cancelled")
+            return {'CANCELLED'}
+
+        if event.type != 'TIMER':
+            # Every other event is swallowed, so the scene can't be edited while the export reads it
+            return {'RUNNING_MODAL'}
+
+        if context.scene != self._scene:
+            # E.g. switched by a script, after which the rest of the export would read another scene
+            self._steps.close()
+            self.end_modal(context)
+            self.report({'ERROR'}, "Export cancelled: the scene changed during the export")
+            return {'CANCELLED'}
 
-        settings.use_selection = self.use_selection
-        settings.optimize_animation = self.optimize_animation
-        settings.optimize_tolerance = self.optimize_tolerance
-        settings.use_actions = self.use_actions
-        settings.use_skinweights = self.use_skinweights
+        # Run steps for a short while, then give Blender a chance to redraw and handle input
+        end_time = time.perf_counter() + modal_step_time
+        try:
+            progress = next(self._steps)
+            while time.perf_counter() < end_time:
+                progress = next(self._steps)
+        except StopIteration:
+            self.end_modal(context)
+            return {'FINISHED'}
+        except Exception as e:
+            self.end_modal(context)
+            traceback.print_exc()
+            self.report({'ERROR'}, "Export failed: %s" % e)
+            return {'CANCELLED'}
 
-        from ..export_mdl import export_mdl
-        export_mdl.save(self, context, settings, filepath=filepath, mdl_version=800)
+        context.window_manager.progress_update(int(progress * 100))
+        return {'RUNNING_MODAL'}
 
-        return {'FINISHED'}
+    def end_modal(self, context):
+        wm = context.window_manager
+        wm.event_timer_remove(self._timer)
+        wm.progress_end()
+        self._steps = None
+        self._scene = None
 
     def draw(self, context):
         layout = self.layout
 
+        layout.prop(self, "file_format")
         layout.prop(self, "use_selection")
         layout.prop(self, "global_scale")
         layout.prop(self, "axis_forward")
         layout.prop(self, "axis_up")
         layout.separator()
         layout.prop(self, 'optimize_animation')
+        layout.prop(self, 'bake_animation')
         layout.prop(self, 'use_actions')
         layout.prop(self, 'use_skinweights')
+        if self.file_format == 'MDL':
+            layout.prop(self, 'shortest_floats')
+        layout.prop(self, 'weld_vertices')
+        if self.weld_vertices:
+            layout.prop(self, 'weld_distance')
+            layout.prop(self, 'weld_angle')
+            layout.prop(self, 'weld_uv_distance')
+        layout.prop(self, 'modal_export')
+        layout.prop(self, 'profile_export')
+        if self.profile_export:
+            layout.prop(self, 'profile_sidecar')
         if self.optimize_animation:
             box = layout.box()
             box.label(text="EXPERIMENTAL", icon='ERROR')
@@ -101,6 +279,8 @@ class WAR3_OT_export_mdl(Operator, ExportHelper):
             box.label(text="EXPERIMENTAL", icon='ERROR')
             box.label(text="Will export action and not marker based sequences. "
                            "This does not yet support Rarity or NonLooping")
+            if self.bake_animation:
+                box.label(text="Can't be combined with Bake Armatures", icon='CANCEL')
         if self.use_skinweights:
             box = layout.box()
             box.label(text="EXPERIMENTAL", icon='ERROR')
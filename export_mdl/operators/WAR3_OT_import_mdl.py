@@ -0,0 +1,32 @@
+import traceback
+
+from bpy.props import StringProperty
+from bpy.types import Operator
+from bpy_extras.io_utils import ImportHelper
+
+
+class WAR3_OT_import_mdl(Operator, ImportHelper):
+    """MDL Importer"""
+    bl_idname = 'import.mdl_importer'
+    bl_description = 'Warcraft 3 MDL Importer'
+    bl_label = 'Import .MDL'
+    bl_options = {'REGISTER', 'UNDO'}
+    filename_ext = ".mdl"
+
+    filter_glob: StringProperty(
+            default="*.mdl", options={'HIDDEN'}
+            )
+
+    filepath: StringProperty(
+            subtype="FILE_PATH"
+            )
+
+    def execute(self, context):
+        from ..import_mdl import import_mdl
+        try:
+            import_mdl.load(self, context, self.filepath)
+        except (OSError, ValueError) as e:
+            traceback.print_exc()
+            self.report({'ERROR'}, "Could not import %s: %s" % (self.filepath, e))
+            return {'CANCELLED'}
+        return {'FINISHED'}
@@ -0,0 +1,150 @@
+import json
+import time
+
+# Timing spans and counters for the export pipeline. Off unless an export calls start(); until then span()
+# returns a shared do-nothing context manager and count() returns right away, so the calls can stay in place.
+
+profiler = None
+
+
+class Span:
+    # Calls with the same name under the same parent add up into one span. If the span has a size function,
+    # e.g. the number of bytes written so far, the growth is counted as 'bytes'.
+    __slots__ = ('name', 'seconds', 'calls', 'counters', 'children', 'start', 'size', 'start_size')
+
+    def __init__(self, name):
+        self.name = name
+        self.seconds = 0.0
+        self.calls = 0
+        self.counters = {}
+        self.children = {}
+        self.start = None
+        self.size = None
+        self.start_size = 0
+
+    def __enter__(self):
+        profiler.stack.append(self)
+        if self.size is not None:
+            self.start_size = self.size()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.seconds += time.perf_counter() - self.start
+        self.calls += 1
+        if self.size is not None:
+            self.counters['bytes'] = self.counters.get('bytes', 0) + self.size() - self.start_size
+        profiler.stack.pop()
+        return False
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'seconds': self.seconds,
+            'calls': self.calls,
+            'counters': dict(self.counters),
+            'children': [child.to_dict() for child in self.children.values()],
+        }
+
+
+class Profiler:
+    def __init__(self, name):
+        self.root = Span(name)
+        self.stack = [self.root]
+
+    def span(self, name, size=None):
+        parent = self.stack[-1]
+        child = parent.children.get(name)
+        if child is None:
+            child = parent.children[name] = Span(name)
+        child.size = size
+        return child
+
+
+class NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+null_span = NullSpan()
+
+
+def start(name):
+    global profiler
+    profiler = Profiler(name)
+    profiler.root.start = time.perf_counter()
+    return profiler
+
+
+def stop():
+    # Returns the report of the current profiler, or None if profiling was off
+    global profiler
+    if profiler is None:
+        return None
+    root = profiler.root
+    root.seconds = time.perf_counter() - root.start
+    root.calls = 1
+    profiler = None
+
+    report = root.to_dict()
+    report['totals'] = total_counters(report)
+    return report
+
+
+def span(name, size=None):
+    if profiler is None:
+        return null_span
+    return profiler.span(name, size)
+
+
+def count(name, value=1):
+    if profiler is None:
+        return
+    counters = profiler.stack[-1].counters
+    counters[name] = counters.get(name, 0) + value
+
+
+def total_counters(report):
+    totals = dict(report['counters'])
+    for child in report['children']:
+        for name, value in total_counters(child).items():
+            totals[name] = totals.get(name, 0) + value
+    return totals
+
+
+def format_report(report, depth=2, threshold=0.01):
+    # Readable lines for the top levels of the report, leaving out spans under the threshold fraction of the
+    # total time, followed by the counter totals
+    lines = []
+    min_seconds = report['seconds'] * threshold
+
+    def add_span(entry, level):
+        calls = " (%d calls)" % entry['calls'] if entry['calls'] > 1 else ""
+        lines.append("%s%s: %.3fs%s" % ("  " * level, entry['name'], entry['seconds'], calls))
+        if level < depth:
+            for child in sorted(entry['children'], key=lambda x: -x['seconds']):
+                if child['seconds'] >= min_seconds:
+                    add_span(child, level + 1)
+
+    add_span(report, 0)
+    for name, value in sorted(report['totals'].items()):
+        lines.append("%s: %d" % (name, value))
+    return lines
+
+
+def report_profile(report, operator, filepath, write_sidecar):
+    # Shows the report in the operator's reports and optionally saves it next to the exported file
+    if report is None:
+        return None
+    if operator is not None:
+        for line in format_report(report):
+            operator.report({'INFO'}, line)
+    else:
+        print("\n".join(format_report(report)))
+    if write_sidecar:
+        with open(filepath + ".profile.json", 'w') as output:
+            json.dump(report, output, indent=2)
+    return report
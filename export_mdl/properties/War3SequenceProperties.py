@@ -1,4 +1,5 @@
 import bpy
+import numpy as np
 from bpy.app.handlers import persistent
 from bpy.props import StringProperty, IntProperty, BoolProperty, CollectionProperty
 from bpy.types import PropertyGroup
@@ -7,11 +8,52 @@ from bpy.types import PropertyGroup
 #     sequence_changed_handler
 
 
+# Frames of the timeline markers by name, per scene, along with the (name, frame) pairs they were built from and
+# the marker_checksum of their frames
+marker_indices = {}
+# Sequence names per scene as of the last time the handler synced them with the markers
+synced_sequences = {}
+
+
+def update_marker_index(scene) -> bool:
+    # Rebuilds the scene's marker index if the markers were added, removed, renamed or moved.
+    # Returns whether anything changed.
+    key = scene.as_pointer()
+    signature = tuple((m.name, m.frame) for m in scene.timeline_markers)
+    index = marker_indices.get(key)
+    if index is not None and index[0] == signature:
+        return False
+
+    frames = {}
+    for name, frame in signature:
+        frames.setdefault(name, []).append(frame)
+    marker_indices[key] = (signature, frames, marker_checksum(scene))
+    return True
+
+
+def marker_checksum(scene):
+    # Changes when markers are added, removed or moved, which is cheaper to check than the names
+    markers = scene.timeline_markers
+    frames = np.empty(len(markers), dtype=np.int32)
+    markers.foreach_get('frame', frames)
+    return len(markers), hash(frames.tobytes())
+
+
+def get_marker_frames(scene):
+    # Moving a marker doesn't cause a depsgraph update, so the handler may not have seen the markers' frames
+    index = marker_indices.get(scene.as_pointer())
+    if index is None or index[2] != marker_checksum(scene):
+        update_marker_index(scene)
+        index = marker_indices[scene.as_pointer()]
+    return index[1]
+
+
 def set_sequence_name(self, value):
     for marker in bpy.context.scene.timeline_markers:
         if marker.name == self.name:
             marker.name = value
     self.name = value
+    update_marker_index(bpy.context.scene)
 
 
 def get_sequence_name(self):
@@ -23,7 +65,8 @@ def get_sequence_start(self):
     if not len(scene.mdl_sequences):
         return 0
     # active_sequence = scene.mdl_sequences[scene.mdl_sequence_index]
-    return min(tuple(m.frame for m in scene.timeline_markers if m.name == self.name))
+    frames = get_marker_frames(scene).get(self.name)
+    return min(frames) if frames else 0
 
 
 def get_sequence_end(self):
@@ -31,7 +74,8 @@ def get_sequence_end(self):
     if not len(scene.mdl_sequences):
         return 0
     # active_sequence = scene.mdl_sequences[scene.mdl_sequence_index]
-    return max(tuple(m.frame for m in scene.timeline_markers if m.name == self.name))
+    frames = get_marker_frames(scene).get(self.name)
+    return max(frames) if frames else 0
 
 
 class War3SequenceProperties(PropertyGroup):
@@ -106,14 +150,19 @@ def sequence_changed_handler(self):
     if context.window_manager.mdl_sequence_refreshing:
         return
 
-    context.window_manager.mdl_sequence_refreshing = True
-    markers = set()
+    scene = context.scene
+    sequences = scene.mdl_sequences
 
-    sequences = context.scene.mdl_sequences
+    # Nothing to do unless the markers or the sequence list changed since the last sync
+    markers_changed = update_marker_index(scene)
+    if not markers_changed and synced_sequences.get(scene.as_pointer()) == tuple(sequences.keys()):
+        return
+
+    context.window_manager.mdl_sequence_refreshing = True
 
-    for marker in context.scene.timeline_markers:
-        if len([m for m in context.scene.timeline_markers if m.name == marker.name]) == 2:
-            markers.add(marker.name)
+    # Sequences are the marker names used exactly twice
+    markers = [name for name, frames in get_marker_frames(scene).items() if len(frames) == 2]
+    marker_names = set(markers)
 
     for marker in markers:
         if marker not in sequences:
@@ -123,10 +172,11 @@ def sequence_changed_handler(self):
                 s.non_looping = True
 
     for sequence in sequences.values():
-        if sequence.name not in markers:
+        if sequence.name not in marker_names:
             index = sequences.find(sequence.name)
             if context.scene.mdl_sequence_index >= index:
                 context.scene.mdl_sequence_index = index - 1
             sequences.remove(index)
 
+    synced_sequences[scene.as_pointer()] = tuple(sequences.keys())
     context.window_manager.mdl_sequence_refreshing = False
@@ -1,6 +1,8 @@
 import math
 from operator import itemgetter
 
+import numpy as np
+
 decimal_places = 5
 
 
@@ -8,6 +10,12 @@ def rnd(val):
     return round(val, decimal_places)
 
 
+def rnd_array(values):
+    # Same result as rnd() for every element, as long as the values come from float32 data:
+    # the product with 10^5 is then exact, so both round half to even on the exact value.
+    return np.round(np.asarray(values, dtype=np.float64), decimal_places)
+
+
 def f2s(value):
     return ('%.6f' % value).rstrip('0').rstrip('.')
 
@@ -27,19 +35,21 @@ def calc_extents(vertices):
 
 
 def get_curve(obj, data_paths):
-    if obj.animation_data and obj.animation_data.action:
-        for path in data_paths:
-            curve = obj.animation_data.action.fcurves.find(path)
-            if curve is not None:
-                return curve
+    from .classes.animation_curve_utils.action_index import get_fcurves
+    for path in data_paths:
+        curve = get_fcurves(obj.animation_data, path).get(0)
+        if curve is not None:
+            return curve
     return None
 
 
 def get_curves(obj, data_path, indices):
+    from .classes.animation_curve_utils.action_index import get_fcurves
     curves = {}
-    if obj.animation_data and obj.animation_data.action:
+    channels = get_fcurves(obj.animation_data, data_path)
+    if len(channels):
         for index in indices:
-            curve = obj.animation_data.action.fcurves.find(data_path, index=index)
+            curve = channels.get(index)
             if curve is not None:
                 curves[(data_path.split('.')[-1], index)] = curve # For now, i'm just interested in the type, not the whole data path. Hence, the split returns the name after the last dot. 
     if len(curves):
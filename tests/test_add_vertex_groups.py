@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from export_mdl.classes.model_utils.add_vertex_groups import add_vertex_groups
+
+
+class VertexGroups(dict):
+    # Records the weight of every vertex in every group, like the vertex groups of a Blender object
+    def new(self, name):
+        group = SimpleNamespace(weights={})
+        group.add = lambda indices, weight, mode: group.weights.update(dict.fromkeys(indices, weight))
+        self[name] = group
+        return group
+
+
+def vertex_weights(geoset):
+    bpy_obj = SimpleNamespace(vertex_groups=VertexGroups())
+    add_vertex_groups(bpy_obj, geoset)
+    return {name: group.weights for name, group in bpy_obj.vertex_groups.items()}
+
+
+def test_skin_weights():
+    rng = np.random.default_rng(0)
+    count = 500
+    bones = np.stack([rng.permutation(6)[:4] for _ in range(count)])
+    weights = rng.integers(0, 4, (count, 4)) * 60
+    bones[weights == 0] = 0
+    matrices = [['a'], ['b'], ['c'], ['d'], ['e'], []]  # Bone 5 has no matrix and so no group
+    geoset = SimpleNamespace(skin_weights=np.hstack((bones, weights)).astype(np.uint8), matrices=matrices)
+
+    expected = {}
+    for vertex in range(count):
+        for bone, weight in zip(bones[vertex], weights[vertex]):
+            if weight > 0 and len(matrices[bone]):
+                expected.setdefault(matrices[bone][0], {})[vertex] = weight / 255
+    assert vertex_weights(geoset) == expected
+
+
+def test_matrices():
+    geoset = SimpleNamespace(skin_weights=None, matrices=[['a'], ['a', 'b']], vertex_groups=np.array([1, 0, 1, 1]))
+    assert vertex_weights(geoset) == {'a': {0: 0.5, 1: 1.0, 2: 0.5, 3: 0.5}, 'b': {0: 0.5, 2: 0.5, 3: 0.5}}
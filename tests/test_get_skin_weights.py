@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from export_mdl.classes.model_utils.get_skin_weights import get_skin_weights
+
+
+def mesh_arrays(vertex_groups):
+    # The flat group arrays extract_mesh_arrays reads from a mesh, from a list of [(group, weight), ...] per vertex
+    pairs = [pair for groups in vertex_groups for pair in groups]
+    return SimpleNamespace(group_counts=np.array([len(groups) for groups in vertex_groups], dtype=np.int64),
+                           group_indices=np.array([group for group, _ in pairs], dtype=np.int64),
+                           group_weights=np.array([weight for _, weight in pairs], dtype=np.float32))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_weights_add_up_to_255(seed):
+    rng = np.random.default_rng(seed)
+    vertex_groups = [[(int(g), float(w)) for g, w in zip(rng.permutation(8)[:n], rng.random(n))]
+                     for n in rng.integers(1, 9, 50)]
+    bones, weights = get_skin_weights(mesh_arrays(vertex_groups), list(range(8)))
+
+    assert bones.shape == weights.shape == (50, 4)
+    assert (weights.sum(axis=1) == 255).all()
+    assert ((bones >= 0) == (weights > 0)).all()
+
+
+def test_at_most_four_heaviest_bones():
+    vertex_groups = [[(0, 0.05), (1, 0.3), (2, 0.1), (3, 0.2), (4, 0.25), (5, 0.1)]]
+    bones, weights = get_skin_weights(mesh_arrays(vertex_groups), list(range(6)))
+
+    assert bones[0].tolist() == [1, 4, 3, 2]
+    assert weights[0].sum() == 255
+    assert (np.diff(weights[0]) <= 0).all()
+
+
+def test_equal_weights_keep_group_order():
+    # Six equal weights: the first four groups of the vertex are kept, and since 255 doesn't divide by four the
+    # leftover units go to the earliest slots
+    vertex_groups = [[(5, 0.5), (2, 0.5), (4, 0.5), (0, 0.5), (1, 0.5), (3, 0.5)]]
+    bones, weights = get_skin_weights(mesh_arrays(vertex_groups), list(range(6)))
+
+    assert bones[0].tolist() == [5, 2, 4, 0]
+    assert weights[0].tolist() == [64, 64, 64, 63]
+
+
+def test_groups_that_are_not_bones_are_ignored():
+    vertex_groups = [[(0, 0.9), (1, 0.5), (2, 0.5)], [(3, 1.0)]]
+    # Group 0 isn't a bone, and group 3 doesn't exist in the object
+    bones, weights = get_skin_weights(mesh_arrays(vertex_groups), [-1, 7, 8])
+
+    assert bones[0].tolist() == [7, 8, -1, -1]
+    assert weights[0].tolist() == [128, 127, 0, 0]
+    assert bones[1].tolist() == [-1, -1, -1, -1]
+    assert weights[1].tolist() == [0, 0, 0, 0]
+
+
+def test_vertices_without_weights():
+    vertex_groups = [[], [(0, 0.0)], [(1, 1.0)]]
+    bones, weights = get_skin_weights(mesh_arrays(vertex_groups), [0, 1])
+
+    assert bones[:2].tolist() == [[-1] * 4] * 2
+    assert weights[:2].tolist() == [[0] * 4] * 2
+    assert bones[2].tolist() == [1, -1, -1, -1]
+    assert weights[2].tolist() == [255, 0, 0, 0]
+
+
+def test_tiny_weights_that_round_to_zero_are_dropped():
+    vertex_groups = [[(0, 1.0), (1, 0.001)]]
+    bones, weights = get_skin_weights(mesh_arrays(vertex_groups), [0, 1])
+
+    assert bones[0].tolist() == [0, -1, -1, -1]
+    assert weights[0].tolist() == [255, 0, 0, 0]
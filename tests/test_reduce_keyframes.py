@@ -0,0 +1,184 @@
+import math
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from export_mdl.classes.War3AnimationCurve import War3AnimationCurve
+from export_mdl.classes.utils.reduce_keyframes import reduce_keyframes
+
+
+def split_segment(keyframes, type1, start, end, tolerance):
+    # The recursive reducer reduce_keyframes replaced, with mathutils' lerp, slerp and dot written out
+    n = float(end[0] - start[0])
+    error = -1
+    frame = 0
+    for i in (i for i in range(start[0], end[0]) if i in keyframes):
+        t = max(0, min(1, float(i - start[0]) / n))
+        if type1 == 'Rotation':
+            distance = 1 - np.dot(keyframes[i], slerp(start[1], end[1], t))
+        else:
+            a = np.array(start[1])
+            distance = np.linalg.norm(np.array(keyframes[i]) - (a + (np.array(end[1]) - a) * t))
+        if distance > error:
+            error = distance
+            frame = i
+
+    if error > 0 and error > tolerance:
+        middle = (frame, keyframes[frame])
+        if frame != start[0] and frame != end[0]:
+            return ([middle] + split_segment(keyframes, type1, start, middle, tolerance) +
+                    split_segment(keyframes, type1, middle, end, tolerance))
+    return []
+
+
+def slerp(a, b, t):
+    a = np.array(a)
+    b = np.array(b)
+    dot = np.dot(a, b)
+    if dot < 0:
+        b, dot = -b, -dot
+    angle = math.acos(min(dot, 1))
+    if math.sin(angle) < 1e-6:
+        return a * (1 - t) + b * t
+    return (math.sin((1 - t) * angle) * a + math.sin(t * angle) * b) / math.sin(angle)
+
+
+def old_kept_frames(frames, values, type1, tolerance):
+    keyframes = dict(zip(frames, map(tuple, values)))
+    start = (frames[0], keyframes[frames[0]])
+    end = (frames[-1], keyframes[frames[-1]])
+    return sorted({start[0], end[0]} | {key[0] for key in split_segment(keyframes, type1, start, end, tolerance)})
+
+
+def random_frames(rng, count):
+    # Sparse integer frames, like sampled keyframes
+    return np.cumsum(rng.integers(1, 4, count)) - 1
+
+
+def random_rotations(rng, count):
+    # A smooth path of unit quaternions that stays within 90 degrees of the identity, so any two of them have a
+    # positive dot product
+    axis_angles = np.cumsum(rng.normal(0, 0.15, (count, 3)), axis=0)
+    axis_angles *= min(1, 1.5 / np.linalg.norm(axis_angles, axis=1).max())
+    angles = np.linalg.norm(axis_angles, axis=1, keepdims=True)
+    axes = axis_angles / np.maximum(angles, 1e-12)
+    return np.hstack((np.cos(angles / 2), axes * np.sin(angles / 2)))
+
+
+@pytest.mark.parametrize('seed', range(20))
+@pytest.mark.parametrize('tolerance', [0.001, 0.05, 0.5])
+def test_translation_keeps_the_same_keyframes(seed, tolerance):
+    rng = np.random.default_rng(seed)
+    frames = random_frames(rng, 60)
+    values = np.cumsum(rng.normal(0, 0.2, (60, 3)), axis=0)
+
+    kept = reduce_keyframes(frames, values, 'Translation', tolerance)
+    assert [int(frames[i]) for i in kept] == old_kept_frames(frames.tolist(), values, 'Translation', tolerance)
+
+
+@pytest.mark.parametrize('seed', range(20))
+@pytest.mark.parametrize('tolerance', [0.0001, 0.001, 0.01])
+def test_rotation_keeps_the_same_keyframes(seed, tolerance):
+    # Within one hemisphere, 1 - |dot| is the same as the old 1 - dot
+    rng = np.random.default_rng(seed)
+    frames = random_frames(rng, 60)
+    values = random_rotations(rng, 60)
+
+    kept = reduce_keyframes(frames, values, 'Rotation', tolerance)
+    assert [int(frames[i]) for i in kept] == old_kept_frames(frames.tolist(), values, 'Rotation', tolerance)
+
+
+def test_rotation_ignores_quaternion_sign():
+    # q and -q are the same rotation, so a flipped sign alone keeps no extra keyframes
+    values = random_rotations(np.random.default_rng(0), 3)
+    values[1] = -(values[0] + values[2]) / np.linalg.norm(values[0] + values[2])
+    assert reduce_keyframes([0, 1, 2], values, 'Rotation', 0.001) == [0, 2]
+
+
+@pytest.mark.parametrize('seed', range(10))
+@pytest.mark.parametrize('type1', ['Translation', 'Scale', 'Rotation'])
+def test_removed_keyframes_are_within_tolerance(seed, type1):
+    rng = np.random.default_rng(seed)
+    frames = random_frames(rng, 80)
+    if type1 == 'Rotation':
+        values, tolerance = random_rotations(rng, 80), 0.001
+    else:
+        values, tolerance = np.cumsum(rng.normal(0, 0.2, (80, 3)), axis=0), 0.05
+
+    kept = reduce_keyframes(frames, values, type1, tolerance)
+    assert kept[0] == 0 and kept[-1] == len(frames) - 1
+    for start, end in zip(kept, kept[1:]):
+        for i in range(start + 1, end):
+            t = (frames[i] - frames[start]) / (frames[end] - frames[start])
+            if type1 == 'Rotation':
+                error = 1 - abs(np.dot(values[i], slerp(values[start], values[end], t)))
+            else:
+                error = np.linalg.norm(values[i] - (values[start] + (values[end] - values[start]) * t))
+            assert error <= tolerance + 1e-12
+
+
+@pytest.mark.parametrize('interpolation', ['Bezier', 'Hermite'])
+def test_curves_on_one_segment_reduce_to_its_ends(interpolation):
+    # Keyframes sampled from a single Bezier or Hermite segment are all redundant
+    a, b = np.array([0.0, 1.0, 2.0]), np.array([3.0, -1.0, 5.0])
+    out_tangent, in_tangent = np.array([2.0, 2.0, 0.0]), np.array([1.0, -4.0, 1.0])
+    t = np.linspace(0, 1, 11)[:, None]
+    s = 1 - t
+    if interpolation == 'Bezier':
+        values = s ** 3 * a + 3 * s * s * t * out_tangent + 3 * s * t * t * in_tangent + t ** 3 * b
+    else:
+        values = ((2 * t ** 3 - 3 * t ** 2 + 1) * a + (t ** 3 - 2 * t ** 2 + t) * out_tangent +
+                  (-2 * t ** 3 + 3 * t ** 2) * b + (t ** 3 - t ** 2) * in_tangent)
+    handles_right = np.repeat(out_tangent[None], 11, axis=0)
+    handles_left = np.repeat(in_tangent[None], 11, axis=0)
+
+    assert reduce_keyframes(np.arange(11), values, 'Translation', 1e-6, interpolation,
+                            handles_left, handles_right) == [0, 10]
+    assert len(reduce_keyframes(np.arange(11), values, 'Translation', 1e-6)) > 2
+
+
+def test_per_channel_tolerances():
+    # x has a bump at frame 1 and y one at frame 3, each only outside the tolerance of its own channel
+    values = np.zeros((5, 2))
+    values[1, 0] = 0.06
+    values[3, 1] = 0.06
+
+    assert reduce_keyframes(np.arange(5), values, 'Translation', [0.05, 0.5]) == [0, 1, 4]
+    assert reduce_keyframes(np.arange(5), values, 'Translation', [0.5, 0.05]) == [0, 3, 4]
+    assert reduce_keyframes(np.arange(5), values, 'Translation', [0.05, 0.05]) == [0, 1, 3, 4]
+    assert reduce_keyframes(np.arange(5), values, 'Translation', 0.1) == [0, 4]
+
+
+def test_stepped_rotations_keep_every_change():
+    # Without interpolation the track holds each rotation until the next keyframe, so a key halfway along the
+    # slerp between its neighbours still changes the playback
+    half = math.sqrt(0.5)
+    values = np.array([[1, 0, 0, 0], [math.cos(math.pi / 8), 0, 0, math.sin(math.pi / 8)], [half, 0, 0, half]])
+
+    assert reduce_keyframes([0, 1, 2], values, 'Rotation', 0.001) == [0, 2]
+    assert reduce_keyframes([0, 1, 2], values, 'Rotation', 0.001, 'DontInterp') == [0, 1, 2]
+    assert reduce_keyframes([0, 1, 2], [values[0]] * 3, 'Rotation', 0.001, 'DontInterp') == [0, 2]
+
+
+@pytest.mark.parametrize('interpolation', ['Bezier', 'Hermite'])
+def test_nonlinear_rotations_are_not_reduced(interpolation):
+    values = np.repeat(random_rotations(np.random.default_rng(0), 1), 5, axis=0)
+    assert reduce_keyframes(np.arange(5), values, 'Rotation', 0.5, interpolation, values, values) == list(range(5))
+
+
+def test_optimize_takes_tolerances_by_type():
+    values = np.zeros((5, 3))
+    values[1, 0] = 0.06
+    sequences = [SimpleNamespace(start=0, end=4)]
+
+    def optimized(data_path, tolerance):
+        curve = War3AnimationCurve.from_samples(data_path, np.arange(5), values)
+        curve.optimize(tolerance, sequences, 1)
+        return sorted(curve.keyframes)
+
+    tolerances = {'Translation': [0.05, 0.5, 0.5], 'Scale': 0.5}
+    assert optimized('location', tolerances) == [0, 1, 4]
+    assert optimized('location', [0.5, 0.05, 0.05]) == [0, 4]
+    assert optimized('scale', tolerances) == [0, 4]
+    assert optimized('color', tolerances) == list(range(5))
@@ -0,0 +1,20 @@
+from types import SimpleNamespace
+
+import pytest
+
+from export_mdl.export_mdl.mdx.save_geosets import save_geosets
+
+
+def model_with_geoset(vertex_count, matrix_count):
+    geoset = SimpleNamespace(vertices=[None] * vertex_count, matrices=[('bone %d' % i,) for i in range(matrix_count)],
+                             mat_name='skin')
+    return SimpleNamespace(geosets=[geoset])
+
+
+@pytest.mark.parametrize('vertex_count, matrix_count, message', [
+    (65537, 1, r"Geoset 0 \(skin\) has 65537 vertices, MDX allows at most 65536"),
+    (3, 257, r"Geoset 0 \(skin\) uses 257 matrices or skin bones, MDX allows at most 256"),
+])
+def test_limits(vertex_count, matrix_count, message):
+    with pytest.raises(ValueError, match=message):
+        save_geosets(model_with_geoset(vertex_count, matrix_count), SimpleNamespace(use_skinweights=False), 800)